@@ -13,7 +13,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Import the Base and models
 from app.database import Base
-from app.models import Employee, WorkHours, PayRun, TaxDeductionProfile
+from app.models import Employee, WorkHours, PayRun, TaxDeductionProfile, PITScheduleVersion, PITBracket, PayrollPeriodTotal, Job, IdempotencyKey
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -0,0 +1,135 @@
+"""
+Async Route Adapter
+Serves the existing routers from the async engine when DATABASE_ASYNC is enabled
+
+Each endpoint that depends on get_db is re-registered as an async endpoint
+that receives an AsyncSession and runs the original handler through
+AsyncSession.run_sync. The handler's queries then await the async driver on
+the event loop instead of blocking a threadpool thread, so one worker can
+hold many more requests in flight. Endpoints without a database session are
+registered unchanged.
+
+run_sync keeps the handler on the event-loop thread, so anything else that
+blocks stalls every request in flight. Endpoints marked with
+@runs_in_threadpool (CPU-bound calculation, process pool fan-out, upload
+parsing) stay sync on the threadpool, and short blocking calls inside other
+handlers go through run_blocking.
+"""
+
+import functools
+import inspect
+from contextvars import ContextVar
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.util import await_only
+from starlette.concurrency import run_in_threadpool
+
+from app.database import get_db, get_async_db
+
+
+# Route attributes copied onto the async registration
+ROUTE_OPTIONS = (
+    "response_model", "status_code", "tags", "dependencies", "summary", "description",
+    "response_description", "responses", "deprecated", "methods", "operation_id",
+    "include_in_schema", "response_class", "name", "openapi_extra",
+)
+
+# True while a handler runs inside AsyncSession.run_sync on the event loop
+_on_event_loop: ContextVar[bool] = ContextVar("on_event_loop", default=False)
+
+
+def runs_in_threadpool(endpoint):
+    """Keep a sync endpoint on the threadpool (with a sync Session) when DATABASE_ASYNC is enabled"""
+    endpoint.runs_in_threadpool = True
+    return endpoint
+
+
+def _off_event_loop(function, args, kwargs):
+    _on_event_loop.set(False)
+    return function(*args, **kwargs)
+
+
+def run_blocking(function, *args, **kwargs):
+    """
+    Call a blocking function without stalling the event loop
+
+    Under an async endpoint the call runs on a threadpool thread while the
+    handler's greenlet waits; everywhere else it is called directly.
+    """
+    if not _on_event_loop.get():
+        return function(*args, **kwargs)
+    return await_only(run_in_threadpool(_off_event_loop, function, args, kwargs))
+
+
+def _db_parameter(endpoint) -> str | None:
+    """Name of the endpoint parameter injected with get_db, if any"""
+    for parameter in inspect.signature(endpoint).parameters.values():
+        if isinstance(parameter.default, DependsParam) and parameter.default.dependency is get_db:
+            return parameter.name
+    return None
+
+
+def _async_endpoint(route: APIRoute, db_parameter: str):
+    """Wrap a sync endpoint so it runs on an AsyncSession"""
+    endpoint = route.endpoint
+    signature = inspect.signature(endpoint)
+
+    # Serialise inside run_sync: attribute loads after the handler returns
+    # would otherwise happen outside the greenlet and fail
+    adapter = TypeAdapter(route.response_model) if route.response_model is not None else None
+
+    def call(session, kwargs):
+        token = _on_event_loop.set(True)
+        try:
+            result = endpoint(**kwargs, **{db_parameter: session})
+            if adapter is not None and not isinstance(result, Response):
+                result = adapter.validate_python(result, from_attributes=True)
+            return result
+        finally:
+            _on_event_loop.reset(token)
+
+    @functools.wraps(endpoint)
+    async def async_endpoint(**kwargs):
+        db: AsyncSession = kwargs.pop(db_parameter)
+        return await db.run_sync(call, kwargs)
+
+    async_endpoint.__signature__ = signature.replace(parameters=[
+        parameter.replace(default=Depends(get_async_db)) if parameter.name == db_parameter else parameter
+        for parameter in signature.parameters.values()
+    ])
+    return async_endpoint
+
+
+def make_async_router(router: APIRouter) -> APIRouter:
+    """
+    Build an async copy of a router
+
+    Args:
+        router: Router whose endpoints use `db: Session = Depends(get_db)`
+
+    Returns:
+        Router with the same paths, models and docs, backed by get_async_db
+    """
+    async_router = APIRouter()
+
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+
+        db_parameter = _db_parameter(route.endpoint)
+        if db_parameter and not getattr(route.endpoint, "runs_in_threadpool", False):
+            endpoint = _async_endpoint(route, db_parameter)
+        else:
+            endpoint = route.endpoint
+        async_router.add_api_route(
+            route.path,
+            endpoint,
+            **{option: getattr(route, option) for option in ROUTE_OPTIONS}
+        )
+
+    return async_router
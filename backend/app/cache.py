@@ -0,0 +1,244 @@
+"""
+Query Result Cache
+Caches rendered read responses, invalidated by per-table version counters
+
+Every cache key includes the current version of each table the response
+reads. Write handlers bump those versions after committing, which makes every
+older entry unreachable at once; entries then age out through the LRU/TTL.
+Versions are read before the database is queried, so a response computed
+from pre-write data is always stored under a pre-write version.
+
+Backends:
+    memory  In-process LRU with TTL and a size limit (per worker process)
+    redis   Shared Redis (or compatible) server; versions are shared too
+    none    Caching disabled
+
+With several worker processes use the redis backend: the memory backend's
+versions are only bumped in the worker that handled the write, so other
+workers may serve an entry until its TTL expires.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from app.async_routes import run_blocking
+from app.conditional import is_not_modified
+from app.responses import render_body
+
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 30))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Response headers kept with a cached body
+CACHED_HEADERS = ("etag", "last-modified", "cache-control", "x-next-cursor")
+
+
+class MemoryCacheBackend:
+    """Thread-safe LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: int = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, tuple]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: tuple):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def versions(self, tables: list[str]) -> list[int]:
+        with self._lock:
+            return [self._versions.get(table, 0) for table in tables]
+
+    def bump(self, tables: list[str]):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Redis-compatible backend; requires the redis package"""
+
+    def __init__(self, url: str = REDIS_URL, ttl: int = CACHE_TTL_SECONDS):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.evictions = 0
+
+    def get(self, key: str) -> tuple | None:
+        raw = run_blocking(self.client.get, f"cache:{key}")
+        if raw is None:
+            return None
+        headers_length = int.from_bytes(raw[:4], "big")
+        return json.loads(raw[4:4 + headers_length]), raw[4 + headers_length:]
+
+    def set(self, key: str, value: tuple):
+        headers, body = value
+        encoded = json.dumps(headers).encode()
+        run_blocking(self.client.set, f"cache:{key}", len(encoded).to_bytes(4, "big") + encoded + body, ex=self.ttl)
+
+    def versions(self, tables: list[str]) -> list[int]:
+        values = run_blocking(self.client.mget, [f"cache-version:{table}" for table in tables])
+        return [int(value or 0) for value in values]
+
+    def bump(self, tables: list[str]):
+        pipeline = self.client.pipeline()
+        for table in tables:
+            pipeline.incr(f"cache-version:{table}")
+        run_blocking(pipeline.execute)
+
+    def size(self) -> int | None:
+        return None
+
+
+class ResultCache:
+    """
+    Response cache used by the read handlers
+
+    Handlers call lookup() first and return its response on a hit; on a miss
+    they build their result as usual and return store(...).
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _key(self, request: Request, tables: list[str]) -> str:
+        """Path, query string and the versions of every table the response reads"""
+        versions = self.backend.versions(tables)
+        query = "&".join(sorted(f"{name}={value}" for name, value in request.query_params.multi_items()))
+        raw = f"{request.url.path}?{query}|" + ",".join(f"{t}:{v}" for t, v in zip(tables, versions))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def lookup(self, request: Request, tables: list[str]) -> Response | None:
+        """
+        Return the cached response for this request, or None on a miss
+
+        A hit whose ETag / Last-Modified satisfies the request's validators is
+        answered with 304.
+        """
+        if not self.enabled:
+            return None
+
+        key = self._key(request, tables)
+        request.state.cache_key = key
+        cached = self.backend.get(key)
+
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if cached is None:
+            return None
+
+        headers, body = cached
+        last_modified = headers.get("last-modified")
+        if "etag" in headers and is_not_modified(
+            request, headers["etag"], parsedate_to_datetime(last_modified) if last_modified else None
+        ):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def store(
+        self,
+        request: Request,
+        response: Response,
+        response_model,
+        result,
+        fields: tuple[str, ...] | None = None
+    ) -> Response:
+        """
+        Render a result with its response model, cache it under the key from
+        lookup(), and return it as a response carrying the handler's headers
+
+        Args:
+            request: The request passed to lookup()
+            response: The handler's response, whose validator and cursor headers are kept
+            response_model: The route's response model (None for plain JSON data)
+            result: What the handler would otherwise return
+            fields: Only render these fields (sparse fieldsets)
+        """
+        body = render_body(response_model, result, fields)
+        headers = {name: value for name, value in response.headers.items() if name in CACHED_HEADERS}
+
+        key = getattr(request.state, "cache_key", None)
+        if self.enabled and key is not None:
+            self.backend.set(key, (headers, body))
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *tables: str):
+        """Bump table versions after a committed write"""
+        if not self.enabled:
+            return
+        self.backend.bump(list(tables))
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': CACHE_BACKEND,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'invalidations': self.invalidations,
+            'evictions': self.backend.evictions if self.enabled else 0,
+            'entries': self.backend.size() if self.enabled else 0,
+        }
+
+
+def _create_backend():
+    if CACHE_BACKEND == "memory":
+        return MemoryCacheBackend()
+    if CACHE_BACKEND == "redis":
+        return RedisCacheBackend()
+    if CACHE_BACKEND == "none":
+        return None
+    raise ValueError(f"Unknown CACHE_BACKEND '{CACHE_BACKEND}'")
+
+
+# Shared cache used by the routers
+result_cache = ResultCache(_create_backend())
@@ -0,0 +1,146 @@
+"""
+Conditional GET Support
+ETag and Last-Modified validators computed from updated_at, so unchanged
+resources are answered with 304 before they are loaded or serialised
+
+Single resources get a strong ETag from their primary key and last
+modification time. Lists get a weak ETag from the page actually returned:
+each row's key and modification time plus the next-page cursor. It is
+computed from the page query's own rows, so a list request never aggregates
+over the whole filtered table; a 304 still saves rendering and transfer.
+
+HTTP dates have whole-second resolution, so Last-Modified is only sent (and
+If-Modified-Since only honoured) once the second of the last modification
+is over; until then a later edit in the same second would be invisible to it.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+from sqlalchemy import func
+
+from app.pagination import NEXT_CURSOR_HEADER
+
+
+# Clients may keep a copy but must revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def _modified_column(model):
+    """Last modification time of a row; updated_at is NULL until the first update"""
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # SQLite returns aggregates over datetimes as text
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _settled(last_modified: datetime) -> bool:
+    """Whether no further modification can fall in the same second as last_modified"""
+    return last_modified.replace(microsecond=0) < datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _etag(parts: list, weak: bool = False) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """Whether the request's validators match the current ETag / Last-Modified"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None and _settled(last_modified):
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _validate(request: Request, response: Response, etag: str, last_modified: datetime | None) -> Response | None:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None and _settled(last_modified):
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+def check_resource(request: Request, response: Response, db, model, resource_id, variant: str = "") -> Response | None:
+    """
+    Validate a conditional GET for one resource
+
+    Only the row's modification time is read. Sets ETag and Last-Modified on
+    the response, or returns a 304 response the handler should return as is.
+    Returns None without headers when the row does not exist, so the handler's
+    own not-found handling applies.
+
+    Args:
+        request: Incoming request (If-None-Match / If-Modified-Since)
+        response: Response to set validators on
+        db: Database session
+        model: Mapped class with created_at and updated_at
+        resource_id: Primary key value
+        variant: Anything else the representation depends on (e.g. selected fields)
+    """
+    primary_key = model.__mapper__.primary_key[0]
+    row = db.query(_modified_column(model)).filter(primary_key == resource_id).first()
+    if row is None:
+        return None
+
+    last_modified = _as_utc(row[0])
+    etag = _etag([model.__tablename__, resource_id, last_modified.isoformat() if last_modified else "", variant])
+    return _validate(request, response, etag, last_modified)
+
+
+def page_columns(model) -> tuple:
+    """Attributes check_page reads; pass them to load_fields so sparse fieldsets still load them"""
+    return getattr(model, model.__mapper__.primary_key[0].key), model.created_at, model.updated_at
+
+
+def check_page(request: Request, response: Response, model, rows: list) -> Response | None:
+    """
+    Validate a conditional GET for one page of a list
+
+    Call after paginate(). The weak ETag covers every row's primary key and
+    modification time and the next-page cursor, so edits to the page and
+    inserts or deletes that shift it all change it. Paging parameters are part
+    of the URL the ETag belongs to. No Last-Modified is sent: a page's newest
+    modification time does not change when rows leave it.
+
+    Args:
+        request: Incoming request
+        response: Response with paginate()'s headers, to set validators on
+        model: Mapped class with created_at and updated_at
+        rows: The page's rows, loaded with page_columns()
+    """
+    primary_key = model.__mapper__.primary_key[0].key
+    parts = [model.__tablename__, response.headers.get(NEXT_CURSOR_HEADER, "")]
+    for row in rows:
+        modified = _as_utc(row.updated_at or row.created_at)
+        parts.append(f"{getattr(row, primary_key)}@{modified.isoformat() if modified else ''}")
+
+    etag = _etag(parts, weak=True)
+    return _validate(request, response, etag, None)
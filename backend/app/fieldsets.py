@@ -0,0 +1,55 @@
+"""
+Sparse Fieldsets
+Parses the ?fields= query parameter and limits the SQL column list to match
+"""
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy.orm import load_only
+
+
+# Shared query parameter declaration for endpoints that support sparse fieldsets
+FIELDS_QUERY = Query(None, description="Comma-separated attributes to return, e.g. fields=employee_id,net_pay")
+
+
+def parse_fields(fields: str | None, schema) -> tuple[str, ...] | None:
+    """
+    Validate a comma-separated field list against a response schema
+
+    Returns:
+        Requested fields in schema order, or None to return every field
+
+    Raises:
+        HTTPException: If a field is not part of the schema
+    """
+    if fields is None:
+        return None
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    if not requested:
+        return None
+
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                   f"Allowed: {', '.join(schema.model_fields)}"
+        )
+
+    return tuple(field for field in schema.model_fields if field in requested)
+
+
+def load_fields(query, model, fields: tuple[str, ...] | None, *keep):
+    """
+    Restrict a query's SELECT to the requested fields
+
+    Args:
+        query: Query over model
+        model: Mapped class
+        fields: Result of parse_fields (None leaves the query unchanged)
+        *keep: Extra attributes the handler itself reads, such as sort keys
+    """
+    if fields is None:
+        return query
+    attributes = [getattr(model, field) for field in fields] + list(keep)
+    return query.options(load_only(*attributes))
@@ -0,0 +1,156 @@
+"""
+Idempotency Keys
+Safe client retries for POST endpoints that create resources
+
+A client sends a unique Idempotency-Key header (e.g. a UUID) with a POST and
+reuses it when retrying after a timeout. The first request reserves the key,
+runs, and stores its response; retries with the same key and body get the
+stored response replayed (marked with Idempotent-Replayed: true) instead of
+running again. Failed requests release their key so they can be retried.
+
+    same key, request still running   409 Conflict
+    same key, different body          422 Unprocessable Entity
+    key older than IDEMPOTENCY_TTL_HOURS   treated as new
+
+Keys are scoped per endpoint and stored in the idempotency_keys table, so
+every API replica sees them.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Header, HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import IdempotencyKey
+from app.responses import render_body
+
+
+# Stored responses are replayed for this long
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", 24))
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Shared declaration of the optional header, for endpoint signatures
+IDEMPOTENCY_KEY_HEADER = Header(
+    None,
+    alias="Idempotency-Key",
+    max_length=255,
+    description="Unique key (e.g. a UUID) that makes retries of this request return the first response"
+)
+
+
+def _request_hash(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+class IdempotentRequest:
+    """
+    Reserve an idempotency key for the duration of a handler
+
+    Usage:
+        with IdempotentRequest(db, idempotency_key, "POST /pay-runs/", data) as request:
+            if request.replay is not None:
+                return request.replay
+            ...
+            return request.respond(PayRunSchema, pay_run, status.HTTP_201_CREATED)
+
+    Without a key every method is a no-op and respond() returns the result
+    unchanged. If the block raises, the reservation is released.
+
+    Raises:
+        HTTPException: 409 if the key's first request is still running,
+            422 if the key was used with a different request body
+    """
+
+    def __init__(self, db: Session, key: str | None, scope: str, payload: BaseModel):
+        self.db = db
+        self.key = key
+        self.scope = scope
+        self.request_hash = _request_hash(payload) if key is not None else None
+        self.replay: Response | None = None
+
+    def _find(self) -> IdempotencyKey | None:
+        return self.db.query(IdempotencyKey).filter(
+            IdempotencyKey.key == self.key, IdempotencyKey.scope == self.scope
+        ).first()
+
+    def _reserve(self) -> IdempotencyKey | None:
+        """Insert the reservation; returns the existing record if the key is taken"""
+        self.db.add(IdempotencyKey(
+            key=self.key, scope=self.scope, request_hash=self.request_hash, created_at=datetime.now(timezone.utc)
+        ))
+        try:
+            self.db.commit()
+            return None
+        except IntegrityError:
+            # A concurrent request reserved the key first
+            self.db.rollback()
+            record = self._find()
+            if record is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still being processed"
+                )
+            return record
+
+    def __enter__(self) -> "IdempotentRequest":
+        if self.key is None:
+            return self
+
+        # Purge expired keys (this one included) so they can be reused
+        self.db.query(IdempotencyKey).filter(
+            IdempotencyKey.created_at < datetime.now(timezone.utc) - timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+        record = self._find()
+        if record is None:
+            record = self._reserve()
+            if record is None:
+                return self
+
+        if record.request_hash != self.request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request body"
+            )
+        if record.status_code is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
+        self.replay = Response(
+            content=record.response_body,
+            status_code=record.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"}
+        )
+        return self
+
+    def respond(self, response_model, result, status_code: int):
+        """Store the response for replays and return it"""
+        if self.key is None:
+            return result
+
+        body = render_body(response_model, result)
+        self.db.query(IdempotencyKey).filter(
+            IdempotencyKey.key == self.key, IdempotencyKey.scope == self.scope
+        ).update({IdempotencyKey.status_code: status_code, IdempotencyKey.response_body: body.decode()},
+                 synchronize_session=False)
+        self.db.commit()
+        return Response(content=body, status_code=status_code, media_type="application/json")
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None and self.key is not None and self.replay is None:
+            self.db.rollback()
+            self.db.query(IdempotencyKey).filter(
+                IdempotencyKey.key == self.key,
+                IdempotencyKey.scope == self.scope,
+                IdempotencyKey.status_code.is_(None)
+            ).delete(synchronize_session=False)
+            self.db.commit()
+        return False
@@ -3,14 +3,21 @@ FastAPI Main Application Entry Point
 Payroll Management System
 """
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
-from app.database import engine, Base
+from app.database import engine, async_engine, Base, SessionLocal, DATABASE_ASYNC, create_missing_indexes
 from app.auth import verify_api_key
+from app.pagination import NEXT_CURSOR_HEADER
+from app.cache import result_cache
+from app.metrics import metrics, instrument_engine, MetricsMiddleware, METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE
+from app.query_audit import audit_request, enable_raiseload, QUERY_AUDIT_ENABLED, QUERY_AUDIT_RAISELOAD
+from app.services.parallel_payroll import shutdown_payroll_executor
+from app.services.jobs import start_job_worker, stop_job_worker
+from app.services.payroll_totals import ensure_populated
 
 # Load environment variables
 load_dotenv()
@@ -20,9 +27,19 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     # Startup
     Base.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+    db = SessionLocal()
+    try:
+        ensure_populated(db)
+    finally:
+        db.close()
+    start_job_worker()
     yield
     # Shutdown
-    pass
+    stop_job_worker()
+    shutdown_payroll_executor()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 # Initialize FastAPI app
@@ -42,8 +59,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
 )
 
+# Per-route latency, status, size and SQL metrics for /metrics; the query
+# audit (N+1 and query budget checks) relies on the same per-request counts
+if METRICS_ENABLED or QUERY_AUDIT_ENABLED:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine, "async")
+    app.add_middleware(MetricsMiddleware, audit=audit_request if QUERY_AUDIT_ENABLED else None)
+
+if QUERY_AUDIT_RAISELOAD:
+    enable_raiseload()
+
 
 # Root endpoint
 @app.get("/")
@@ -62,34 +91,61 @@ async def health_check():
     return {"status": "healthy"}
 
 
+# Result cache hit/miss statistics
+@app.get("/api/v1/cache/stats", tags=["Monitoring"], dependencies=[Depends(verify_api_key)])
+async def cache_stats():
+    return result_cache.stats()
+
+
+# Prometheus scrape endpoint (no payroll data, only request and pool statistics)
+@app.get("/metrics", tags=["Monitoring"], include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.render(result_cache.stats()), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # Import and include routers
-from app.routers import employees, work_hours, pay_runs, taxes_deductions
+from app.routers import employees, work_hours, pay_runs, taxes_deductions, jobs
+
+
+def api_router(router):
+    """Router as served: re-registered on the async engine when DATABASE_ASYNC is enabled"""
+    if DATABASE_ASYNC:
+        from app.async_routes import make_async_router
+        return make_async_router(router)
+    return router
+
 
 # Apply API key authentication to all API routes
 app.include_router(
-    employees.router, 
+    api_router(employees.router), 
     prefix="/api/v1/employees", 
     tags=["Employees"],
     dependencies=[Depends(verify_api_key)]
 )
 app.include_router(
-    work_hours.router, 
+    api_router(work_hours.router), 
     prefix="/api/v1/work-hours", 
     tags=["Work Hours"],
     dependencies=[Depends(verify_api_key)]
 )
 app.include_router(
-    pay_runs.router, 
+    api_router(pay_runs.router), 
     prefix="/api/v1/pay-runs", 
     tags=["Pay Runs"],
     dependencies=[Depends(verify_api_key)]
 )
 app.include_router(
-    taxes_deductions.router, 
+    api_router(taxes_deductions.router), 
     prefix="/api/v1/taxes-deductions", 
     tags=["Taxes & Deductions"],
     dependencies=[Depends(verify_api_key)]
 )
+app.include_router(
+    api_router(jobs.router), 
+    prefix="/api/v1/jobs", 
+    tags=["Jobs"],
+    dependencies=[Depends(verify_api_key)]
+)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,270 @@
+"""
+Request Metrics
+Per-route latency, status, size and SQL statistics in Prometheus text format
+
+MetricsMiddleware is a pure ASGI middleware, so the handler runs in the same
+context as the middleware and the per-request statistics kept in a
+ContextVar also see statements issued from threadpool handlers and from the
+async engine's greenlets. Routes are labelled by their path template
+(e.g. /api/v1/pay-runs/{pay_run_id}/), never by the raw URL.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+# Label for requests that matched no route, so unknown URLs don't create new series
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """SQL activity of the request being served"""
+
+    __slots__ = ("statements", "db_seconds", "queries", "budget")
+
+    def __init__(self, audit: bool = False):
+        self.statements = 0
+        self.db_seconds = 0.0
+        # Executions per statement text, kept only when the query audit is on
+        self.queries: Counter | None = Counter() if audit else None
+        # Declared by the route through query_budget()
+        self.budget: int | None = None
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    """Statistics of the current request, or None outside a request"""
+    return _request_stats.get()
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            # Bucket counts, then sum and count
+            series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class MetricsRegistry:
+    """Counters and histograms collected by the middleware and SQL hooks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests: dict[tuple, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.db_statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.statements_total = 0
+        self.statement_seconds_total = 0.0
+        self.engines: dict[str, object] = {}
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, size: int, stats: RequestStats):
+        labels = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            key = (method, route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.observe(labels, seconds)
+            self.response_bytes.observe(labels, size)
+            self.db_statements.observe(labels, stats.statements)
+            self.db_seconds.observe(labels, stats.db_seconds)
+
+    def statement_executed(self, seconds: float):
+        with self._lock:
+            self.statements_total += 1
+            self.statement_seconds_total += seconds
+
+    def _histogram(self, lines: list, name: str, help_text: str, histogram: Histogram, label_names: tuple):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, series in sorted(histogram.series.items()):
+            bounds = [*histogram.buckets, "+Inf"]
+            for bound, count in zip(bounds, series[:len(histogram.buckets)] + [series[-1]]):
+                lines.append(f"{name}_bucket{_labels((*label_names, 'le'), (*labels, bound))} {count}")
+            lines.append(f"{name}_sum{_labels(label_names, labels)} {series[-2]}")
+            lines.append(f"{name}_count{_labels(label_names, labels)} {series[-1]}")
+
+    def _gauge(self, lines: list, name: str, help_text: str, samples: list, label_names: tuple = (), kind: str = "gauge"):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(label_names, labels)} {value}")
+
+    def _pool_samples(self) -> dict[str, list]:
+        samples = {"size": [], "checked_out": [], "overflow": []}
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            # Only queue pools report these; SQLite's single-connection pools don't
+            if not hasattr(pool, "checkedout"):
+                continue
+            samples["size"].append(((name,), pool.size()))
+            samples["checked_out"].append(((name,), pool.checkedout()))
+            # overflow() counts up from -pool_size until the pool is exhausted
+            samples["overflow"].append(((name,), max(pool.overflow(), 0)))
+        return samples
+
+    def render(self, cache_stats: dict | None = None) -> str:
+        """All metrics in Prometheus text exposition format"""
+        lines: list[str] = []
+        route = ("method", "route")
+
+        with self._lock:
+            self._gauge(lines, "http_requests_in_flight", "Requests currently being served", [((), self.in_flight)])
+            self._gauge(
+                lines, "http_requests_total", "Completed requests",
+                sorted(self.requests.items()), ("method", "route", "status"), kind="counter"
+            )
+            self._histogram(lines, "http_request_duration_seconds", "Request latency", self.latency, route)
+            self._histogram(lines, "http_response_size_bytes", "Response body size", self.response_bytes, route)
+            self._histogram(lines, "http_request_db_statements", "SQL statements per request", self.db_statements, route)
+            self._histogram(lines, "http_request_db_seconds", "Time spent in SQL per request", self.db_seconds, route)
+            self._gauge(lines, "db_statements_total", "SQL statements executed", [((), self.statements_total)], kind="counter")
+            self._gauge(
+                lines, "db_statement_seconds_total", "Time spent executing SQL",
+                [((), self.statement_seconds_total)], kind="counter"
+            )
+
+        pool = self._pool_samples()
+        self._gauge(lines, "db_pool_size", "Configured connection pool size", pool["size"], ("engine",))
+        self._gauge(lines, "db_pool_checked_out", "Connections currently checked out", pool["checked_out"], ("engine",))
+        self._gauge(lines, "db_pool_overflow", "Connections open beyond the pool size", pool["overflow"], ("engine",))
+
+        if cache_stats is not None:
+            self._gauge(lines, "result_cache_hits_total", "Result cache hits", [((), cache_stats["hits"])], kind="counter")
+            self._gauge(lines, "result_cache_misses_total", "Result cache misses", [((), cache_stats["misses"])], kind="counter")
+            self._gauge(
+                lines, "result_cache_invalidations_total", "Result cache invalidations",
+                [((), cache_stats["invalidations"])], kind="counter"
+            )
+            self._gauge(
+                lines, "result_cache_evictions_total", "Result cache evictions",
+                [((), cache_stats["evictions"])], kind="counter"
+            )
+            if cache_stats["entries"] is not None:
+                self._gauge(lines, "result_cache_entries", "Result cache entries", [((), cache_stats["entries"])])
+
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry used by the middleware, SQL hooks and /metrics
+metrics = MetricsRegistry()
+
+
+def instrument_engine(engine, name: str = "default"):
+    """
+    Count statements and time spent in SQL for an engine
+
+    Args:
+        engine: Sync Engine (pass async_engine.sync_engine for the async engine)
+        name: Engine label for the pool metrics
+    """
+    metrics.engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start_time"].pop()
+        metrics.statement_executed(seconds)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += seconds
+            # Row-by-row INSERTs come from the unit of work's flush, not from application loops
+            if stats.queries is not None and not (context is not None and context.isinsert):
+                stats.queries[statement] += 1
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status, size and SQL use per route
+
+    Args:
+        app: The wrapped ASGI app
+        audit: Optional callable(method, route, stats, response_started) run
+            before the response starts and again after it ends if a streaming
+            body issued more statements, with per-statement counts collected
+            (see app.query_audit)
+    """
+
+    def __init__(self, app, audit=None):
+        self.app = app
+        self.audit = audit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(audit=self.audit is not None)
+        token = _request_stats.set(stats)
+        result = {"status": 500, "size": 0}
+        audited = {"statements": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                if self.audit is not None:
+                    # Raising here still turns the request into a 500
+                    audited["statements"] = stats.statements
+                    self.audit(scope["method"], getattr(scope.get("route"), "path", UNMATCHED_ROUTE), stats, False)
+                result["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                result["size"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.request_started()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            metrics.request_finished(
+                scope["method"], route, result["status"], time.perf_counter() - start, result["size"], stats
+            )
+            _request_stats.reset(token)
+
+        if self.audit is not None and audited["statements"] not in (None, stats.statements):
+            self.audit(scope["method"], route, stats, True)
@@ -3,15 +3,25 @@ SQLAlchemy Database Models
 Defines the database schema for the Payroll Management System
 """
 
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum, ForeignKey, Text, Boolean, Numeric
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum, ForeignKey, Text, Boolean, Numeric, Index, UniqueConstraint, JSON, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from datetime import datetime
+from datetime import datetime, timezone
 import enum
 
 from app.database import Base
 
 
+def utcnow() -> datetime:
+    """
+    Timestamp for created_at / updated_at, set in Python rather than by the database
+
+    SQLite's CURRENT_TIMESTAMP has whole-second resolution, so two edits in the
+    same second would leave updated_at (and the ETag derived from it) unchanged.
+    """
+    return datetime.now(timezone.utc)
+
+
 # Enums
 class PayType(str, enum.Enum):
     """Employee payment type"""
@@ -32,6 +42,18 @@ class PaymentStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+class JobStatus(str, enum.Enum):
+    """Lifecycle of a background job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+# Pay runs that count towards the one-per-employee-and-period rule (enum names are stored)
+PAY_RUN_UNIQUE_WHERE = text("payment_status != 'CANCELLED'")
+
+
 # Models
 class TaxDeductionProfile(Base):
     """
@@ -61,8 +83,8 @@ class TaxDeductionProfile(Base):
     
     # Metadata
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
     
     # Relationships
     employees = relationship("Employee", back_populates="tax_deduction_profile")
@@ -105,8 +127,8 @@ class Employee(Base):
     
     # Metadata
     notes = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
     
     # Relationships
     tax_deduction_profile = relationship("TaxDeductionProfile", back_populates="employees")
@@ -135,11 +157,24 @@ class WorkHours(Base):
     is_approved = Column(Boolean, default=False, nullable=False)
     
     # Metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
     
     # Relationships
     employee = relationship("Employee", back_populates="work_hours")
+    
+    __table_args__ = (
+        # Covers the approved-hours sums used by pay calculations (index-only on PostgreSQL)
+        Index(
+            "ix_work_hours_employee_approved_date",
+            "employee_id", "is_approved", "date",
+            postgresql_include=["hours_worked", "overtime_hours"]
+        ),
+        # Keyset pagination sort key for the work hours list
+        Index("ix_work_hours_date_record_id", "date", "record_id"),
+        # One record per employee and day; the conflict target of batch upserts
+        Index("uq_work_hours_employee_date", "employee_id", "date", unique=True),
+    )
 
 
 class PayRun(Base):
@@ -190,9 +225,153 @@ class PayRun(Base):
     notes = Column(Text, nullable=True)
     
     # Metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
     processed_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     employee = relationship("Employee", back_populates="pay_runs")
+
+    __table_args__ = (
+        # Keyset pagination sort key for the pay run list
+        Index("ix_pay_runs_start_period_pay_run_id", "start_period", "pay_run_id"),
+        # One live pay run per employee and period; cancelled runs may be re-issued
+        Index(
+            "uq_pay_runs_employee_period", "employee_id", "start_period", "end_period",
+            unique=True, postgresql_where=PAY_RUN_UNIQUE_WHERE, sqlite_where=PAY_RUN_UNIQUE_WHERE
+        ),
+    )
+
+
+class PayrollPeriodTotal(Base):
+    """
+    Payroll Period Totals
+    Rollup of pay run totals per pay period and payment status.
+    Maintained in the same transaction as every pay run change (see app.services.payroll_totals)
+    """
+    __tablename__ = "payroll_period_totals"
+    
+    total_id = Column(Integer, primary_key=True, index=True)
+    
+    # Rollup key
+    start_period = Column(Date, nullable=False)
+    end_period = Column(Date, nullable=False)
+    payment_status = Column(Enum(PaymentStatus), nullable=False)
+    
+    # Totals
+    pay_run_count = Column(Integer, default=0, nullable=False)
+    total_gross_pay = Column(Numeric(14, 2), default=0.0, nullable=False)
+    total_taxes = Column(Numeric(14, 2), default=0.0, nullable=False)
+    total_deductions = Column(Numeric(14, 2), default=0.0, nullable=False)
+    total_net_pay = Column(Numeric(14, 2), default=0.0, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint(
+            "start_period", "end_period", "payment_status",
+            name="uq_payroll_period_totals_period_status"
+        ),
+    )
+
+
+class PITScheduleVersion(Base):
+    """
+    PIT Schedule Versions
+    Versioned Personal Income Tax bracket tables, applied from their effective date
+    """
+    __tablename__ = "pit_schedule_versions"
+    
+    version_id = Column(Integer, primary_key=True, index=True)
+    effective_date = Column(Date, nullable=False, unique=True, index=True)
+    description = Column(Text, nullable=True)
+    
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    brackets = relationship(
+        "PITBracket",
+        back_populates="version",
+        cascade="all, delete-orphan",
+        order_by="PITBracket.lower_limit"
+    )
+
+
+class PITBracket(Base):
+    """
+    PIT Brackets
+    One marginal rate band of a PIT schedule version (annual income in Naira)
+    """
+    __tablename__ = "pit_brackets"
+    
+    bracket_id = Column(Integer, primary_key=True, index=True)
+    version_id = Column(Integer, ForeignKey("pit_schedule_versions.version_id"), nullable=False, index=True)
+    
+    # Band starts at lower_limit and runs to the next bracket's lower_limit
+    lower_limit = Column(Numeric(14, 2), nullable=False)
+    rate = Column(Numeric(5, 4), nullable=False)
+    
+    # Relationships
+    version = relationship("PITScheduleVersion", back_populates="brackets")
+
+
+class Job(Base):
+    """
+    Background Jobs
+    Long-running payroll operations queued by the API and run by the job
+    workers (see app.services.jobs)
+    """
+    __tablename__ = "jobs"
+    
+    job_id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    
+    # Handler input and output
+    params = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    
+    # Progress reported by the handler, e.g. employees processed of the batch
+    progress_done = Column(Integer, default=0, nullable=False)
+    progress_total = Column(Integer, nullable=True)
+    
+    # Claim and lease: a running job whose heartbeat stops is picked up again
+    attempts = Column(Integer, default=0, nullable=False)
+    locked_by = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_jobs_status_job_id", "status", "job_id"),
+    )
+
+
+class IdempotencyKey(Base):
+    """
+    Idempotency Keys
+    Responses of POST requests sent with an Idempotency-Key header, replayed
+    when a client retries the same request (see app.idempotency)
+    """
+    __tablename__ = "idempotency_keys"
+    
+    key_id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), nullable=False)
+    # Endpoint the key was used on; the same key may be reused on another endpoint
+    scope = Column(String(100), nullable=False)
+    # SHA-256 of the request body, so a key reused with a different body is rejected
+    request_hash = Column(String(64), nullable=False)
+    
+    # Stored response; NULL while the first request is still being processed
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    
+    # Expired keys are purged by age
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("key", "scope", name="uq_idempotency_keys_key_scope"),
+    )
@@ -0,0 +1,108 @@
+"""
+Keyset Pagination
+Opaque cursors for list endpoints, keyed on each endpoint's sort order
+
+A cursor holds the sort key of the last row on a page. The next page is
+fetched with a row-value comparison against that key, which an index on the
+sort columns answers directly however deep the page is.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    """Encode a row's sort key as a URL-safe token"""
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """
+    Decode a cursor produced by encode_cursor for the given sort columns
+
+    Raises:
+        ValueError: If the cursor is malformed or does not match the columns
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Malformed cursor")
+
+    if not isinstance(payload, list) or len(payload) != len(columns):
+        raise ValueError("Cursor does not match this endpoint's sort order")
+
+    values = []
+    for column, value in zip(columns, payload):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                values.append(date.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        except (ValueError, TypeError):
+            raise ValueError("Cursor does not match this endpoint's sort order")
+    return values
+
+
+def paginate(
+    query,
+    order_by: list,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    descending: bool = False
+) -> list:
+    """
+    Fetch one page of a query by offset or by cursor
+
+    The next-page cursor is set in the X-Next-Cursor header whenever more rows
+    follow, so offset clients can switch to cursors at any page.
+
+    Args:
+        query: Filtered query whose entities expose the order_by attributes
+        order_by: Columns forming a unique sort key, e.g. [WorkHours.date, WorkHours.record_id]
+        response: Response to set the next-cursor header on
+        skip: Offset (only without a cursor)
+        limit: Page size
+        cursor: Cursor from a previous page's X-Next-Cursor header
+        descending: Sort every key column descending
+
+    Raises:
+        HTTPException: If the cursor is invalid or combined with skip
+    """
+    if cursor is not None:
+        if skip:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either skip or cursor, not both"
+            )
+        try:
+            after = decode_cursor(cursor, order_by)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        key = tuple_(*order_by)
+        query = query.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+
+    query = query.order_by(*[column.desc() if descending else column for column in order_by])
+    if cursor is None and skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], column.key) for column in order_by])
+
+    return rows
@@ -0,0 +1,120 @@
+"""
+Query Audit
+Debug/test mode that flags N+1 query patterns and enforces per-route query budgets
+
+With QUERY_AUDIT=warn or strict, every SQL statement a request issues is
+counted by its text. Bound parameters are not part of the text, so the same
+statement run once per row (the N+1 pattern) shows up as one statement with a
+high count. When the handler returns, before the response starts:
+
+    warn    problems are logged
+    strict  problems raise QueryAuditError, which fails the request with a
+            500 and, under TestClient, fails the test that made it
+
+Statements a streaming body issues after the response has started are
+checked once it ends; by then the response cannot be failed, so strict mode
+logs them as errors.
+
+Routes declare a budget with dependencies=[Depends(query_budget(n))].
+
+QUERY_AUDIT_RAISELOAD=true additionally makes every ORM query load its
+relationships with raiseload("*") unless the query asks for them (e.g. with
+selectinload), so an accidental lazy load raises instead of querying.
+"""
+
+import logging
+import os
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, raiseload
+
+from app.metrics import RequestStats, current_request_stats
+
+
+logger = logging.getLogger(__name__)
+
+# off, warn or strict
+QUERY_AUDIT = os.getenv("QUERY_AUDIT", "off").lower()
+# A statement run more often than this in one request is reported as N+1
+QUERY_AUDIT_REPEAT_LIMIT = int(os.getenv("QUERY_AUDIT_REPEAT_LIMIT", 3))
+QUERY_AUDIT_RAISELOAD = os.getenv("QUERY_AUDIT_RAISELOAD", "False").lower() == "true"
+
+if QUERY_AUDIT not in ("off", "warn", "strict"):
+    raise ValueError(f"Unknown QUERY_AUDIT '{QUERY_AUDIT}'")
+
+QUERY_AUDIT_ENABLED = QUERY_AUDIT != "off"
+
+
+class QueryAuditError(RuntimeError):
+    """A request exceeded its query budget or repeated a statement (strict mode)"""
+
+
+def query_budget(max_statements: int):
+    """
+    Route dependency declaring the most SQL statements a request may issue
+
+    Only checked when QUERY_AUDIT is enabled.
+
+    Usage:
+        @router.get("/", dependencies=[Depends(query_budget(4))])
+    """
+    def declare_budget():
+        stats = current_request_stats()
+        if stats is not None:
+            stats.budget = max_statements
+
+    return declare_budget
+
+
+def find_problems(stats: RequestStats, repeat_limit: int = QUERY_AUDIT_REPEAT_LIMIT) -> list[str]:
+    """Budget overrun and repeated statements of a finished request"""
+    problems = []
+    if stats.budget is not None and stats.statements > stats.budget:
+        problems.append(f"{stats.statements} statements exceed the budget of {stats.budget}")
+
+    for statement, count in stats.queries.most_common():
+        if count <= repeat_limit:
+            break
+        problems.append(f"statement repeated {count} times (possible N+1): {' '.join(statement.split())[:300]}")
+    return problems
+
+
+def audit_request(method: str, route: str, stats: RequestStats, response_started: bool = False):
+    """
+    Report a request's problems, raising in strict mode
+
+    Args:
+        response_started: The response has already been sent, so strict mode
+            can only log
+
+    Raises:
+        QueryAuditError: If QUERY_AUDIT=strict, the response has not started
+            and any problem was found
+    """
+    problems = find_problems(stats)
+    if not problems:
+        return
+
+    message = f"{method} {route}: " + "; ".join(problems)
+    if QUERY_AUDIT != "strict":
+        logger.warning("Query audit: %s", message)
+    elif response_started:
+        logger.error("Query audit (after the response started): %s", message)
+    else:
+        raise QueryAuditError(message)
+
+
+def _raiseload_by_default(orm_execute_state):
+    # Lazy loads, refreshes and expired-attribute loads must pass through unchanged
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+def enable_raiseload():
+    """Load relationships with raiseload("*") in every ORM query that doesn't load them explicitly"""
+    if not event.contains(Session, "do_orm_execute", _raiseload_by_default):
+        event.listen(Session, "do_orm_execute", _raiseload_by_default)
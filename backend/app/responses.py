@@ -0,0 +1,146 @@
+"""
+Response Rendering
+Standard and fast (orjson) JSON rendering for read endpoints
+
+By default responses are validated and serialised through their Pydantic
+response model, as FastAPI does. With FAST_JSON_RESPONSES=true, rows for flat
+response models are read straight from the ORM objects and encoded with
+orjson, skipping output validation: these rows come from our own mapped
+columns, so validating them again only repeats work. The JSON produced is
+the same in both modes (Decimals as strings for modelled responses, as
+numbers for unmodelled ones, UTC datetimes with a Z suffix).
+"""
+
+import os
+import typing
+from decimal import Decimal
+from typing import List
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+# Opt in to the orjson fast path for list and detail responses
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "False").lower() == "true"
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _decimal_as_str(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _decimal_as_float(value):
+    # Matches jsonable_encoder, which FastAPI uses when there is no response model
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+_adapters: dict = {}
+_row_fields: dict = {}
+_subset_models: dict = {}
+
+
+def _adapter(response_model) -> TypeAdapter:
+    adapter = _adapters.get(response_model)
+    if adapter is None:
+        adapter = _adapters[response_model] = TypeAdapter(response_model)
+    return adapter
+
+
+def _flat_fields(model) -> tuple[str, ...] | None:
+    """Field names of a model whose fields are all scalars, else None"""
+    if model not in _row_fields:
+        def nested(annotation) -> bool:
+            if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+                return True
+            return any(nested(arg) for arg in typing.get_args(annotation))
+
+        fields = model.model_fields
+        _row_fields[model] = None if any(nested(f.annotation) for f in fields.values()) else tuple(fields)
+    return _row_fields[model]
+
+
+def _subset_model(response_model, fields: tuple[str, ...]):
+    """The response model restricted to some fields (List[...] stays a list)"""
+    key = (response_model, fields)
+    if key not in _subset_models:
+        is_list = typing.get_origin(response_model) in (list, typing.List)
+        model = typing.get_args(response_model)[0] if is_list else response_model
+        subset = create_model(
+            f"{model.__name__}Fields",
+            __config__=ConfigDict(from_attributes=True),
+            **{field: (model.model_fields[field].annotation, model.model_fields[field]) for field in fields}
+        )
+        _subset_models[key] = List[subset] if is_list else subset
+    return _subset_models[key]
+
+
+def _fast_shape(response_model) -> tuple[bool, tuple[str, ...]] | None:
+    """(is_list, field names) when the fast path can render this response model"""
+    is_list = typing.get_origin(response_model) in (list, typing.List)
+    model = typing.get_args(response_model)[0] if is_list else response_model
+    if not (isinstance(model, type) and issubclass(model, BaseModel)):
+        return None
+    fields = _flat_fields(model)
+    return (is_list, fields) if fields is not None else None
+
+
+def _row(row, fields: tuple[str, ...]) -> dict:
+    if isinstance(row, dict):
+        return {field: row.get(field) for field in fields}
+    # Loaded column values sit in the instance dict; only unloaded ones need the descriptor
+    loaded = row.__dict__
+    return {field: loaded[field] if field in loaded else getattr(row, field) for field in fields}
+
+
+def render_body(response_model, result, fields: tuple[str, ...] | None = None) -> bytes:
+    """
+    Serialise a handler result to JSON bytes
+
+    Args:
+        response_model: The route's response model, or None for plain JSON data
+        result: ORM rows, dicts or models as the handler would return them
+        fields: Only render these fields of the response model (sparse fieldsets)
+    """
+    if response_model is None:
+        if FAST_JSON_RESPONSES:
+            return orjson.dumps(result, default=_decimal_as_float, option=ORJSON_OPTIONS)
+        return JSONResponse(jsonable_encoder(result)).body
+
+    if fields is not None:
+        response_model = _subset_model(response_model, fields)
+
+    if FAST_JSON_RESPONSES:
+        shape = _fast_shape(response_model)
+        if shape is not None:
+            is_list, fields = shape
+            content = [_row(row, fields) for row in result] if is_list else _row(result, fields)
+            return orjson.dumps(content, default=_decimal_as_str, option=ORJSON_OPTIONS)
+
+    adapter = _adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+
+
+def render(response: Response, response_model, result, fields: tuple[str, ...] | None = None):
+    """
+    Return a handler result, pre-rendered when FAST_JSON_RESPONSES is on
+
+    Without fast mode (and without a field selection) the result is returned
+    unchanged for FastAPI to serialise through the route's response model.
+    Otherwise it is encoded here and returned as a Response, carrying any
+    headers the handler set.
+    """
+    if not FAST_JSON_RESPONSES and fields is None:
+        return result
+    return Response(
+        content=render_body(response_model, result, fields),
+        media_type="application/json",
+        headers={name: value for name, value in response.headers.items() if name != "content-length"}
+    )
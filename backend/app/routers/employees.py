@@ -2,22 +2,31 @@
 Employee Management API Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.database import get_db
+from app.pagination import paginate
+from app.conditional import check_resource, check_page, page_columns
+from app.cache import result_cache
+from app.query_audit import query_budget
+from app.fieldsets import FIELDS_QUERY, parse_fields, load_fields
 from app.models import Employee, EmployeeStatus
 from app.schemas import Employee as EmployeeSchema, EmployeeCreate, EmployeeUpdate, EmployeeSummary
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[EmployeeSummary])
+@router.get("/", response_model=List[EmployeeSummary], dependencies=[Depends(query_budget(1))])
 def get_employees(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
     status: EmployeeStatus | None = None,
+    fields: str | None = FIELDS_QUERY,
     db: Session = Depends(get_db)
 ):
     """
@@ -25,25 +34,55 @@ def get_employees(
     
     - **skip**: Number of records to skip (for pagination)
     - **limit**: Maximum number of records to return
+    - **cursor**: Cursor from the previous page's X-Next-Cursor header (instead of skip)
     - **status**: Filter by employee status (active/inactive)
+    - **fields**: Comma-separated attributes to return (default: all)
     """
+    selected = parse_fields(fields, EmployeeSummary)
+    cached = result_cache.lookup(request, ["employees"])
+    if cached is not None:
+        return cached
+    
     query = db.query(Employee)
     
     if status:
         query = query.filter(Employee.status == status)
     
-    employees = query.offset(skip).limit(limit).all()
-    return employees
+    query = load_fields(query, Employee, selected, Employee.employee_id, *page_columns(Employee))
+    employees = paginate(query, [Employee.employee_id], response, skip=skip, limit=limit, cursor=cursor)
+    
+    not_modified = check_page(request, response, Employee, employees)
+    if not_modified is not None:
+        return not_modified
+    
+    return result_cache.store(request, response, List[EmployeeSummary], employees, selected)
 
 
-@router.get("/{employee_id}/", response_model=EmployeeSchema)
-def get_employee(employee_id: int, db: Session = Depends(get_db)):
+@router.get("/{employee_id}/", response_model=EmployeeSchema, dependencies=[Depends(query_budget(2))])
+def get_employee(
+    employee_id: int,
+    request: Request,
+    response: Response,
+    fields: str | None = FIELDS_QUERY,
+    db: Session = Depends(get_db)
+):
     """
     Get a specific employee by ID
     
     - **employee_id**: The employee's unique identifier
+    - **fields**: Comma-separated attributes to return (default: all)
     """
-    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
+    selected = parse_fields(fields, EmployeeSchema)
+    cached = result_cache.lookup(request, ["employees"])
+    if cached is not None:
+        return cached
+    
+    not_modified = check_resource(request, response, db, Employee, employee_id, variant=",".join(selected or ()))
+    if not_modified is not None:
+        return not_modified
+    
+    query = load_fields(db.query(Employee), Employee, selected)
+    employee = query.filter(Employee.employee_id == employee_id).first()
     
     if not employee:
         raise HTTPException(
@@ -51,7 +90,7 @@ def get_employee(employee_id: int, db: Session = Depends(get_db)):
             detail=f"Employee with ID {employee_id} not found"
         )
     
-    return employee
+    return result_cache.store(request, response, EmployeeSchema, employee, selected)
 
 
 @router.post("/", response_model=EmployeeSchema, status_code=status.HTTP_201_CREATED)
@@ -76,6 +115,7 @@ def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
     db_employee = Employee(**employee.model_dump())
     db.add(db_employee)
     db.commit()
+    result_cache.invalidate("employees")
     db.refresh(db_employee)
     
     return db_employee
@@ -120,6 +160,7 @@ def update_employee(
         setattr(db_employee, field, value)
     
     db.commit()
+    result_cache.invalidate("employees")
     db.refresh(db_employee)
     
     return db_employee
@@ -143,11 +184,12 @@ def delete_employee(employee_id: int, db: Session = Depends(get_db)):
     # Soft delete by setting status to inactive
     db_employee.status = EmployeeStatus.INACTIVE
     db.commit()
+    result_cache.invalidate("employees")
     
     return None
 
 
-@router.get("/{employee_id}/summary")
+@router.get("/{employee_id}/summary", dependencies=[Depends(query_budget(3))])
 def get_employee_summary(employee_id: int, db: Session = Depends(get_db)):
     """
     Get employee summary including recent pay runs and work hours
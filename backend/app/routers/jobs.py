@@ -0,0 +1,137 @@
+"""
+Background Jobs API Routes
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.database import get_db
+from app.pagination import paginate
+from app.models import Job, JobStatus
+from app.schemas import (
+    Job as JobSchema, PayRunBatchCreate, PayRunBulkRecalculate, PayRunExportJobCreate, PayRunRecalculateJobCreate
+)
+from app.services import jobs
+from app.services.pay_run_export import EXPORT_MEDIA_TYPES
+
+router = APIRouter()
+
+
+def get_job_or_404(db: Session, job_id: int) -> Job:
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    return job
+
+
+@router.get("/", response_model=List[JobSchema])
+def get_jobs(
+    response: Response,
+    kind: str | None = None,
+    status: JobStatus | None = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get jobs, newest first
+
+    - **kind**: Filter by job kind (pay_run_batch, pay_run_recalculate, pay_run_recalculate_pending, pay_run_export)
+    - **status**: Filter by status (queued/running/succeeded/failed)
+    - **skip**: Number of records to skip (pagination)
+    - **limit**: Maximum number of records to return
+    - **cursor**: Cursor from the previous page's X-Next-Cursor header (instead of skip)
+    """
+    query = db.query(Job)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    if status:
+        query = query.filter(Job.status == status)
+
+    return paginate(query, [Job.job_id], response, skip=skip, limit=limit, cursor=cursor, descending=True)
+
+
+@router.get("/{job_id}/", response_model=JobSchema)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Get a job's status, progress, result and error
+
+    - **job_id**: The ID of the job
+    """
+    return get_job_or_404(db, job_id)
+
+
+@router.get("/{job_id}/download/")
+def download_job_file(job_id: int, db: Session = Depends(get_db)):
+    """
+    Download the file written by a finished export job
+
+    - **job_id**: The ID of a pay_run_export job
+    """
+    job = get_job_or_404(db, job_id)
+    if job.kind != "pay_run_export":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only export jobs have a download"
+        )
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status.value}; the file is available once it has succeeded"
+        )
+
+    path = jobs.JOB_OUTPUT_DIR / job.result["file"]
+    if not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="The export file is no longer available"
+        )
+
+    media_type = "application/gzip" if job.params.get("gzip") else EXPORT_MEDIA_TYPES[job.params["format"]]
+    return FileResponse(path, media_type=media_type, filename=job.result["filename"])
+
+
+@router.post("/pay-run-batch/", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_pay_run_batch(batch_data: PayRunBatchCreate, db: Session = Depends(get_db)):
+    """
+    Queue batch pay run generation (same input as POST /pay-runs/batch/)
+
+    Poll GET /jobs/{job_id}/ for the created pay run IDs and per-employee errors.
+    """
+    return jobs.enqueue(db, "pay_run_batch", batch_data.model_dump(mode="json"))
+
+
+@router.post("/pay-run-recalculate/", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_pay_run_recalculate(recalculate_data: PayRunRecalculateJobCreate, db: Session = Depends(get_db)):
+    """
+    Queue recalculation of pay runs from current hours, rates and tax profiles
+
+    - **pay_run_ids**: Pay runs to recalculate; paid or missing ones are reported in the result's errors
+    """
+    return jobs.enqueue(db, "pay_run_recalculate", recalculate_data.model_dump(mode="json"))
+
+
+@router.post("/pay-run-recalculate-pending/", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_pay_run_recalculate_pending(recalculate_data: PayRunBulkRecalculate, db: Session = Depends(get_db)):
+    """
+    Queue set-based recalculation of pending pay runs (same input as POST /pay-runs/recalculate/)
+
+    Poll GET /jobs/{job_id}/ for the updated pay run IDs and skipped requests.
+    """
+    return jobs.enqueue(db, "pay_run_recalculate_pending", recalculate_data.model_dump(mode="json"))
+
+
+@router.post("/pay-run-export/", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_pay_run_export(export_data: PayRunExportJobCreate, db: Session = Depends(get_db)):
+    """
+    Queue a pay run export (same filters as GET /pay-runs/export/)
+
+    Download the file from GET /jobs/{job_id}/download/ once the job has succeeded.
+    """
+    return jobs.enqueue(db, "pay_run_export", export_data.model_dump(mode="json"))
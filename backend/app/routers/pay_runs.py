@@ -2,37 +2,58 @@
 Pay Runs API Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date
 
-from app.database import get_db
+from app.async_routes import runs_in_threadpool
+from app.database import get_db, SessionLocal
+from app.pagination import paginate
+from app.conditional import check_resource, check_page, page_columns
+from app.cache import result_cache
+from app.query_audit import query_budget
+from app.fieldsets import FIELDS_QUERY, parse_fields, load_fields
+from app.idempotency import IdempotentRequest, IDEMPOTENCY_KEY_HEADER
 from app.models import PayRun, PaymentStatus
 from app.schemas import (
     PayRun as PayRunSchema,
     PayRunCreate,
+    PayRunBatchCreate,
+    PayRunBatchResult,
     PayRunUpdate,
     PayRunSummary,
-    BulkPaymentUpdate
+    BulkPaymentUpdate,
+    PayRunApprovalResult,
+    PayRunBulkRecalculate,
+    PayRunRecalculationResult
 )
-from app.services.payroll import PayrollCalculator
+from app.services.payroll import PayrollCalculator, DuplicatePayRunError
+from app.services.parallel_payroll import get_payroll_executor
+from app.services.payroll_totals import PayrollTotalsDelta, snapshot
+from app.services.pay_run_export import filter_pay_runs, export_pay_runs, export_filename, EXPORT_MEDIA_TYPES
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[PayRunSchema])
+@router.get("/", response_model=List[PayRunSchema], dependencies=[Depends(query_budget(1))])
 def get_pay_runs(
+    request: Request,
+    response: Response,
     employee_id: int | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
     payment_status: PaymentStatus | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    fields: str | None = FIELDS_QUERY,
     db: Session = Depends(get_db)
 ):
     """
-    Get pay runs with optional filters
+    Get pay runs with optional filters, latest period first
     
     - **employee_id**: Filter by specific employee
     - **start_date**: Filter pay runs starting from this date
@@ -40,30 +61,98 @@ def get_pay_runs(
     - **payment_status**: Filter by payment status
     - **skip**: Number of records to skip (pagination)
     - **limit**: Maximum number of records to return
+    - **cursor**: Cursor from the previous page's X-Next-Cursor header (instead of skip)
+    - **fields**: Comma-separated attributes to return (default: all)
     """
-    query = db.query(PayRun)
-    
-    if employee_id:
-        query = query.filter(PayRun.employee_id == employee_id)
-    if start_date:
-        query = query.filter(PayRun.start_period >= start_date)
-    if end_date:
-        query = query.filter(PayRun.end_period <= end_date)
-    if payment_status:
-        query = query.filter(PayRun.payment_status == payment_status)
-    
-    pay_runs = query.order_by(PayRun.start_period.desc()).offset(skip).limit(limit).all()
-    return pay_runs
+    selected = parse_fields(fields, PayRunSchema)
+    cached = result_cache.lookup(request, ["pay_runs"])
+    if cached is not None:
+        return cached
+    
+    query = filter_pay_runs(db.query(PayRun), employee_id, start_date, end_date, payment_status)
+    
+    query = load_fields(query, PayRun, selected, PayRun.start_period, *page_columns(PayRun))
+    pay_runs = paginate(
+        query, [PayRun.start_period, PayRun.pay_run_id], response,
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
+    
+    not_modified = check_page(request, response, PayRun, pay_runs)
+    if not_modified is not None:
+        return not_modified
+    
+    return result_cache.store(request, response, List[PayRunSchema], pay_runs, selected)
+
+
+@router.get("/export/", dependencies=[Depends(query_budget(1))])
+def export_pay_runs_file(
+    employee_id: int | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    payment_status: PaymentStatus | None = None,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False
+):
+    """
+    Stream all matching pay runs as a file download
+    
+    Rows are read through a server-side cursor and written as they arrive, so
+    the export size is not limited by memory or pagination.
+    
+    - **employee_id**: Filter by specific employee
+    - **start_date**: Filter pay runs starting from this date
+    - **end_date**: Filter pay runs up to this date
+    - **payment_status**: Filter by payment status
+    - **format**: csv or ndjson
+    - **gzip**: Compress the download
+    """
+    def stream():
+        # The request session is closed before the body is sent, so the
+        # stream owns its own session for as long as it runs
+        db = SessionLocal()
+        try:
+            yield from export_pay_runs(
+                db, format, gzip,
+                employee_id=employee_id,
+                start_date=start_date,
+                end_date=end_date,
+                payment_status=payment_status
+            )
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format, gzip)}"'}
+    )
 
 
-@router.get("/{pay_run_id}/", response_model=PayRunSchema)
-def get_pay_run(pay_run_id: int, db: Session = Depends(get_db)):
+@router.get("/{pay_run_id}/", response_model=PayRunSchema, dependencies=[Depends(query_budget(2))])
+def get_pay_run(
+    pay_run_id: int,
+    request: Request,
+    response: Response,
+    fields: str | None = FIELDS_QUERY,
+    db: Session = Depends(get_db)
+):
     """
     Get a specific pay run by ID
     
     - **pay_run_id**: The pay run's unique identifier
+    - **fields**: Comma-separated attributes to return (default: all)
     """
-    pay_run = db.query(PayRun).filter(PayRun.pay_run_id == pay_run_id).first()
+    selected = parse_fields(fields, PayRunSchema)
+    cached = result_cache.lookup(request, ["pay_runs"])
+    if cached is not None:
+        return cached
+    
+    not_modified = check_resource(request, response, db, PayRun, pay_run_id, variant=",".join(selected or ()))
+    if not_modified is not None:
+        return not_modified
+    
+    query = load_fields(db.query(PayRun), PayRun, selected)
+    pay_run = query.filter(PayRun.pay_run_id == pay_run_id).first()
     
     if not pay_run:
         raise HTTPException(
@@ -71,11 +160,15 @@ def get_pay_run(pay_run_id: int, db: Session = Depends(get_db)):
             detail=f"Pay run with ID {pay_run_id} not found"
         )
     
-    return pay_run
+    return result_cache.store(request, response, PayRunSchema, pay_run, selected)
 
 
 @router.post("/", response_model=PayRunSchema, status_code=status.HTTP_201_CREATED)
-def create_pay_run(pay_run_data: PayRunCreate, db: Session = Depends(get_db)):
+def create_pay_run(
+    pay_run_data: PayRunCreate,
+    idempotency_key: str | None = IDEMPOTENCY_KEY_HEADER,
+    db: Session = Depends(get_db)
+):
     """
     Create a new pay run with automatic calculations
     
@@ -91,24 +184,83 @@ def create_pay_run(pay_run_data: PayRunCreate, db: Session = Depends(get_db)):
     - start_period
     - end_period
     - bonuses (optional)
+    
+    An employee has at most one pay run per period (cancelled ones aside);
+    a second one is rejected with 409. Send an **Idempotency-Key** header to
+    have retries of this request replay the first response.
     """
-    calculator = PayrollCalculator(db)
+    with IdempotentRequest(db, idempotency_key, "POST /pay-runs/", pay_run_data) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        
+        calculator = PayrollCalculator(db)
+        
+        try:
+            pay_run = calculator.create_pay_run(
+                employee_id=pay_run_data.employee_id,
+                start_period=pay_run_data.start_period,
+                end_period=pay_run_data.end_period,
+                pay_date=pay_run_data.pay_date,
+                bonuses=pay_run_data.bonuses,
+                notes=pay_run_data.notes
+            )
+        except DuplicatePayRunError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        result_cache.invalidate("pay_runs")
+        return idempotent.respond(PayRunSchema, pay_run, status.HTTP_201_CREATED)
+
+
+@router.post("/batch/", response_model=PayRunBatchResult, status_code=status.HTTP_201_CREATED)
+@runs_in_threadpool
+def create_pay_runs_batch(
+    batch_data: PayRunBatchCreate,
+    idempotency_key: str | None = IDEMPOTENCY_KEY_HEADER,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate pay runs for every active employee in one transaction
     
-    try:
-        pay_run = calculator.create_pay_run(
-            employee_id=pay_run_data.employee_id,
-            start_period=pay_run_data.start_period,
-            end_period=pay_run_data.end_period,
-            pay_date=pay_run_data.pay_date,
-            bonuses=pay_run_data.bonuses,
-            notes=pay_run_data.notes
-        )
-        return pay_run
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+    - **start_period** / **end_period**: The pay period
+    - **employee_ids**: Optional list of employees to limit the run to
+    - **pay_date** / **notes**: Applied to every created pay run
+    
+    Employees that cannot be paid (not found, inactive or missing rate) are
+    reported in **errors** and skipped. Employees that already have a pay run
+    for the period, and hourly employees without approved hours, are listed
+    in **skipped_employee_ids**, so the batch can safely be run again. Send an
+    **Idempotency-Key** header to have retries replay the first response.
+    """
+    with IdempotentRequest(db, idempotency_key, "POST /pay-runs/batch/", batch_data) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        
+        calculator = PayrollCalculator(db, executor=get_payroll_executor())
+        
+        pay_runs, errors, skipped = calculator.create_pay_runs_batch(
+            start_period=batch_data.start_period,
+            end_period=batch_data.end_period,
+            pay_date=batch_data.pay_date,
+            employee_ids=batch_data.employee_ids,
+            notes=batch_data.notes
         )
+        result_cache.invalidate("pay_runs")
+        
+        return idempotent.respond(PayRunBatchResult, {
+            "created_count": len(pay_runs),
+            "error_count": len(errors),
+            "skipped_count": len(skipped),
+            "pay_runs": pay_runs,
+            "errors": errors,
+            "skipped_employee_ids": skipped
+        }, status.HTTP_201_CREATED)
 
 
 @router.put("/{pay_run_id}/", response_model=PayRunSchema)
@@ -135,10 +287,23 @@ def update_pay_run(
     # Update only provided fields
     update_data = pay_run_update.model_dump(exclude_unset=True)
     
+    before = snapshot(db_pay_run)
     for field, value in update_data.items():
         setattr(db_pay_run, field, value)
     
-    db.commit()
+    totals = PayrollTotalsDelta()
+    totals.changed(before, db_pay_run)
+    try:
+        totals.apply(db)
+        db.commit()
+    except IntegrityError:
+        # Reinstating a cancelled run while another run covers the period
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The employee already has another pay run for this period"
+        )
+    result_cache.invalidate("pay_runs")
     db.refresh(db_pay_run)
     
     return db_pay_run
@@ -166,8 +331,13 @@ def delete_pay_run(pay_run_id: int, db: Session = Depends(get_db)):
             detail="Cannot delete a pay run that has already been paid"
         )
     
+    totals = PayrollTotalsDelta()
+    totals.deleted(snapshot(db_pay_run))
+    
     db.delete(db_pay_run)
+    totals.apply(db)
     db.commit()
+    result_cache.invalidate("pay_runs")
     
     return None
 
@@ -188,51 +358,84 @@ def recalculate_pay_run(pay_run_id: int, db: Session = Depends(get_db)):
             detail=f"Pay run with ID {pay_run_id} not found"
         )
     
-    if db_pay_run.payment_status == PaymentStatus.PAID:
+    calculator = PayrollCalculator(db)
+    
+    try:
+        db_pay_run = calculator.recalculate_pay_run(db_pay_run)
+        result_cache.invalidate("pay_runs")
+        return db_pay_run
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot recalculate a pay run that has already been paid"
+            detail=str(e)
         )
-    
+
+
+@router.post("/recalculate/", response_model=PayRunRecalculationResult)
+@runs_in_threadpool
+def recalculate_pay_runs(recalculate_data: PayRunBulkRecalculate, db: Session = Depends(get_db)):
+    """
+    Recalculate pending pay runs from current hours, rates and tax profiles
+    
+    - **pay_run_ids**: Only these pay runs
+    - **employee_ids**: Only these employees' pay runs
+    - **start_date** / **end_date**: Only pay runs whose period lies within this range
+    - Inputs are loaded with a few grouped queries and only pay runs whose
+      values changed are written; requested pay_run_ids that are not pending
+      or fall outside the filters are reported in **skipped**
+    """
     calculator = PayrollCalculator(db)
     
     try:
-        # Calculate fresh values
-        calc = calculator.calculate_pay_run(
-            employee_id=db_pay_run.employee_id,
-            start_period=db_pay_run.start_period,
-            end_period=db_pay_run.end_period,
-            bonuses=db_pay_run.bonuses
+        updated_ids, unchanged_ids, skipped = calculator.recalculate_pay_runs(
+            pay_run_ids=recalculate_data.pay_run_ids,
+            start_date=recalculate_data.start_date,
+            end_date=recalculate_data.end_date,
+            employee_ids=recalculate_data.employee_ids
         )
-        
-        # Update pay run with new calculations
-        for field, value in calc.items():
-            setattr(db_pay_run, field, value)
-        
-        db.commit()
-        db.refresh(db_pay_run)
-        
-        return db_pay_run
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    if updated_ids:
+        result_cache.invalidate("pay_runs")
+    return {
+        "updated_count": len(updated_ids),
+        "unchanged_count": len(unchanged_ids),
+        "skipped_count": len(skipped),
+        "updated_pay_run_ids": updated_ids,
+        "skipped": skipped
+    }
 
 
-@router.post("/approve/", response_model=List[PayRunSchema])
+@router.post("/approve/", response_model=PayRunApprovalResult)
 def approve_pay_runs(bulk_update: BulkPaymentUpdate, db: Session = Depends(get_db)):
     """
     Approve and mark multiple pay runs as paid
     
     - **pay_run_ids**: List of pay run IDs to approve
+    - **start_period** / **end_period**: Approve every pending pay run whose
+      period lies within this range (the dashboard's "Approve All")
     - Sets payment_status to PAID and records processed_at timestamp
+    - Only PENDING pay runs are approved; paid, cancelled or unknown IDs
+      are reported in **skipped**
     """
     calculator = PayrollCalculator(db)
     
     try:
-        pay_runs = calculator.approve_pay_runs(bulk_update.pay_run_ids)
-        return pay_runs
+        pay_runs, skipped = calculator.approve_pay_runs(
+            pay_run_ids=bulk_update.pay_run_ids,
+            start_period=bulk_update.start_period,
+            end_period=bulk_update.end_period
+        )
+        result_cache.invalidate("pay_runs")
+        return {
+            "approved_count": len(pay_runs),
+            "skipped_count": len(skipped),
+            "pay_runs": pay_runs,
+            "skipped": skipped
+        }
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -240,10 +443,14 @@ def approve_pay_runs(bulk_update: BulkPaymentUpdate, db: Session = Depends(get_d
         )
 
 
-@router.get("/summary/dashboard/")
+@router.get("/summary/dashboard/", dependencies=[Depends(query_budget(2))])
 def get_payroll_dashboard(
+    request: Request,
+    response: Response,
     start_period: date = Query(...),
     end_period: date = Query(...),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db)
 ):
     """
@@ -255,40 +462,43 @@ def get_payroll_dashboard(
     - Total taxes
     - Total deductions
     - Total net pay
-    - List of all pay runs
+    - One page of the pay runs
     
     - **start_period**: Start date of the period
     - **end_period**: End date of the period
+    - **skip**: Number of pay runs to skip (pagination)
+    - **limit**: Maximum number of pay runs to return
     """
+    cached = result_cache.lookup(request, ["pay_runs", "employees"])
+    if cached is not None:
+        return cached
+    
     calculator = PayrollCalculator(db)
     summary = calculator.get_payroll_summary(start_period, end_period)
-    
-    # Convert pay_runs to summary format
-    from app.models import Employee
-    
-    pay_run_summaries = []
-    for pr in summary['pay_runs']:
-        employee = db.query(Employee).filter(Employee.employee_id == pr.employee_id).first()
-        pay_run_summaries.append({
-            "pay_run_id": pr.pay_run_id,
-            "employee_id": pr.employee_id,
-            "employee_name": f"{employee.first_name} {employee.last_name}" if employee else "Unknown",
-            "start_period": pr.start_period,
-            "end_period": pr.end_period,
-            "gross_pay": pr.gross_pay,
-            "total_taxes": pr.total_taxes,
-            "total_deductions": pr.total_deductions,
-            "net_pay": pr.net_pay,
-            "payment_status": pr.payment_status
-        })
-    
-    return {
-        "summary": {
-            "employee_count": summary['employee_count'],
-            "total_gross_pay": float(summary['total_gross_pay']),
-            "total_taxes": float(summary['total_taxes']),
-            "total_deductions": float(summary['total_deductions']),
-            "total_net_pay": float(summary['total_net_pay'])
-        },
-        "pay_runs": pay_run_summaries
-    }
+    rows = calculator.get_payroll_summary_pay_runs(start_period, end_period, skip, limit)
+    
+    pay_run_summaries = [
+        {
+            "pay_run_id": row.pay_run_id,
+            "employee_id": row.employee_id,
+            "employee_name": f"{row.first_name} {row.last_name}" if row.first_name is not None else "Unknown",
+            "start_period": row.start_period,
+            "end_period": row.end_period,
+            "gross_pay": row.gross_pay,
+            "total_taxes": row.total_taxes,
+            "total_deductions": row.total_deductions,
+            "net_pay": row.net_pay,
+            "payment_status": row.payment_status
+        }
+        for row in rows
+    ]
+    
+    return result_cache.store(request, response, None, {
+        "summary": summary,
+        "pay_runs": pay_run_summaries,
+        "pagination": {
+            "skip": skip,
+            "limit": limit,
+            "total": summary['employee_count']
+        }
+    })
@@ -2,25 +2,35 @@
 Tax and Deduction Profiles API Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 
 from app.database import get_db
-from app.models import TaxDeductionProfile
+from app.pagination import paginate
+from app.conditional import check_resource, check_page, page_columns
+from app.cache import result_cache
+from app.query_audit import query_budget
+from app.models import TaxDeductionProfile, PITScheduleVersion, PITBracket
 from app.schemas import (
     TaxDeductionProfile as TaxDeductionProfileSchema,
     TaxDeductionProfileCreate,
-    TaxDeductionProfileUpdate
+    TaxDeductionProfileUpdate,
+    PITSchedule as PITScheduleSchema,
+    PITScheduleCreate
 )
+from app.services.tax_tables import CompiledPITSchedule, pit_schedules
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[TaxDeductionProfileSchema])
+@router.get("/", response_model=List[TaxDeductionProfileSchema], dependencies=[Depends(query_budget(1))])
 def get_tax_profiles(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
     db: Session = Depends(get_db)
 ):
     """
@@ -28,18 +38,102 @@ def get_tax_profiles(
     
     - **skip**: Number of records to skip (pagination)
     - **limit**: Maximum number of records to return
+    - **cursor**: Cursor from the previous page's X-Next-Cursor header (instead of skip)
     """
-    profiles = db.query(TaxDeductionProfile).offset(skip).limit(limit).all()
-    return profiles
+    cached = result_cache.lookup(request, ["tax_deduction_profiles"])
+    if cached is not None:
+        return cached
+    
+    query = db.query(TaxDeductionProfile)
+    
+    profiles = paginate(
+        query, [TaxDeductionProfile.profile_id], response,
+        skip=skip, limit=limit, cursor=cursor
+    )
+    
+    not_modified = check_page(request, response, TaxDeductionProfile, profiles)
+    if not_modified is not None:
+        return not_modified
+    
+    return result_cache.store(request, response, List[TaxDeductionProfileSchema], profiles)
+
+
+@router.get("/pit-schedules/", response_model=List[PITScheduleSchema], dependencies=[Depends(query_budget(2))])
+def get_pit_schedules(request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Get all published PIT schedule versions, oldest first
+    
+    Each version applies to pay periods ending on or after its effective date.
+    Before the first version, the statutory brackets built into the system apply.
+    """
+    cached = result_cache.lookup(request, ["pit_schedule_versions"])
+    if cached is not None:
+        return cached
+    
+    versions = (
+        db.query(PITScheduleVersion)
+        .options(selectinload(PITScheduleVersion.brackets))
+        .order_by(PITScheduleVersion.effective_date)
+        .all()
+    )
+    return result_cache.store(request, response, List[PITScheduleSchema], versions)
+
+
+@router.post("/pit-schedules/", response_model=PITScheduleSchema, status_code=status.HTTP_201_CREATED)
+def publish_pit_schedule(schedule: PITScheduleCreate, db: Session = Depends(get_db)):
+    """
+    Publish a new PIT schedule version
+    
+    - **effective_date**: First pay period end date the brackets apply to
+    - **brackets**: Annual income lower limits (in Naira) and marginal rates
+    
+    Versions are immutable; publish a new version to change rates.
+    """
+    existing = db.query(PITScheduleVersion).filter(
+        PITScheduleVersion.effective_date == schedule.effective_date
+    ).first()
+    
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A PIT schedule effective {schedule.effective_date} already exists"
+        )
+    
+    db_version = PITScheduleVersion(
+        effective_date=schedule.effective_date,
+        description=schedule.description,
+        brackets=[PITBracket(**bracket.model_dump()) for bracket in schedule.brackets]
+    )
+    db.add(db_version)
+    db.commit()
+    result_cache.invalidate("pit_schedule_versions")
+    db.refresh(db_version)
+    
+    # Swap the compiled tables in for this process; other processes pick it up on refresh
+    pit_schedules.publish(CompiledPITSchedule.compile(
+        db_version.version_id,
+        db_version.effective_date,
+        [(bracket.lower_limit, bracket.rate) for bracket in db_version.brackets]
+    ))
+    
+    return db_version
 
 
-@router.get("/{profile_id}/", response_model=TaxDeductionProfileSchema)
-def get_tax_profile(profile_id: int, db: Session = Depends(get_db)):
+@router.get("/{profile_id}/", response_model=TaxDeductionProfileSchema, dependencies=[Depends(query_budget(2))])
+def get_tax_profile(profile_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get a specific tax/deduction profile by ID
     
     - **profile_id**: The profile's unique identifier
     """
+    cached = result_cache.lookup(request, ["tax_deduction_profiles"])
+    if cached is not None:
+        return cached
+    
+    not_modified = check_resource(request, response, db, TaxDeductionProfile, profile_id)
+    if not_modified is not None:
+        return not_modified
+    
     profile = db.query(TaxDeductionProfile).filter(
         TaxDeductionProfile.profile_id == profile_id
     ).first()
@@ -50,7 +144,7 @@ def get_tax_profile(profile_id: int, db: Session = Depends(get_db)):
             detail=f"Tax/Deduction profile with ID {profile_id} not found"
         )
     
-    return profile
+    return result_cache.store(request, response, TaxDeductionProfileSchema, profile)
 
 
 @router.post("/", response_model=TaxDeductionProfileSchema, status_code=status.HTTP_201_CREATED)
@@ -80,6 +174,7 @@ def create_tax_profile(
     db_profile = TaxDeductionProfile(**profile.model_dump())
     db.add(db_profile)
     db.commit()
+    result_cache.invalidate("tax_deduction_profiles")
     db.refresh(db_profile)
     
     return db_profile
@@ -126,6 +221,7 @@ def update_tax_profile(
         setattr(db_profile, field, value)
     
     db.commit()
+    result_cache.invalidate("tax_deduction_profiles")
     db.refresh(db_profile)
     
     return db_profile
@@ -163,5 +259,6 @@ def delete_tax_profile(profile_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_profile)
     db.commit()
+    result_cache.invalidate("tax_deduction_profiles")
     
     return None
@@ -2,30 +2,53 @@
 Work Hours Tracking API Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Request, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date
+import io
 
+from app.async_routes import runs_in_threadpool
 from app.database import get_db
+from app.pagination import paginate
+from app.conditional import check_resource, check_page, page_columns
+from app.responses import render
+from app.query_audit import query_budget
+from app.fieldsets import FIELDS_QUERY, parse_fields, load_fields
 from app.models import WorkHours, Employee
-from app.schemas import WorkHours as WorkHoursSchema, WorkHoursCreate, WorkHoursUpdate
+from app.schemas import (
+    WorkHours as WorkHoursSchema,
+    WorkHoursCreate,
+    WorkHoursUpdate,
+    WorkHoursBatchUpsert,
+    WorkHoursBatchResult,
+    WorkHoursBulkApprove,
+    WorkHoursApprovalResult,
+    WorkHoursImportResult
+)
+from app.services.work_hours_import import import_work_hours, detect_format
+from app.services.work_hours_bulk import upsert_work_hours, approve_pending_work_hours
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[WorkHoursSchema])
+@router.get("/", response_model=List[WorkHoursSchema], dependencies=[Depends(query_budget(1))])
 def get_work_hours(
+    request: Request,
+    response: Response,
     employee_id: int | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
     approved: bool | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    fields: str | None = FIELDS_QUERY,
     db: Session = Depends(get_db)
 ):
     """
-    Get work hours records with optional filters
+    Get work hours records with optional filters, newest first
     
     - **employee_id**: Filter by specific employee
     - **start_date**: Filter records from this date onwards
@@ -33,7 +56,10 @@ def get_work_hours(
     - **approved**: Filter by approval status
     - **skip**: Number of records to skip (pagination)
     - **limit**: Maximum number of records to return
+    - **cursor**: Cursor from the previous page's X-Next-Cursor header (instead of skip)
+    - **fields**: Comma-separated attributes to return (default: all)
     """
+    selected = parse_fields(fields, WorkHoursSchema)
     query = db.query(WorkHours)
     
     if employee_id:
@@ -45,18 +71,40 @@ def get_work_hours(
     if approved is not None:
         query = query.filter(WorkHours.is_approved == approved)
     
-    work_hours = query.order_by(WorkHours.date.desc()).offset(skip).limit(limit).all()
-    return work_hours
+    query = load_fields(query, WorkHours, selected, WorkHours.date, *page_columns(WorkHours))
+    work_hours = paginate(
+        query, [WorkHours.date, WorkHours.record_id], response,
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
+    
+    not_modified = check_page(request, response, WorkHours, work_hours)
+    if not_modified is not None:
+        return not_modified
+    
+    return render(response, List[WorkHoursSchema], work_hours, selected)
 
 
-@router.get("/{record_id}/", response_model=WorkHoursSchema)
-def get_work_hour(record_id: int, db: Session = Depends(get_db)):
+@router.get("/{record_id}/", response_model=WorkHoursSchema, dependencies=[Depends(query_budget(2))])
+def get_work_hour(
+    record_id: int,
+    request: Request,
+    response: Response,
+    fields: str | None = FIELDS_QUERY,
+    db: Session = Depends(get_db)
+):
     """
     Get a specific work hours record by ID
     
     - **record_id**: The work hours record's unique identifier
+    - **fields**: Comma-separated attributes to return (default: all)
     """
-    work_hour = db.query(WorkHours).filter(WorkHours.record_id == record_id).first()
+    selected = parse_fields(fields, WorkHoursSchema)
+    not_modified = check_resource(request, response, db, WorkHours, record_id, variant=",".join(selected or ()))
+    if not_modified is not None:
+        return not_modified
+    
+    query = load_fields(db.query(WorkHours), WorkHours, selected)
+    work_hour = query.filter(WorkHours.record_id == record_id).first()
     
     if not work_hour:
         raise HTTPException(
@@ -64,7 +112,7 @@ def get_work_hour(record_id: int, db: Session = Depends(get_db)):
             detail=f"Work hours record with ID {record_id} not found"
         )
     
-    return work_hour
+    return render(response, WorkHoursSchema, work_hour, selected)
 
 
 @router.post("/", response_model=WorkHoursSchema, status_code=status.HTTP_201_CREATED)
@@ -105,6 +153,56 @@ def create_work_hours(work_hours: WorkHoursCreate, db: Session = Depends(get_db)
     return db_work_hours
 
 
+@router.post("/batch/", response_model=WorkHoursBatchResult)
+def upsert_work_hours_batch(batch_data: WorkHoursBatchUpsert, db: Session = Depends(get_db)):
+    """
+    Insert or correct many work hours records in one statement
+    
+    Each row is keyed on (employee_id, date): new days are inserted, existing
+    unapproved ones are overwritten. Every row is reported in request order
+    as **inserted**, **updated** or **rejected** (with a reason).
+    
+    Rows are rejected when:
+    - The employee does not exist
+    - Hours worked + overtime hours exceed 24 hours
+    - The same employee and date appear earlier in the batch
+    - The stored record is already approved
+    """
+    return upsert_work_hours(db, batch_data.records)
+
+
+@router.post("/import/", response_model=WorkHoursImportResult)
+@runs_in_threadpool
+def import_work_hours_file(
+    file: UploadFile = File(...),
+    format: str | None = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import work hours from a CSV or NDJSON file
+    
+    The file is streamed into a staging table and validated in SQL. Valid rows
+    are inserted in one transaction; rejected rows are summarised in the report.
+    
+    - **file**: CSV with a header row, or one JSON object per line
+    - **format**: csv or ndjson (guessed from the file name when omitted)
+    
+    Columns: employee_id, date, hours_worked, overtime_hours, notes, approved_by, is_approved
+    """
+    fmt = format or detect_format(file.filename, file.content_type)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    
+    try:
+        return import_work_hours(db, stream, fmt)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import file must be UTF-8 encoded"
+        )
+    finally:
+        stream.detach()
+
+
 @router.put("/{record_id}/", response_model=WorkHoursSchema)
 def update_work_hours(
     record_id: int,
@@ -131,7 +229,15 @@ def update_work_hours(
     for field, value in update_data.items():
         setattr(db_work_hours, field, value)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Moving the record onto a date the employee already has
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Work hours record for employee {db_work_hours.employee_id} on {work_hours_update.date} already exists"
+        )
     db.refresh(db_work_hours)
     
     return db_work_hours
@@ -187,33 +293,31 @@ def approve_work_hours(
     return db_work_hours
 
 
-@router.post("/bulk-approve/")
-def bulk_approve_work_hours(
-    record_ids: List[int],
-    approved_by: str,
-    db: Session = Depends(get_db)
-):
+@router.post("/bulk-approve/", response_model=WorkHoursApprovalResult)
+def bulk_approve_work_hours(approval: WorkHoursBulkApprove, db: Session = Depends(get_db)):
     """
-    Approve multiple work hours records at once
+    Approve many work hours records at once, by ID or by filter
     
-    - **record_ids**: List of work hours record IDs to approve
-    - **approved_by**: Name of person approving
-    """
-    work_hours = db.query(WorkHours).filter(WorkHours.record_id.in_(record_ids)).all()
-    
-    if not work_hours:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No work hours records found with provided IDs"
-        )
+    Runs as a single UPDATE of the matching unapproved records; records
+    that are already approved are left as they are and not reported.
     
-    for wh in work_hours:
-        wh.is_approved = True
-        wh.approved_by = approved_by
+    - **approved_by**: Name of person approving
+    - **record_ids**: Work hours record IDs to approve
+    - **employee_ids**: Only approve these employees' records
+    - **start_date** / **end_date**: Approve records in this date range (both required together)
     
-    db.commit()
+    Give record_ids, a date range, or both; filters are combined.
+    """
+    record_ids = approve_pending_work_hours(
+        db,
+        approved_by=approval.approved_by,
+        record_ids=approval.record_ids,
+        employee_ids=approval.employee_ids,
+        start_date=approval.start_date,
+        end_date=approval.end_date
+    )
     
     return {
-        "approved_count": len(work_hours),
-        "record_ids": [wh.record_id for wh in work_hours]
+        "approved_count": len(record_ids),
+        "record_ids": record_ids
     }
@@ -2,7 +2,7 @@
 Pydantic Schemas for Request/Response Validation
 """
 
-from pydantic import BaseModel, EmailStr, Field, validator, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, validator, model_validator, ConfigDict
 from typing import Optional
 from datetime import date, datetime
 from decimal import Decimal
@@ -28,6 +28,13 @@ class PaymentStatusEnum(str, Enum):
     CANCELLED = "cancelled"
 
 
+class JobStatusEnum(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 # ==================== Tax Deduction Profile Schemas ====================
 
 class TaxDeductionProfileBase(BaseModel):
@@ -72,6 +79,44 @@ class TaxDeductionProfile(TaxDeductionProfileBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# ==================== PIT Schedule Schemas ====================
+
+class PITBracketBase(BaseModel):
+    lower_limit: Decimal = Field(..., ge=0)
+    rate: Decimal = Field(..., ge=0, le=1)
+
+
+class PITBracket(PITBracketBase):
+    bracket_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PITScheduleCreate(BaseModel):
+    effective_date: date
+    description: Optional[str] = None
+    brackets: list[PITBracketBase] = Field(..., min_length=1)
+
+    @validator('brackets')
+    def validate_brackets(cls, v):
+        lower_limits = sorted(bracket.lower_limit for bracket in v)
+        if lower_limits[0] != 0:
+            raise ValueError('the first bracket must start at 0')
+        if len(set(lower_limits)) != len(lower_limits):
+            raise ValueError('bracket lower limits must be unique')
+        return sorted(v, key=lambda bracket: bracket.lower_limit)
+
+
+class PITSchedule(BaseModel):
+    version_id: int
+    effective_date: date
+    description: Optional[str] = None
+    created_at: datetime
+    brackets: list[PITBracket]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # ==================== Employee Schemas ====================
 
 class EmployeeBase(BaseModel):
@@ -209,6 +254,15 @@ class PayRunCreate(BaseModel):
     notes: Optional[str] = None
 
 
+class PayRunBatchCreate(BaseModel):
+    """Generate pay runs for all active employees (or a subset) for one period"""
+    start_period: date
+    end_period: date
+    pay_date: Optional[date] = None
+    employee_ids: Optional[list[int]] = Field(None, min_length=1)
+    notes: Optional[str] = None
+
+
 class PayRunUpdate(BaseModel):
     pay_date: Optional[date] = None
     bonuses: Optional[Decimal] = Field(None, ge=0)
@@ -258,8 +312,193 @@ class PayRunSummary(BaseModel):
 
 # ==================== Bulk Operations ====================
 
+class PayRunBatchError(BaseModel):
+    """Employee that could not be included in a batch pay run"""
+    employee_id: int
+    error: str
+
+
+class PayRunBatchResult(BaseModel):
+    """Result of a batch pay run generation"""
+    created_count: int
+    error_count: int
+    skipped_count: int = 0
+    pay_runs: list[PayRun]
+    errors: list[PayRunBatchError]
+    # Employees that already had a pay run for the period or have no approved hours
+    skipped_employee_ids: list[int] = []
+
+
+class WorkHoursBatchUpsert(BaseModel):
+    """Insert or correct many work hours records at once"""
+    records: list[WorkHoursCreate] = Field(..., min_length=1, max_length=10000)
+
+
+class WorkHoursBatchRow(BaseModel):
+    """Outcome of one batch row, in request order"""
+    index: int
+    employee_id: int
+    date: date
+    record_id: Optional[int] = None
+    status: str  # inserted, updated or rejected
+    reason: Optional[str] = None
+
+
+class WorkHoursBatchResult(BaseModel):
+    """Result of a work hours batch upsert"""
+    inserted: int
+    updated: int
+    rejected: int
+    rows: list[WorkHoursBatchRow]
+
+
+class WorkHoursBulkApprove(BaseModel):
+    """
+    Approve unapproved work hours by ID or by filter
+
+    Give record_ids, or a date range (optionally narrowed to some employees);
+    both may be combined.
+    """
+    approved_by: str = Field(..., min_length=1, max_length=100)
+    record_ids: Optional[list[int]] = Field(None, min_length=1)
+    employee_ids: Optional[list[int]] = Field(None, min_length=1)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @model_validator(mode='after')
+    def validate_selection(self):
+        if (self.start_date is None) != (self.end_date is None):
+            raise ValueError('start_date and end_date must be given together')
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError('end_date must not be before start_date')
+        if self.end_date is None and not self.record_ids:
+            raise ValueError('give record_ids or a start_date/end_date range')
+        return self
+
+
+class WorkHoursApprovalResult(BaseModel):
+    """Result of a bulk work hours approval"""
+    approved_count: int
+    record_ids: list[int]
+
+
+class WorkHoursImportError(BaseModel):
+    """Row rejected by a work hours import"""
+    line: int
+    employee_id: Optional[int] = None
+    work_date: Optional[date] = None
+    reason: str
+
+
+class WorkHoursImportResult(BaseModel):
+    """Result of a work hours bulk import"""
+    total_rows: int
+    imported: int
+    rejected: int
+    errors_by_reason: dict[str, int]
+    errors: list[WorkHoursImportError]
+
+
 class BulkPaymentUpdate(BaseModel):
-    """Update multiple pay runs at once"""
-    pay_run_ids: list[int] = Field(..., min_length=1)
+    """
+    Update multiple pay runs at once
+
+    Give pay_run_ids, or a period range to select every pending pay run in it
+    (as the dashboard does); both may be combined.
+    """
+    pay_run_ids: Optional[list[int]] = Field(None, min_length=1)
+    start_period: Optional[date] = None
+    end_period: Optional[date] = None
     payment_status: PaymentStatusEnum
     processed_at: Optional[datetime] = None
+
+    @model_validator(mode='after')
+    def validate_selection(self):
+        if (self.start_period is None) != (self.end_period is None):
+            raise ValueError('start_period and end_period must be given together')
+        if self.end_period is not None and self.end_period < self.start_period:
+            raise ValueError('end_period must not be before start_period')
+        if self.end_period is None and not self.pay_run_ids:
+            raise ValueError('give pay_run_ids or a start_period/end_period range')
+        return self
+
+
+class PayRunSkip(BaseModel):
+    """Pay run left unchanged by a bulk approval or recalculation"""
+    pay_run_id: int
+    reason: str
+
+
+class PayRunApprovalResult(BaseModel):
+    """Result of a bulk approval"""
+    approved_count: int
+    skipped_count: int
+    pay_runs: list[PayRun]
+    skipped: list[PayRunSkip]
+
+
+class PayRunBulkRecalculate(BaseModel):
+    """
+    Recalculate pending pay runs by ID or by filter
+
+    Give pay_run_ids, or a date range (optionally narrowed to some employees);
+    both may be combined.
+    """
+    pay_run_ids: Optional[list[int]] = Field(None, min_length=1)
+    employee_ids: Optional[list[int]] = Field(None, min_length=1)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @model_validator(mode='after')
+    def validate_selection(self):
+        if (self.start_date is None) != (self.end_date is None):
+            raise ValueError('start_date and end_date must be given together')
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError('end_date must not be before start_date')
+        if self.end_date is None and not self.pay_run_ids:
+            raise ValueError('give pay_run_ids or a start_date/end_date range')
+        return self
+
+
+class PayRunRecalculationResult(BaseModel):
+    """Result of a bulk recalculation"""
+    updated_count: int
+    unchanged_count: int
+    skipped_count: int
+    updated_pay_run_ids: list[int]
+    skipped: list[PayRunSkip]
+
+
+# ==================== Job Schemas ====================
+
+class PayRunRecalculateJobCreate(BaseModel):
+    """Recalculate pending pay runs in the background"""
+    pay_run_ids: list[int] = Field(..., min_length=1)
+
+
+class PayRunExportJobCreate(BaseModel):
+    """Export matching pay runs to a downloadable file in the background"""
+    employee_id: Optional[int] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    payment_status: Optional[PaymentStatusEnum] = None
+    format: str = Field("csv", pattern="^(csv|ndjson)$")
+    gzip: bool = False
+
+
+class Job(BaseModel):
+    """Background job status, progress and result"""
+    job_id: int
+    kind: str
+    status: JobStatusEnum
+    params: dict
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    progress_done: int
+    progress_total: Optional[int] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
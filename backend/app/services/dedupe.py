@@ -0,0 +1,213 @@
+"""
+Duplicate Resolution
+Clears rows that block the unique indexes added to existing tables
+
+At startup, create_missing_indexes skips a unique index that existing rows
+violate (logging an error) instead of failing to boot. These commands find
+and resolve those rows, then create the missing indexes:
+
+    pay_runs   (employee_id, start_period, end_period), non-cancelled runs:
+               the paid run (else the oldest) is kept and the others are
+               cancelled; the payroll totals rollup is rebuilt afterwards
+    work_hours (employee_id, date): the approved record (else the most
+               recently changed) is kept and the others are deleted; sets
+               with more than one approved record are only reported and
+               must be resolved by hand
+
+Usage:
+    python -m app.services.dedupe check   # List duplicate sets without changing anything
+    python -m app.services.dedupe fix     # Resolve them and create the missing indexes
+"""
+
+import sys
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import PayRun, PaymentStatus, WorkHours
+from app.services.payroll_totals import rebuild
+
+
+def find_duplicate_pay_runs(db: Session) -> list[list[PayRun]]:
+    """
+    Non-cancelled pay runs sharing an (employee, period)
+
+    Returns:
+        One list per duplicate set, the run to keep first: the paid run if
+        any, otherwise the oldest
+    """
+    keys = db.query(PayRun.employee_id, PayRun.start_period, PayRun.end_period).filter(
+        PayRun.payment_status != PaymentStatus.CANCELLED
+    ).group_by(
+        PayRun.employee_id, PayRun.start_period, PayRun.end_period
+    ).having(func.count(PayRun.pay_run_id) > 1).all()
+    if not keys:
+        return []
+
+    wanted = set(keys)
+    groups: dict[tuple, list[PayRun]] = {}
+    pay_runs = db.query(PayRun).filter(
+        PayRun.payment_status != PaymentStatus.CANCELLED,
+        PayRun.employee_id.in_({employee_id for employee_id, _, _ in keys})
+    ).order_by(PayRun.pay_run_id)
+    for pay_run in pay_runs:
+        key = (pay_run.employee_id, pay_run.start_period, pay_run.end_period)
+        if key in wanted:
+            groups.setdefault(key, []).append(pay_run)
+
+    return [
+        sorted(group, key=lambda pay_run: pay_run.payment_status != PaymentStatus.PAID)
+        for _, group in sorted(groups.items())
+    ]
+
+
+def cancel_duplicate_pay_runs(db: Session) -> list[list[PayRun]]:
+    """
+    Cancel all but the first run of every duplicate set, rebuild the rollup and commit
+
+    Returns:
+        The duplicate sets, as returned by find_duplicate_pay_runs
+    """
+    groups = find_duplicate_pay_runs(db)
+    for kept, *duplicates in groups:
+        for pay_run in duplicates:
+            note = f"Cancelled as a duplicate of pay run {kept.pay_run_id}"
+            pay_run.payment_status = PaymentStatus.CANCELLED
+            pay_run.notes = f"{pay_run.notes}\n{note}" if pay_run.notes else note
+    if groups:
+        db.flush()
+        # Commits the cancellations together with the rebuilt rollup
+        rebuild(db)
+    return groups
+
+
+def find_duplicate_work_hours(db: Session) -> list[list[WorkHours]]:
+    """
+    Work hours records sharing an (employee, date)
+
+    Returns:
+        One list per duplicate set, the record to keep first: the approved
+        record if any, otherwise the most recently changed
+    """
+    keys = db.query(WorkHours.employee_id, WorkHours.date).group_by(
+        WorkHours.employee_id, WorkHours.date
+    ).having(func.count(WorkHours.record_id) > 1).all()
+    if not keys:
+        return []
+
+    wanted = set(keys)
+    groups: dict[tuple, list[WorkHours]] = {}
+    records = db.query(WorkHours).filter(
+        WorkHours.employee_id.in_({employee_id for employee_id, _ in keys})
+    ).order_by(WorkHours.record_id)
+    for record in records:
+        key = (record.employee_id, record.date)
+        if key in wanted:
+            groups.setdefault(key, []).append(record)
+
+    def keep_first(record: WorkHours):
+        changed_at = record.updated_at or record.created_at
+        return (not record.is_approved, -changed_at.timestamp() if changed_at else 0, -record.record_id)
+
+    return [sorted(group, key=keep_first) for _, group in sorted(groups.items())]
+
+
+def has_conflicting_approvals(group: list[WorkHours]) -> bool:
+    """More than one record of the set is approved, so none can be picked safely"""
+    return sum(1 for record in group if record.is_approved) > 1
+
+
+def delete_duplicate_work_hours(db: Session) -> tuple[list[list[WorkHours]], list[list[WorkHours]]]:
+    """
+    Delete all but the first record of every duplicate set with at most one
+    approved record and commit
+
+    Returns:
+        (resolved, conflicting): the sets that were resolved and the sets
+        left untouched because several of their records are approved
+    """
+    resolved, conflicting = [], []
+    for group in find_duplicate_work_hours(db):
+        (conflicting if has_conflicting_approvals(group) else resolved).append(group)
+
+    for _, *duplicates in resolved:
+        for record in duplicates:
+            db.delete(record)
+    if resolved:
+        db.commit()
+    return resolved, conflicting
+
+
+def _print_pay_runs(groups: list[list[PayRun]], action: str):
+    for kept, *duplicates in groups:
+        print(
+            f"pay_runs employee {kept.employee_id} {kept.start_period}..{kept.end_period}: "
+            f"keep {kept.pay_run_id} ({PaymentStatus(kept.payment_status).value}), "
+            f"{action} {', '.join(str(pay_run.pay_run_id) for pay_run in duplicates)}"
+        )
+
+
+def _print_work_hours(groups: list[list[WorkHours]], action: str):
+    for kept, *duplicates in groups:
+        print(
+            f"work_hours employee {kept.employee_id} {kept.date}: "
+            f"keep {kept.record_id} ({'approved' if kept.is_approved else 'unapproved'}), "
+            f"{action} {', '.join(str(record.record_id) for record in duplicates)}"
+        )
+
+
+def _print_conflicting_work_hours(groups: list[list[WorkHours]]):
+    for group in groups:
+        approved = [record for record in group if record.is_approved]
+        print(
+            f"work_hours employee {group[0].employee_id} {group[0].date}: "
+            f"approved records {', '.join(str(record.record_id) for record in approved)} conflict, "
+            f"resolve by hand"
+        )
+
+
+def main(argv: list[str]) -> int:
+    from app.database import SessionLocal, engine, create_missing_indexes
+
+    command = argv[1] if len(argv) > 1 else ""
+    if command not in ("check", "fix"):
+        print("Usage: python -m app.services.dedupe [check|fix]")
+        return 2
+
+    db = SessionLocal()
+    try:
+        if command == "check":
+            pay_run_groups = find_duplicate_pay_runs(db)
+            work_hours_groups = find_duplicate_work_hours(db)
+            _print_pay_runs(pay_run_groups, "would cancel")
+            _print_work_hours(
+                [group for group in work_hours_groups if not has_conflicting_approvals(group)], "would delete"
+            )
+            _print_conflicting_work_hours(
+                [group for group in work_hours_groups if has_conflicting_approvals(group)]
+            )
+            count = len(pay_run_groups) + len(work_hours_groups)
+            print("No duplicates" if not count else f"{count} duplicate set(s)")
+            return 1 if count else 0
+
+        pay_run_groups = cancel_duplicate_pay_runs(db)
+        _print_pay_runs(pay_run_groups, "cancelled")
+        work_hours_groups, conflicting = delete_duplicate_work_hours(db)
+        _print_work_hours(work_hours_groups, "deleted")
+        _print_conflicting_work_hours(conflicting)
+        print(f"Resolved {len(pay_run_groups) + len(work_hours_groups)} duplicate set(s)")
+        if conflicting:
+            print(f"{len(conflicting)} work_hours set(s) with several approved records need resolving by hand")
+    finally:
+        db.close()
+
+    missing = create_missing_indexes(engine)
+    if missing:
+        print(f"Could not create: {', '.join(missing)}")
+        return 1
+    print("All indexes exist")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,417 @@
+"""
+Background Jobs
+Database-backed job queue for payroll work that outlives an HTTP request
+
+Jobs are rows in the jobs table. The API enqueues them and returns at once;
+worker threads in every API process claim queued jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of replicas can share one
+queue without handing the same job to two workers.
+
+A claimed job is leased: its worker refreshes heartbeat_at while it runs.
+A running job whose heartbeat is older than JOB_LEASE_SECONDS (the process
+died) is claimed again, up to JOB_MAX_ATTEMPTS times, then marked failed.
+Handler errors are not retried; the job fails with the error message.
+
+Handlers take (db, params, context) and return a JSON-serialisable result.
+"""
+
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.cache import result_cache
+from app.database import SessionLocal
+from app.models import Job, JobStatus, PayRun
+from app.schemas import PayRunBatchCreate, PayRunBulkRecalculate, PayRunExportJobCreate, PayRunRecalculateJobCreate
+from app.services.parallel_payroll import get_payroll_executor
+from app.services.pay_run_export import export_pay_runs, export_filename
+from app.services.payroll import PayrollCalculator
+
+
+logger = logging.getLogger(__name__)
+
+# Worker threads per process; 0 only enqueues (another replica runs the jobs)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# Idle workers look for new jobs this often (enqueueing in-process wakes them at once)
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 2))
+# A running job without a heartbeat for this long is considered abandoned
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# Export files; must be shared storage when several replicas run jobs
+JOB_OUTPUT_DIR = Path(os.getenv("JOB_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "payroll-jobs")))
+
+# Progress is written at most this often (seconds), plus once at the end
+PROGRESS_INTERVAL = 1.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobLeaseLost(RuntimeError):
+    """The job was re-claimed by another worker after its lease expired"""
+
+
+class JobContext:
+    """Progress reporting for a running job; writes through its own session"""
+
+    def __init__(self, job_id: int, attempt: int):
+        self.job_id = job_id
+        self.attempt = attempt
+        self._reported_at = 0.0
+
+    def progress(self, done: int, total: int | None = None):
+        """
+        Record how much of the job is done
+
+        Raises:
+            JobLeaseLost: If another worker has taken the job over
+        """
+        now = time.monotonic()
+        if total is None and now - self._reported_at < PROGRESS_INTERVAL:
+            return
+        self._reported_at = now
+
+        values = {Job.progress_done: done}
+        if total is not None:
+            values[Job.progress_total] = total
+        db = SessionLocal()
+        try:
+            updated = db.query(Job).filter(
+                Job.job_id == self.job_id, Job.attempts == self.attempt, Job.status == JobStatus.RUNNING
+            ).update(values, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        if updated != 1:
+            raise JobLeaseLost(f"Job {self.job_id} was claimed by another worker")
+
+
+# ==================== Handlers ====================
+
+def run_pay_run_batch(db: Session, params: dict, context: JobContext) -> dict:
+    """Generate pay runs for a period (as POST /pay-runs/batch/)"""
+    batch = PayRunBatchCreate.model_validate(params)
+    calculator = PayrollCalculator(db, executor=get_payroll_executor())
+
+    pay_runs, errors, skipped = calculator.create_pay_runs_batch(
+        start_period=batch.start_period,
+        end_period=batch.end_period,
+        pay_date=batch.pay_date,
+        employee_ids=batch.employee_ids,
+        notes=batch.notes
+    )
+    result_cache.invalidate("pay_runs")
+    processed = len(pay_runs) + len(errors) + len(skipped)
+    context.progress(processed, processed)
+
+    return {
+        "created_count": len(pay_runs),
+        "error_count": len(errors),
+        "skipped_count": len(skipped),
+        "pay_run_ids": [pay_run.pay_run_id for pay_run in pay_runs],
+        "errors": errors,
+        "skipped_employee_ids": skipped,
+    }
+
+
+def run_pay_run_recalculate(db: Session, params: dict, context: JobContext) -> dict:
+    """Recalculate pay runs one by one; paid or missing ones are reported in errors"""
+    pay_run_ids = PayRunRecalculateJobCreate.model_validate(params).pay_run_ids
+    calculator = PayrollCalculator(db)
+    recalculated, errors = [], []
+
+    context.progress(0, len(pay_run_ids))
+    try:
+        for done, pay_run_id in enumerate(pay_run_ids, 1):
+            pay_run = db.query(PayRun).filter(PayRun.pay_run_id == pay_run_id).first()
+            if pay_run is None:
+                errors.append({"pay_run_id": pay_run_id, "error": "Pay run not found"})
+            else:
+                try:
+                    calculator.recalculate_pay_run(pay_run)
+                    recalculated.append(pay_run_id)
+                except ValueError as e:
+                    db.rollback()
+                    errors.append({"pay_run_id": pay_run_id, "error": str(e)})
+            context.progress(done)
+    finally:
+        if recalculated:
+            result_cache.invalidate("pay_runs")
+    context.progress(len(pay_run_ids), len(pay_run_ids))
+
+    return {
+        "recalculated_count": len(recalculated),
+        "error_count": len(errors),
+        "pay_run_ids": recalculated,
+        "errors": errors,
+    }
+
+
+def run_pay_run_recalculate_pending(db: Session, params: dict, context: JobContext) -> dict:
+    """Recalculate matching pending pay runs in one pass (as POST /pay-runs/recalculate/)"""
+    selection = PayRunBulkRecalculate.model_validate(params)
+    calculator = PayrollCalculator(db)
+
+    updated_ids, unchanged_ids, skipped = calculator.recalculate_pay_runs(
+        pay_run_ids=selection.pay_run_ids,
+        start_date=selection.start_date,
+        end_date=selection.end_date,
+        employee_ids=selection.employee_ids
+    )
+    if updated_ids:
+        result_cache.invalidate("pay_runs")
+    processed = len(updated_ids) + len(unchanged_ids) + len(skipped)
+    context.progress(processed, processed)
+
+    return {
+        "updated_count": len(updated_ids),
+        "unchanged_count": len(unchanged_ids),
+        "skipped_count": len(skipped),
+        "updated_pay_run_ids": updated_ids,
+        "skipped": skipped,
+    }
+
+
+def run_pay_run_export(db: Session, params: dict, context: JobContext) -> dict:
+    """Write the export to JOB_OUTPUT_DIR; GET /jobs/{id}/download/ serves it"""
+    export = PayRunExportJobCreate.model_validate(params)
+    filename = export_filename(export.format, export.gzip)
+    JOB_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    path = JOB_OUTPUT_DIR / f"job-{context.job_id}-{filename}"
+    partial = path.with_name(path.name + ".part")
+
+    written = 0
+    with partial.open("wb") as output:
+        for chunk in export_pay_runs(
+            db, export.format, export.gzip,
+            employee_id=export.employee_id,
+            start_date=export.start_date,
+            end_date=export.end_date,
+            payment_status=export.payment_status
+        ):
+            output.write(chunk)
+            written += len(chunk)
+            context.progress(written)
+    partial.replace(path)
+    context.progress(written, written)
+
+    return {"file": path.name, "filename": filename, "bytes": written}
+
+
+HANDLERS = {
+    "pay_run_batch": run_pay_run_batch,
+    "pay_run_recalculate": run_pay_run_recalculate,
+    "pay_run_recalculate_pending": run_pay_run_recalculate_pending,
+    "pay_run_export": run_pay_run_export,
+}
+
+
+# ==================== Queue ====================
+
+def enqueue(db: Session, kind: str, params: dict) -> Job:
+    """
+    Queue a job and wake this process's workers
+
+    Args:
+        db: Database session
+        kind: Handler name (a key of HANDLERS)
+        params: JSON-serialisable handler input
+
+    Raises:
+        ValueError: If no handler exists for kind
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+
+    job = Job(kind=kind, params=params, status=JobStatus.QUEUED)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    notify_job_worker()
+    return job
+
+
+def claim_next(db: Session, worker_id: str) -> Job | None:
+    """
+    Claim the oldest queued (or abandoned) job for this worker
+
+    The candidate row is locked with FOR UPDATE SKIP LOCKED, so concurrent
+    workers on PostgreSQL each pick a different job instead of waiting. The
+    claiming UPDATE also matches the attempt count it read, so on databases
+    without row locks (SQLite) only one of two racing workers wins.
+
+    Returns:
+        The claimed job, or None if there is nothing to run
+    """
+    now = _now()
+    candidate = db.query(Job.job_id, Job.status, Job.attempts).filter(
+        or_(
+            Job.status == JobStatus.QUEUED,
+            and_(Job.status == JobStatus.RUNNING, Job.heartbeat_at < now - timedelta(seconds=JOB_LEASE_SECONDS))
+        )
+    ).order_by(Job.job_id).limit(1).with_for_update(skip_locked=True).first()
+    if candidate is None:
+        db.rollback()
+        return None
+
+    claim = db.query(Job).filter(
+        Job.job_id == candidate.job_id, Job.status == candidate.status, Job.attempts == candidate.attempts
+    )
+    if candidate.attempts >= JOB_MAX_ATTEMPTS:
+        claim.update({
+            Job.status: JobStatus.FAILED,
+            Job.error: f"Abandoned after {candidate.attempts} attempts (worker stopped responding)",
+            Job.finished_at: now,
+        }, synchronize_session=False)
+        db.commit()
+        return None
+
+    claimed = claim.update({
+        Job.status: JobStatus.RUNNING,
+        Job.attempts: candidate.attempts + 1,
+        Job.locked_by: worker_id,
+        Job.heartbeat_at: now,
+        Job.started_at: now,
+    }, synchronize_session=False)
+    db.commit()
+    if claimed != 1:
+        return None
+    return db.query(Job).filter(Job.job_id == candidate.job_id).first()
+
+
+def run_job(job: Job):
+    """Run a claimed job's handler and record its result or error"""
+    context = JobContext(job.job_id, job.attempts)
+    values = {Job.finished_at: None}
+
+    db = SessionLocal()
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind '{job.kind}'")
+        values[Job.result] = handler(db, job.params, context)
+        values[Job.status] = JobStatus.SUCCEEDED
+    except JobLeaseLost:
+        logger.warning("Job %s lost its lease; leaving it to the new worker", job.job_id)
+        return
+    except Exception as e:
+        db.rollback()
+        logger.exception("Job %s (%s) failed", job.job_id, job.kind)
+        values[Job.status] = JobStatus.FAILED
+        values[Job.error] = str(e) or type(e).__name__
+    finally:
+        db.close()
+
+    values[Job.finished_at] = _now()
+    db = SessionLocal()
+    try:
+        db.query(Job).filter(
+            Job.job_id == job.job_id, Job.attempts == job.attempts, Job.status == JobStatus.RUNNING
+        ).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+class JobWorker:
+    """
+    Thread pool that claims and runs jobs in this process
+
+    Jobs run synchronously on their thread with their own sessions. One
+    extra thread refreshes the heartbeat of every job this process holds.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, poll_seconds: float = JOB_POLL_SECONDS):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True)
+            for n in range(self.workers)
+        ]
+        self._threads.append(threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop claiming jobs; running jobs get up to timeout seconds to finish"""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """Wake idle workers (a job was just queued)"""
+        self._wake.set()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                db = SessionLocal()
+                try:
+                    job = claim_next(db, self.worker_id)
+                finally:
+                    db.close()
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+
+            if job is not None:
+                run_job(job)
+                continue
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def _heartbeat(self):
+        while not self._stopping.wait(JOB_LEASE_SECONDS / 3):
+            db = SessionLocal()
+            try:
+                db.query(Job).filter(
+                    Job.locked_by == self.worker_id, Job.status == JobStatus.RUNNING
+                ).update({Job.heartbeat_at: _now()}, synchronize_session=False)
+                db.commit()
+            except Exception:
+                logger.exception("Could not refresh job heartbeats")
+            finally:
+                db.close()
+
+
+_job_worker: JobWorker | None = None
+
+
+def start_job_worker():
+    """Start this process's job workers unless JOB_WORKERS=0"""
+    global _job_worker
+    if JOB_WORKERS > 0 and _job_worker is None:
+        _job_worker = JobWorker()
+        _job_worker.start()
+
+
+def stop_job_worker():
+    global _job_worker
+    if _job_worker is not None:
+        _job_worker.stop()
+        _job_worker = None
+
+
+def notify_job_worker():
+    if _job_worker is not None:
+        _job_worker.notify()
@@ -0,0 +1,148 @@
+"""
+Parallel Payroll Execution
+Computes large payroll batches across a process pool; results are merged and
+committed by the calling session in one transaction
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import repeat
+
+from sqlalchemy.orm import Session
+
+from app.database import IS_MEMORY_DATABASE
+from app.models import Employee, EmployeeStatus
+
+
+# "inline" computes batches in the request process, "process" uses the worker pool
+PAYROLL_EXECUTOR = os.getenv("PAYROLL_EXECUTOR", "inline").lower()
+
+if PAYROLL_EXECUTOR == "process" and IS_MEMORY_DATABASE:
+    # Spawned workers would each open their own, empty in-memory database
+    raise ValueError("PAYROLL_EXECUTOR=process needs a database the worker processes can share, not an in-memory one")
+
+# Number of worker processes and employees per shard
+PAYROLL_WORKERS = int(os.getenv("PAYROLL_WORKERS", os.cpu_count() or 1))
+PAYROLL_SHARD_SIZE = int(os.getenv("PAYROLL_SHARD_SIZE", 500))
+
+
+def _calculate_shard(start_period: date, end_period: date, employee_ids: list[int]) -> tuple[dict, list]:
+    """
+    Calculate one shard inside a worker process
+
+    Workers are spawned, so each imports app.database afresh and gets its own
+    engine and connection pool; the session is scoped to the shard.
+    """
+    from app.database import SessionLocal
+    from app.services.payroll import PayrollCalculator
+
+    db = SessionLocal()
+    try:
+        return PayrollCalculator(db).calculate_pay_runs_batch(start_period, end_period, employee_ids)
+    finally:
+        db.close()
+
+
+class ParallelPayrollExecutor:
+    """
+    Splits a batch into employee shards and calculates them in a process pool
+
+    The pool is created on first use and reused across batches. Workers only
+    read; the caller persists the merged results with its own session.
+    """
+
+    def __init__(self, workers: int = PAYROLL_WORKERS, shard_size: int = PAYROLL_SHARD_SIZE):
+        if workers < 1 or shard_size < 1:
+            raise ValueError("workers and shard_size must be at least 1")
+        self.workers = workers
+        self.shard_size = shard_size
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def calculate(
+        self,
+        db: Session,
+        start_period: date,
+        end_period: date,
+        employee_ids: list[int] | None = None
+    ) -> tuple[dict[int, dict], list[dict]]:
+        """
+        Calculate a batch shard by shard
+
+        Args:
+            db: Session used to resolve the employee list
+            start_period: Start date of the pay period
+            end_period: End date of the pay period
+            employee_ids: Optional list of employee IDs to limit the run to
+
+        Returns:
+            Tuple of (calculations keyed by employee_id, list of per-employee errors),
+            in the same form as PayrollCalculator.calculate_pay_runs_batch
+        """
+        if employee_ids is None:
+            employee_ids = [
+                employee_id for (employee_id,) in db.query(Employee.employee_id).filter(
+                    Employee.status == EmployeeStatus.ACTIVE
+                ).order_by(Employee.employee_id)
+            ]
+        else:
+            employee_ids = list(dict.fromkeys(employee_ids))
+
+        shards = [
+            employee_ids[i:i + self.shard_size]
+            for i in range(0, len(employee_ids), self.shard_size)
+        ]
+
+        if len(shards) <= 1 or self.workers == 1:
+            from app.services.payroll import PayrollCalculator
+            return PayrollCalculator(db).calculate_pay_runs_batch(start_period, end_period, employee_ids)
+
+        results: dict[int, dict] = {}
+        errors: list[dict] = []
+
+        shard_outputs = self._get_pool().map(
+            _calculate_shard, repeat(start_period), repeat(end_period), shards
+        )
+        for shard_results, shard_errors in shard_outputs:
+            results.update(shard_results)
+            errors.extend(shard_errors)
+
+        return results, errors
+
+
+_default_executor: ParallelPayrollExecutor | None = None
+
+
+def get_payroll_executor() -> ParallelPayrollExecutor | None:
+    """Shared executor when PAYROLL_EXECUTOR=process, otherwise None (inline)"""
+    global _default_executor
+    if PAYROLL_EXECUTOR != "process":
+        return None
+    if _default_executor is None:
+        _default_executor = ParallelPayrollExecutor()
+    return _default_executor
+
+
+def shutdown_payroll_executor():
+    """Stop the shared worker pool, if one was started"""
+    if _default_executor is not None:
+        _default_executor.shutdown()
@@ -0,0 +1,136 @@
+"""
+Pay Run Export
+Streams pay runs as CSV or NDJSON through a server-side cursor
+
+Rows are fetched in chunks and written to small buffers, so memory use stays
+flat no matter how much history is exported.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import PayRun, PaymentStatus
+
+
+# Every pay_runs column, in table order
+EXPORT_COLUMNS = [column.name for column in PayRun.__table__.columns]
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_FETCH_SIZE = 2000
+
+# Bytes buffered before a chunk is handed to the response
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def filter_pay_runs(
+    query,
+    employee_id: int | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    payment_status: PaymentStatus | None = None
+):
+    """Apply the pay run list filters to a Query or Select"""
+    if employee_id:
+        query = query.filter(PayRun.employee_id == employee_id)
+    if start_date:
+        query = query.filter(PayRun.start_period >= start_date)
+    if end_date:
+        query = query.filter(PayRun.end_period <= end_date)
+    if payment_status:
+        query = query.filter(PayRun.payment_status == payment_status)
+    return query
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def _encoded_rows(rows, fmt: str) -> Iterator[str]:
+    """Encode rows into text chunks of roughly EXPORT_CHUNK_BYTES"""
+    buffer = io.StringIO()
+
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        write = lambda row: writer.writerow([_text(value) for value in row])
+    else:
+        write = lambda row: buffer.write(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) + "\n"
+        )
+
+    for row in rows:
+        write(row)
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_pay_runs(db: Session, fmt: str = "csv", compress: bool = False, **filters) -> Iterator[bytes]:
+    """
+    Stream filtered pay runs, oldest first
+
+    Args:
+        db: Database session; it must stay open until the iterator is exhausted
+        fmt: "csv" or "ndjson"
+        compress: Gzip the output
+        **filters: employee_id, start_date, end_date, payment_status (as for the list endpoint)
+
+    Yields:
+        Encoded (and optionally gzipped) chunks
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+
+    stmt = filter_pay_runs(select(*PayRun.__table__.columns), **filters).order_by(PayRun.pay_run_id)
+    rows = db.execute(stmt.execution_options(yield_per=EXPORT_FETCH_SIZE))
+
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    try:
+        for chunk in _encoded_rows(rows, fmt):
+            data = chunk.encode("utf-8")
+            if compressor is None:
+                yield data
+            elif compressed := compressor.compress(data):
+                yield compressed
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        rows.close()
+
+
+def export_filename(fmt: str, compress: bool = False) -> str:
+    return f"pay_runs.{fmt}" + (".gz" if compress else "")
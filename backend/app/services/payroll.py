@@ -3,22 +3,68 @@ Payroll Calculation Services
 Core business logic for calculating employee pay, taxes, and deductions
 """
 
-from decimal import Decimal
+import os
+from decimal import Decimal, ROUND_HALF_UP
 from datetime import date, datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, insert, update
+from sqlalchemy.exc import IntegrityError
 
-from app.models import Employee, WorkHours, PayRun, TaxDeductionProfile, PayType, PaymentStatus
+from app.database import conflict_insert
+from app.models import (
+    Employee, WorkHours, PayRun, TaxDeductionProfile, PayrollPeriodTotal,
+    PayType, PaymentStatus, EmployeeStatus, PAY_RUN_UNIQUE_WHERE
+)
 from app.schemas import PayRunCreate
+from app.services.tax_tables import pit_schedules
+from app.services.payroll_totals import PayrollTotalsDelta, snapshot, TOTAL_COLUMNS
+
+
+# Engine used for bulk calculations: "decimal" (per employee) or "vectorized" (NumPy, fixed-point)
+PAYROLL_ENGINE = os.getenv("PAYROLL_ENGINE", "decimal").lower()
+
+# Cross-check vectorized results against the Decimal path and fail on any difference
+PAYROLL_ENGINE_PARITY = os.getenv("PAYROLL_ENGINE_PARITY", "False").lower() == "true"
+
+CENT = Decimal("0.01")
+
+# Columns written when a pay run is inserted; the rest are database defaults
+PAY_RUN_INSERT_COLUMNS = [
+    column.key for column in PayRun.__table__.columns
+    if column.key not in ("pay_run_id", "created_at", "updated_at", "processed_at")
+]
+
+
+class DuplicatePayRunError(ValueError):
+    """The employee already has a (non-cancelled) pay run for the period"""
+
+
+def round_to_cents(calc: dict) -> dict:
+    """
+    Round calculated amounts to the 2 decimal places pay run columns hold
+
+    PostgreSQL rounds on insert, but SQLite would store the unrounded value,
+    so amounts are rounded before they are written on every backend.
+    """
+    return {
+        field: value.quantize(CENT, rounding=ROUND_HALF_UP) if isinstance(value, Decimal) else value
+        for field, value in calc.items()
+    }
 
 
 class PayrollCalculator:
     """
     Handles all payroll calculations for both hourly and salary employees
+    
+    Batch runs are calculated in-process unless an executor (such as
+    ParallelPayrollExecutor) is given, in which case it calculates and this
+    session persists the merged results.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, executor=None):
         self.db = db
+        self.executor = executor
     
     def calculate_pay_run(
         self,
@@ -67,19 +113,35 @@ class PayrollCalculator:
     ) -> dict:
         """Calculate pay for hourly employees"""
         
-        # Get work hours for the period
-        work_hours = self.db.query(WorkHours).filter(
+        # Sum approved work hours for the period in the database
+        regular_hours, overtime_hours = self.db.query(
+            func.coalesce(func.sum(WorkHours.hours_worked), 0),
+            func.coalesce(func.sum(WorkHours.overtime_hours), 0)
+        ).filter(
             and_(
                 WorkHours.employee_id == employee.employee_id,
+                WorkHours.is_approved == True,
                 WorkHours.date >= start_period,
-                WorkHours.date <= end_period,
-                WorkHours.is_approved == True
+                WorkHours.date <= end_period
             )
-        ).all()
+        ).one()
         
-        # Sum up hours
-        regular_hours = sum(Decimal(str(wh.hours_worked)) for wh in work_hours)
-        overtime_hours = sum(Decimal(str(wh.overtime_hours)) for wh in work_hours)
+        return self._hourly_pay_from_hours(
+            employee, regular_hours, overtime_hours, bonuses, tax_profile, as_of=end_period
+        )
+    
+    def _hourly_pay_from_hours(
+        self,
+        employee: Employee,
+        regular_hours: Decimal,
+        overtime_hours: Decimal,
+        bonuses: Decimal,
+        tax_profile: TaxDeductionProfile | None,
+        as_of: date | None = None
+    ) -> dict:
+        """Calculate hourly pay from already-summed approved hours"""
+        regular_hours = Decimal(regular_hours)
+        overtime_hours = Decimal(overtime_hours)
         
         # Calculate pay
         hourly_rate = Decimal(str(employee.hourly_rate or 0))
@@ -90,7 +152,7 @@ class PayrollCalculator:
         gross_pay = regular_pay + overtime_pay + bonuses
         
         # Calculate taxes and deductions
-        tax_deduct = self._calculate_taxes_and_deductions(gross_pay, tax_profile)
+        tax_deduct = self._calculate_taxes_and_deductions(gross_pay, tax_profile, as_of)
         
         net_pay = gross_pay - tax_deduct['total_taxes'] - tax_deduct['total_deductions']
         
@@ -123,7 +185,7 @@ class PayrollCalculator:
         gross_pay = regular_pay + bonuses
         
         # Calculate taxes and deductions
-        tax_deduct = self._calculate_taxes_and_deductions(gross_pay, tax_profile)
+        tax_deduct = self._calculate_taxes_and_deductions(gross_pay, tax_profile, end_period)
         
         net_pay = gross_pay - tax_deduct['total_taxes'] - tax_deduct['total_deductions']
         
@@ -138,11 +200,13 @@ class PayrollCalculator:
             **tax_deduct
         }
     
-    def _calculate_nigerian_pit(self, annual_income: Decimal) -> Decimal:
+    def _calculate_nigerian_pit(self, annual_income: Decimal, as_of: date | None = None) -> Decimal:
         """
         Calculate Nigerian Personal Income Tax (PIT) using progressive brackets
         
-        Tax Brackets (annual):
+        Brackets come from the PIT schedule version in force on as_of (see
+        app.services.tax_tables). Until a version is published the statutory
+        brackets apply:
         - ₦0 - ₦300,000: 7%
         - ₦300,000 - ₦600,000: 11%
         - ₦600,000 - ₦1,100,000: 15%
@@ -152,49 +216,18 @@ class PayrollCalculator:
         
         Args:
             annual_income: Annual taxable income in Naira
+            as_of: Date whose schedule applies (defaults to today)
             
         Returns:
             Annual PIT amount
         """
-        if annual_income <= 0:
-            return Decimal("0.0")
-        
-        # Define tax brackets (amounts in Naira)
-        brackets = [
-            (Decimal("300000"), Decimal("0.07")),    # First ₦300K at 7%
-            (Decimal("600000"), Decimal("0.11")),    # Next ₦300K at 11%
-            (Decimal("1100000"), Decimal("0.15")),   # Next ₦500K at 15%
-            (Decimal("1600000"), Decimal("0.19")),   # Next ₦500K at 19%
-            (Decimal("3200000"), Decimal("0.21")),   # Next ₦1.6M at 21%
-            (None, Decimal("0.24"))                   # Remaining at 24%
-        ]
-        
-        tax = Decimal("0.0")
-        previous_limit = Decimal("0.0")
-        
-        for limit, rate in brackets:
-            if limit is None:
-                # Last bracket - all remaining income
-                taxable_in_bracket = annual_income - previous_limit
-                tax += taxable_in_bracket * rate
-                break
-            elif annual_income > limit:
-                # Income exceeds this bracket - tax the full bracket
-                taxable_in_bracket = limit - previous_limit
-                tax += taxable_in_bracket * rate
-                previous_limit = limit
-            else:
-                # Income falls within this bracket
-                taxable_in_bracket = annual_income - previous_limit
-                tax += taxable_in_bracket * rate
-                break
-        
-        return tax
+        return pit_schedules.for_date(as_of, self.db).tax(annual_income)
     
     def _calculate_taxes_and_deductions(
         self,
         gross_pay: Decimal,
-        tax_profile: TaxDeductionProfile | None
+        tax_profile: TaxDeductionProfile | None,
+        as_of: date | None = None
     ) -> dict:
         """
         Calculate all taxes and deductions (Nigerian system)
@@ -202,6 +235,7 @@ class PayrollCalculator:
         Args:
             gross_pay: The gross pay amount
             tax_profile: The tax/deduction profile to use
+            as_of: Date whose PIT schedule applies (normally the end of the pay period)
             
         Returns:
             Dictionary with all tax and deduction amounts
@@ -210,7 +244,7 @@ class PayrollCalculator:
             # Default Nigerian deductions if no profile
             # Assume monthly gross pay, annualize for PIT calculation
             annual_income = gross_pay * Decimal("12")
-            annual_pit = self._calculate_nigerian_pit(annual_income)
+            annual_pit = self._calculate_nigerian_pit(annual_income, as_of)
             monthly_pit = annual_pit / Decimal("12")
             
             pension = gross_pay * Decimal("0.10")  # 10% pension
@@ -229,12 +263,6 @@ class PayrollCalculator:
                 'total_deductions': Decimal("0.0")
             }
         
-        # Calculate Nigerian PIT from profile rate (if using custom rate)
-        # Annualize gross pay for progressive calculation
-        annual_income = gross_pay * Decimal("12")
-        annual_pit = self._calculate_nigerian_pit(annual_income)
-        monthly_pit = annual_pit / Decimal("12")
-        
         # Use profile rates (federal_tax_rate is PIT rate)
         pit = gross_pay * Decimal(str(tax_profile.federal_tax_rate))
         state_tax = gross_pay * Decimal(str(tax_profile.state_tax_rate))
@@ -291,12 +319,253 @@ class PayrollCalculator:
             
         Returns:
             Created PayRun object
+            
+        Raises:
+            DuplicatePayRunError: If the employee already has a pay run for the period
+            ValueError: If the pay run cannot be calculated
         """
+        existing_ids = self._existing_pay_run_employees(start_period, end_period, [employee_id])
+        if existing_ids:
+            raise DuplicatePayRunError(
+                f"Employee {employee_id} already has pay run {existing_ids[employee_id]} "
+                f"for {start_period} to {end_period}"
+            )
+        
         # Calculate pay
         calc = self.calculate_pay_run(employee_id, start_period, end_period, bonuses)
         
         # Create pay run
-        pay_run = PayRun(
+        pay_run = self._build_pay_run(employee_id, start_period, end_period, pay_date, calc, notes)
+        
+        totals = PayrollTotalsDelta()
+        totals.created(pay_run)
+        
+        self.db.add(pay_run)
+        try:
+            self.db.flush()
+        except IntegrityError:
+            # A concurrent request created it between the check and the insert
+            self.db.rollback()
+            raise DuplicatePayRunError(
+                f"Employee {employee_id} already has a pay run for {start_period} to {end_period}"
+            )
+        totals.apply(self.db)
+        self.db.commit()
+        self.db.refresh(pay_run)
+        
+        return pay_run
+    
+    def recalculate_pay_run(self, pay_run: PayRun) -> PayRun:
+        """
+        Recalculate an unpaid pay run from current hours, rates and tax profile
+        
+        Bonuses are kept. The payroll period totals are adjusted in the same
+        transaction.
+        
+        Args:
+            pay_run: Pay run loaded in this calculator's session
+            
+        Returns:
+            The updated PayRun
+            
+        Raises:
+            ValueError: If the pay run is already paid or cannot be calculated
+        """
+        if pay_run.payment_status == PaymentStatus.PAID:
+            raise ValueError("Cannot recalculate a pay run that has already been paid")
+        
+        calc = self.calculate_pay_run(pay_run.employee_id, pay_run.start_period, pay_run.end_period, pay_run.bonuses)
+        
+        before = snapshot(pay_run)
+        for field, value in round_to_cents(calc).items():
+            setattr(pay_run, field, value)
+        
+        totals = PayrollTotalsDelta()
+        totals.changed(before, pay_run)
+        totals.apply(self.db)
+        self.db.commit()
+        self.db.refresh(pay_run)
+        
+        return pay_run
+    
+    def recalculate_pay_runs(
+        self,
+        pay_run_ids: list[int] | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        employee_ids: list[int] | None = None
+    ) -> tuple[list[int], list[int], list[dict]]:
+        """
+        Recalculate every pending pay run matching the filters in one transaction
+        
+        Gives the same results as recalculate_pay_run for each run, but reads
+        the pay runs, employees and tax profiles with one query each and the
+        approved hours with one grouped query per pay period. Only runs whose
+        values changed are written, with a single bulk UPDATE by primary key.
+        
+        Args:
+            pay_run_ids: Only these pay runs
+            start_date / end_date: Only pay runs whose period lies within this range
+            employee_ids: Only these employees' pay runs
+            
+        Returns:
+            Tuple of (updated pay run IDs, unchanged pay run IDs, requested
+            pay_run_ids that were skipped, with the reason)
+        """
+        query = self.db.query(PayRun).filter(PayRun.payment_status == PaymentStatus.PENDING)
+        if pay_run_ids is not None:
+            query = query.filter(PayRun.pay_run_id.in_(pay_run_ids))
+        if start_date is not None:
+            query = query.filter(PayRun.start_period >= start_date)
+        if end_date is not None:
+            query = query.filter(PayRun.end_period <= end_date)
+        if employee_ids is not None:
+            query = query.filter(PayRun.employee_id.in_(employee_ids))
+        # Lock the runs so a concurrent approval cannot pay one mid-recalculation
+        pay_runs = query.order_by(PayRun.pay_run_id).with_for_update().all()
+        
+        skipped = []
+        if pay_run_ids is not None:
+            matched = {pay_run.pay_run_id for pay_run in pay_runs}
+            missing = [pay_run_id for pay_run_id in dict.fromkeys(pay_run_ids) if pay_run_id not in matched]
+            if missing:
+                statuses = dict(self.db.query(PayRun.pay_run_id, PayRun.payment_status).filter(
+                    PayRun.pay_run_id.in_(missing)
+                ).all())
+                for pay_run_id in missing:
+                    current = statuses.get(pay_run_id)
+                    if current is None:
+                        reason = "not found"
+                    elif PaymentStatus(current) == PaymentStatus.PENDING:
+                        reason = "does not match the filters"
+                    else:
+                        reason = f"already {PaymentStatus(current).value}"
+                    skipped.append({'pay_run_id': pay_run_id, 'reason': reason})
+        if not pay_runs:
+            return [], [], skipped
+        
+        employees = {
+            employee.employee_id: employee
+            for employee in self.db.query(Employee).filter(
+                Employee.employee_id.in_({pay_run.employee_id for pay_run in pay_runs})
+            )
+        }
+        profile_ids = {e.tax_deduction_profile_id for e in employees.values() if e.tax_deduction_profile_id}
+        profiles = {}
+        if profile_ids:
+            profiles = {
+                profile.profile_id: profile
+                for profile in self.db.query(TaxDeductionProfile).filter(
+                    TaxDeductionProfile.profile_id.in_(profile_ids)
+                )
+            }
+        
+        # Approved hours of the hourly employees, per pay period
+        hourly_by_period: dict[tuple[date, date], set[int]] = {}
+        for pay_run in pay_runs:
+            if employees[pay_run.employee_id].pay_type == PayType.HOURLY:
+                hourly_by_period.setdefault((pay_run.start_period, pay_run.end_period), set()).add(pay_run.employee_id)
+        hours = {
+            period: self._load_approved_hours(list(hourly_ids), *period)
+            for period, hourly_ids in hourly_by_period.items()
+        }
+        
+        updates, updated_ids, unchanged_ids = [], [], []
+        totals = PayrollTotalsDelta()
+        for pay_run in pay_runs:
+            employee = employees[pay_run.employee_id]
+            tax_profile = profiles.get(employee.tax_deduction_profile_id)
+            bonuses = Decimal(str(pay_run.bonuses or 0))
+            if employee.pay_type == PayType.HOURLY:
+                regular_hours, overtime_hours = hours[(pay_run.start_period, pay_run.end_period)].get(
+                    employee.employee_id, (Decimal("0.0"), Decimal("0.0"))
+                )
+                calc = self._hourly_pay_from_hours(
+                    employee, regular_hours, overtime_hours, bonuses, tax_profile, as_of=pay_run.end_period
+                )
+            else:
+                calc = self._calculate_salary_pay(
+                    employee, pay_run.start_period, pay_run.end_period, bonuses, tax_profile
+                )
+            calc = round_to_cents(calc)
+            
+            if all(getattr(pay_run, field) == value for field, value in calc.items()):
+                unchanged_ids.append(pay_run.pay_run_id)
+                continue
+            
+            before = snapshot(pay_run)
+            totals.add(before, sign=-1)
+            totals.add({**before, **{column: calc[column] for column in TOTAL_COLUMNS}})
+            updates.append({'pay_run_id': pay_run.pay_run_id, **calc})
+            updated_ids.append(pay_run.pay_run_id)
+        
+        if updates:
+            self.db.execute(update(PayRun), updates)
+            totals.apply(self.db)
+        self.db.commit()
+        
+        return updated_ids, unchanged_ids, skipped
+    
+    def _existing_pay_run_employees(
+        self,
+        start_period: date,
+        end_period: date,
+        employee_ids: list[int] | None = None
+    ) -> dict[int, int]:
+        """Non-cancelled pay runs for exactly this period, as {employee_id: pay_run_id}"""
+        query = self.db.query(PayRun.employee_id, PayRun.pay_run_id).filter(
+            PayRun.start_period == start_period,
+            PayRun.end_period == end_period,
+            PayRun.payment_status != PaymentStatus.CANCELLED
+        )
+        if employee_ids is not None:
+            query = query.filter(PayRun.employee_id.in_(employee_ids))
+        return dict(query.all())
+    
+    def _active_employee_ids(self) -> list[int]:
+        """IDs of all active employees"""
+        return [
+            employee_id for (employee_id,) in
+            self.db.query(Employee.employee_id).filter(Employee.status == EmployeeStatus.ACTIVE)
+        ]
+    
+    def _insert_pay_runs(self, pay_runs: list[PayRun]) -> dict[int, int]:
+        """
+        Insert pay runs, skipping any the (employee, period) unique index rejects
+        
+        Runs as one multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING, so a
+        concurrent batch for the same period cannot create duplicates or fail
+        this one.
+        
+        Returns:
+            {employee_id: pay_run_id} of the inserted rows
+        """
+        rows = [{column: getattr(pay_run, column) for column in PAY_RUN_INSERT_COLUMNS} for pay_run in pay_runs]
+        
+        dialect_insert = conflict_insert(self.db.get_bind(), "uq_pay_runs_employee_period")
+        if dialect_insert is None:
+            stmt = insert(PayRun.__table__)
+        else:
+            stmt = dialect_insert(PayRun.__table__).on_conflict_do_nothing(
+                index_elements=["employee_id", "start_period", "end_period"],
+                index_where=PAY_RUN_UNIQUE_WHERE
+            )
+        table = PayRun.__table__
+        result = self.db.execute(stmt.returning(table.c.employee_id, table.c.pay_run_id), rows)
+        return dict(result.all())
+    
+    def _build_pay_run(
+        self,
+        employee_id: int,
+        start_period: date,
+        end_period: date,
+        pay_date: date | None,
+        calc: dict,
+        notes: str | None
+    ) -> PayRun:
+        """Build a pending PayRun from calculated pay components"""
+        calc = round_to_cents(calc)
+        return PayRun(
             employee_id=employee_id,
             start_period=start_period,
             end_period=end_period,
@@ -321,40 +590,312 @@ class PayrollCalculator:
             payment_status=PaymentStatus.PENDING,
             notes=notes
         )
+    
+    def _load_approved_hours(
+        self,
+        employee_ids: list[int],
+        start_period: date,
+        end_period: date
+    ) -> dict[int, tuple[Decimal, Decimal]]:
+        """
+        Sum approved work hours for many employees with one grouped query
         
-        self.db.add(pay_run)
-        self.db.commit()
-        self.db.refresh(pay_run)
+        Employees without approved hours in the period are absent from the result.
         
-        return pay_run
+        Returns:
+            Dictionary of employee_id -> (regular_hours, overtime_hours)
+        """
+        if not employee_ids:
+            return {}
+        
+        rows = self.db.query(
+            WorkHours.employee_id,
+            func.sum(WorkHours.hours_worked),
+            func.sum(WorkHours.overtime_hours)
+        ).filter(
+            and_(
+                WorkHours.employee_id.in_(employee_ids),
+                WorkHours.is_approved == True,
+                WorkHours.date >= start_period,
+                WorkHours.date <= end_period
+            )
+        ).group_by(WorkHours.employee_id).all()
+        
+        return {employee_id: (regular, overtime) for employee_id, regular, overtime in rows}
     
-    def approve_pay_runs(self, pay_run_ids: list[int]) -> list[PayRun]:
+    def calculate_pay_runs_batch(
+        self,
+        start_period: date,
+        end_period: date,
+        employee_ids: list[int] | None = None
+    ) -> tuple[dict[int, dict], list[dict]]:
         """
-        Approve multiple pay runs at once
+        Calculate pay runs for all active employees (or a subset) for one period.
+        
+        Employees, tax profiles and approved hours are loaded with one query each
+        instead of one round of queries per employee. Hourly employees without
+        approved hours in the period have nothing to pay yet and are left out
+        of both the calculations and the errors.
         
         Args:
-            pay_run_ids: List of pay run IDs to approve
+            start_period: Start date of the pay period
+            end_period: End date of the pay period
+            employee_ids: Optional list of employee IDs to limit the run to
             
         Returns:
-            List of updated PayRun objects
+            Tuple of (calculations keyed by employee_id, list of per-employee errors)
         """
-        pay_runs = self.db.query(PayRun).filter(PayRun.pay_run_id.in_(pay_run_ids)).all()
+        query = self.db.query(Employee).filter(Employee.status == EmployeeStatus.ACTIVE)
+        if employee_ids is not None:
+            query = query.filter(Employee.employee_id.in_(employee_ids))
+        employees = query.order_by(Employee.employee_id).all()
         
-        for pay_run in pay_runs:
-            pay_run.payment_status = PaymentStatus.PAID
-            pay_run.processed_at = datetime.utcnow()
+        errors = []
+        if employee_ids is not None:
+            found_ids = {employee.employee_id for employee in employees}
+            for employee_id in dict.fromkeys(employee_ids):
+                if employee_id not in found_ids:
+                    errors.append({
+                        'employee_id': employee_id,
+                        'error': f"Employee {employee_id} not found or not active"
+                    })
+        
+        # Get tax profiles
+        profile_ids = {e.tax_deduction_profile_id for e in employees if e.tax_deduction_profile_id}
+        profiles = {}
+        if profile_ids:
+            profiles = {
+                profile.profile_id: profile
+                for profile in self.db.query(TaxDeductionProfile).filter(
+                    TaxDeductionProfile.profile_id.in_(profile_ids)
+                ).all()
+            }
+        
+        # Get approved hours for hourly employees
+        hours = self._load_approved_hours(
+            [e.employee_id for e in employees if e.pay_type == PayType.HOURLY],
+            start_period,
+            end_period
+        )
         
+        payable = []
+        for employee in employees:
+            error = None
+            if employee.pay_type == PayType.HOURLY:
+                if not employee.hourly_rate:
+                    error = f"Employee {employee.employee_id} has no hourly rate"
+                elif employee.employee_id not in hours:
+                    continue
+            elif not employee.salary_amount:
+                error = f"Employee {employee.employee_id} has no salary amount"
+            
+            if error:
+                errors.append({'employee_id': employee.employee_id, 'error': error})
+            else:
+                payable.append(employee)
+        
+        if PAYROLL_ENGINE == "vectorized":
+            return self._calculate_batch_vectorized(payable, profiles, hours, end_period), errors
+        
+        results = {}
+        for employee in payable:
+            tax_profile = profiles.get(employee.tax_deduction_profile_id)
+            
+            if employee.pay_type == PayType.HOURLY:
+                regular_hours, overtime_hours = hours[employee.employee_id]
+                results[employee.employee_id] = self._hourly_pay_from_hours(
+                    employee, regular_hours, overtime_hours, Decimal("0.0"), tax_profile, as_of=end_period
+                )
+            else:
+                results[employee.employee_id] = self._calculate_salary_pay(
+                    employee, start_period, end_period, Decimal("0.0"), tax_profile
+                )
+        
+        return results, errors
+    
+    def _calculate_batch_vectorized(
+        self,
+        employees: list[Employee],
+        profiles: dict[int, TaxDeductionProfile],
+        hours: dict[int, tuple[Decimal, Decimal]],
+        end_period: date
+    ) -> dict[int, dict]:
+        """Calculate a batch with the columnar fixed-point engine"""
+        from app.services import payroll_engine
+        
+        if not employees:
+            return {}
+        
+        batch = payroll_engine.PayrollBatch.from_records(employees, profiles, hours)
+        result = payroll_engine.compute(
+            batch,
+            schedule=pit_schedules.for_date(end_period, self.db),
+            parity=PAYROLL_ENGINE_PARITY
+        )
+        
+        return {
+            int(employee_id): payroll_engine.row_to_decimal(result, index)
+            for index, employee_id in enumerate(batch.employee_id)
+        }
+    
+    def create_pay_runs_batch(
+        self,
+        start_period: date,
+        end_period: date,
+        pay_date: date | None = None,
+        employee_ids: list[int] | None = None,
+        notes: str | None = None
+    ) -> tuple[list[PayRun], list[dict], list[int]]:
+        """
+        Create pay runs for all active employees (or a subset) in one transaction
+        
+        Employees that already have a pay run for the period are skipped before
+        anything is calculated, so a batch can be re-run after a partial failure
+        (or by a retrying client) without duplicating or recomputing pay runs.
+        Hourly employees without approved hours are skipped too, and get their
+        pay run from a later batch once their hours are approved.
+        
+        Args:
+            start_period: Start date of the pay period
+            end_period: End date of the pay period
+            pay_date: Date the payment will be made
+            employee_ids: Optional list of employee IDs to limit the run to
+            notes: Optional notes added to every pay run
+            
+        Returns:
+            Tuple of (created PayRun objects, list of per-employee errors,
+            IDs of employees skipped because their pay run already exists or
+            they have no approved hours)
+        """
+        existing = self._existing_pay_run_employees(start_period, end_period, employee_ids)
+        skipped = []
+        if existing:
+            if employee_ids is None:
+                employee_ids = self._active_employee_ids()
+            skipped = sorted(employee_id for employee_id in set(employee_ids) if employee_id in existing)
+            employee_ids = [employee_id for employee_id in employee_ids if employee_id not in existing]
+            if not employee_ids:
+                return [], [], skipped
+        
+        if self.executor is not None:
+            results, errors = self.executor.calculate(self.db, start_period, end_period, employee_ids)
+        else:
+            results, errors = self.calculate_pay_runs_batch(start_period, end_period, employee_ids)
+        
+        # Neither calculated nor failed: hourly employees without approved hours
+        failed = {error['employee_id'] for error in errors}
+        considered = self._active_employee_ids() if employee_ids is None else employee_ids
+        skipped = sorted(skipped + [
+            employee_id for employee_id in set(considered)
+            if employee_id not in results and employee_id not in failed
+        ])
+        
+        pay_runs = {
+            employee_id: self._build_pay_run(employee_id, start_period, end_period, pay_date, calc, notes)
+            for employee_id, calc in results.items()
+        }
+        if not pay_runs:
+            return [], errors, skipped
+        
+        inserted = self._insert_pay_runs(list(pay_runs.values()))
+        
+        # The rollup only counts rows actually inserted
+        totals = PayrollTotalsDelta()
+        for employee_id in inserted:
+            totals.created(pay_runs[employee_id])
+        totals.apply(self.db)
         self.db.commit()
         
-        for pay_run in pay_runs:
-            self.db.refresh(pay_run)
+        # Rows a concurrent batch inserted first were skipped by ON CONFLICT
+        skipped = sorted(skipped + [employee_id for employee_id in pay_runs if employee_id not in inserted])
+        if not inserted:
+            return [], errors, skipped
+        
+        # Reload all created rows in one query instead of refreshing each
+        created = self.db.query(PayRun).filter(
+            PayRun.pay_run_id.in_(inserted.values())
+        ).order_by(PayRun.employee_id).all()
         
-        return pay_runs
+        return created, errors, skipped
+    
+    def approve_pay_runs(
+        self,
+        pay_run_ids: list[int] | None = None,
+        start_period: date | None = None,
+        end_period: date | None = None
+    ) -> tuple[list[PayRun], list[dict]]:
+        """
+        Approve multiple pending pay runs at once
+        
+        Runs as a single UPDATE ... WHERE payment_status = 'pending' RETURNING,
+        so only pending pay runs change and the response is built from the
+        returned rows without reloading them.
+        
+        Args:
+            pay_run_ids: Only these pay runs
+            start_period / end_period: Only pay runs whose period lies within
+                this range (the dashboard's selection)
+            
+        Returns:
+            Tuple of (approved PayRun objects, requested IDs skipped with the reason)
+        """
+        stmt = update(PayRun).where(PayRun.payment_status == PaymentStatus.PENDING)
+        if pay_run_ids is not None:
+            pay_run_ids = list(dict.fromkeys(pay_run_ids))
+            stmt = stmt.where(PayRun.pay_run_id.in_(pay_run_ids))
+        if start_period is not None:
+            stmt = stmt.where(PayRun.start_period >= start_period)
+        if end_period is not None:
+            stmt = stmt.where(PayRun.end_period <= end_period)
+        
+        approved = self.db.execute(
+            stmt
+            .values(payment_status=PaymentStatus.PAID, processed_at=datetime.utcnow())
+            .returning(PayRun)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        
+        totals = PayrollTotalsDelta()
+        for pay_run in approved:
+            after = snapshot(pay_run)
+            totals.add({**after, 'payment_status': PaymentStatus.PENDING}, sign=-1)
+            totals.add(after)
+        
+        # Explain anything that was not approved
+        approved_ids = {pay_run.pay_run_id for pay_run in approved}
+        skipped_ids = [pay_run_id for pay_run_id in pay_run_ids or () if pay_run_id not in approved_ids]
+        skipped = []
+        if skipped_ids:
+            statuses = dict(self.db.query(PayRun.pay_run_id, PayRun.payment_status).filter(
+                PayRun.pay_run_id.in_(skipped_ids)
+            ).all())
+            for pay_run_id in skipped_ids:
+                current = statuses.get(pay_run_id)
+                if current is None:
+                    reason = "not found"
+                elif PaymentStatus(current) == PaymentStatus.PENDING:
+                    reason = "outside the given period"
+                else:
+                    reason = f"already {PaymentStatus(current).value}"
+                skipped.append({'pay_run_id': pay_run_id, 'reason': reason})
+        
+        totals.apply(self.db)
+        
+        # Detach the rows RETURNING populated so commit does not expire them
+        for pay_run in approved:
+            self.db.expunge(pay_run)
+        self.db.commit()
+        
+        return approved, skipped
     
     def get_payroll_summary(self, start_period: date, end_period: date) -> dict:
         """
         Get summary of all pending payroll for a period
         
+        Totals come from the payroll_period_totals rollup, so the cost does
+        not grow with pay run history; use get_payroll_summary_pay_runs for
+        the matching pay runs.
+        
         Args:
             start_period: Start date
             end_period: End date
@@ -362,24 +903,158 @@ class PayrollCalculator:
         Returns:
             Dictionary with payroll summary statistics
         """
-        pay_runs = self.db.query(PayRun).filter(
+        count, total_gross, total_taxes, total_deductions, total_net = self.db.query(
+            func.coalesce(func.sum(PayrollPeriodTotal.pay_run_count), 0),
+            func.coalesce(func.sum(PayrollPeriodTotal.total_gross_pay), 0),
+            func.coalesce(func.sum(PayrollPeriodTotal.total_taxes), 0),
+            func.coalesce(func.sum(PayrollPeriodTotal.total_deductions), 0),
+            func.coalesce(func.sum(PayrollPeriodTotal.total_net_pay), 0)
+        ).filter(
             and_(
-                PayRun.start_period >= start_period,
-                PayRun.end_period <= end_period,
-                PayRun.payment_status == PaymentStatus.PENDING
+                PayrollPeriodTotal.start_period >= start_period,
+                PayrollPeriodTotal.end_period <= end_period,
+                PayrollPeriodTotal.payment_status == PaymentStatus.PENDING
             )
-        ).all()
-        
-        total_gross = sum(Decimal(str(pr.gross_pay)) for pr in pay_runs)
-        total_taxes = sum(Decimal(str(pr.total_taxes)) for pr in pay_runs)
-        total_deductions = sum(Decimal(str(pr.total_deductions)) for pr in pay_runs)
-        total_net = sum(Decimal(str(pr.net_pay)) for pr in pay_runs)
+        ).one()
         
         return {
-            'employee_count': len(pay_runs),
-            'total_gross_pay': total_gross,
-            'total_taxes': total_taxes,
-            'total_deductions': total_deductions,
-            'total_net_pay': total_net,
-            'pay_runs': pay_runs
+            'employee_count': count,
+            'total_gross_pay': Decimal(str(total_gross)),
+            'total_taxes': Decimal(str(total_taxes)),
+            'total_deductions': Decimal(str(total_deductions)),
+            'total_net_pay': Decimal(str(total_net))
         }
+    
+    def get_payroll_summary_pay_runs(
+        self,
+        start_period: date,
+        end_period: date,
+        skip: int = 0,
+        limit: int = 100
+    ) -> list:
+        """
+        Get one page of pending pay runs for a period with employee names
+        
+        Uses one joined query selecting only the dashboard columns.
+        
+        Args:
+            start_period: Start date
+            end_period: End date
+            skip: Number of pay runs to skip
+            limit: Maximum number of pay runs to return
+            
+        Returns:
+            List of rows with pay run summary columns plus first_name/last_name
+        """
+        return self.db.query(
+            PayRun.pay_run_id,
+            PayRun.employee_id,
+            Employee.first_name,
+            Employee.last_name,
+            PayRun.start_period,
+            PayRun.end_period,
+            PayRun.gross_pay,
+            PayRun.total_taxes,
+            PayRun.total_deductions,
+            PayRun.net_pay,
+            PayRun.payment_status
+        ).outerjoin(
+            Employee, Employee.employee_id == PayRun.employee_id
+        ).filter(
+            and_(
+                PayRun.start_period >= start_period,
+                PayRun.end_period <= end_period,
+                PayRun.payment_status == PaymentStatus.PENDING
+            )
+        ).order_by(
+            PayRun.start_period, PayRun.pay_run_id
+        ).offset(skip).limit(limit).all()
+
+
+class AsyncPayrollCalculator:
+    """
+    Async interface to PayrollCalculator for AsyncSession callers
+
+    Each method runs the sync implementation through AsyncSession.run_sync, so
+    its queries await the async driver and the calculation logic lives in one
+    place.
+    """
+
+    def __init__(self, db: AsyncSession, executor=None):
+        self.db = db
+        self.executor = executor
+
+    async def _run(self, method: str, *args, **kwargs):
+        return await self.db.run_sync(
+            lambda session: getattr(PayrollCalculator(session, self.executor), method)(*args, **kwargs)
+        )
+
+    async def calculate_pay_run(
+        self,
+        employee_id: int,
+        start_period: date,
+        end_period: date,
+        bonuses: Decimal = Decimal("0.0")
+    ) -> dict:
+        return await self._run("calculate_pay_run", employee_id, start_period, end_period, bonuses)
+
+    async def create_pay_run(
+        self,
+        employee_id: int,
+        start_period: date,
+        end_period: date,
+        pay_date: date | None = None,
+        bonuses: Decimal = Decimal("0.0"),
+        notes: str | None = None
+    ) -> PayRun:
+        return await self._run("create_pay_run", employee_id, start_period, end_period, pay_date, bonuses, notes)
+
+    async def recalculate_pay_run(self, pay_run: PayRun) -> PayRun:
+        return await self._run("recalculate_pay_run", pay_run)
+
+    async def recalculate_pay_runs(
+        self,
+        pay_run_ids: list[int] | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        employee_ids: list[int] | None = None
+    ) -> tuple[list[int], list[int], list[dict]]:
+        return await self._run("recalculate_pay_runs", pay_run_ids, start_date, end_date, employee_ids)
+
+    async def calculate_pay_runs_batch(
+        self,
+        start_period: date,
+        end_period: date,
+        employee_ids: list[int] | None = None
+    ) -> tuple[dict[int, dict], list[dict]]:
+        return await self._run("calculate_pay_runs_batch", start_period, end_period, employee_ids)
+
+    async def create_pay_runs_batch(
+        self,
+        start_period: date,
+        end_period: date,
+        pay_date: date | None = None,
+        employee_ids: list[int] | None = None,
+        notes: str | None = None
+    ) -> tuple[list[PayRun], list[dict], list[int]]:
+        return await self._run("create_pay_runs_batch", start_period, end_period, pay_date, employee_ids, notes)
+
+    async def approve_pay_runs(
+        self,
+        pay_run_ids: list[int] | None = None,
+        start_period: date | None = None,
+        end_period: date | None = None
+    ) -> tuple[list[PayRun], list[dict]]:
+        return await self._run("approve_pay_runs", pay_run_ids, start_period, end_period)
+
+    async def get_payroll_summary(self, start_period: date, end_period: date) -> dict:
+        return await self._run("get_payroll_summary", start_period, end_period)
+
+    async def get_payroll_summary_pay_runs(
+        self,
+        start_period: date,
+        end_period: date,
+        skip: int = 0,
+        limit: int = 100
+    ) -> list:
+        return await self._run("get_payroll_summary_pay_runs", start_period, end_period, skip, limit)
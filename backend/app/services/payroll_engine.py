@@ -0,0 +1,337 @@
+"""
+Vectorized Payroll Engine
+Columnar, fixed-point payroll calculation for a whole workforce at once
+
+All money is held as int64 kobo (minor units), rates as int64 ten-thousandths
+(the precision of the Numeric(5, 4) rate columns) and hours as int64
+hundredths. Every pay component is carried as an exact fraction and rounded
+once, half-up, to the kobo - the same value the Decimal path produces once it
+is stored in a Numeric(10, 2) column.
+"""
+
+from dataclasses import dataclass, fields
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+from app.models import Employee, TaxDeductionProfile, PayType
+from app.services.tax_tables import CompiledPITSchedule, DEFAULT_PIT_SCHEDULE
+
+
+KOBO = 100           # Minor units per Naira
+RATE_SCALE = 10_000  # Rates are stored with 4 decimal places
+HOURS_SCALE = 100    # Hours are stored with 2 decimal places
+
+# Statutory defaults used when an employee has no tax profile
+DEFAULT_PENSION_RATE = 1000  # 10%
+DEFAULT_NHF_RATE = 250       # 2.5%
+
+# Pay components produced by compute(), in the same order as the Decimal path
+RESULT_FIELDS = (
+    'regular_hours', 'overtime_hours', 'regular_pay', 'overtime_pay', 'bonuses',
+    'gross_pay', 'federal_tax', 'state_tax', 'local_tax', 'social_security',
+    'medicare', 'retirement', 'insurance', 'other_deductions', 'total_taxes',
+    'total_deductions', 'net_pay'
+)
+
+# Result fields expressed in hours rather than kobo
+HOURS_FIELDS = ('regular_hours', 'overtime_hours')
+
+
+class PayrollParityError(ValueError):
+    """Raised in parity mode when the engine disagrees with the Decimal path"""
+
+    def __init__(self, mismatches: list[dict]):
+        self.mismatches = mismatches
+        super().__init__(f"Vectorized payroll differs from Decimal path in {len(mismatches)} value(s)")
+
+
+def _to_minor(value, scale: int) -> int:
+    """Convert a Decimal-like value to an integer number of minor units"""
+    return int((Decimal(str(value or 0)) * scale).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _round_half_up(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Divide and round half away from zero, matching Numeric column rounding"""
+    magnitude = (2 * np.abs(numerator) + denominator) // (2 * denominator)
+    return np.sign(numerator) * magnitude
+
+
+@dataclass
+class PayrollBatch:
+    """
+    Column-oriented payroll inputs, one row per employee
+
+    Amounts are kobo, rates are ten-thousandths and hours are hundredths.
+    An overtime_rate of -1 means "1.5x the hourly rate", as in the Decimal path.
+    """
+    employee_id: np.ndarray
+    is_hourly: np.ndarray
+    hourly_rate: np.ndarray
+    overtime_rate: np.ndarray
+    regular_hours: np.ndarray
+    overtime_hours: np.ndarray
+    salary_amount: np.ndarray
+    pay_periods_per_year: np.ndarray
+    bonuses: np.ndarray
+    has_profile: np.ndarray
+    federal_tax_rate: np.ndarray
+    state_tax_rate: np.ndarray
+    local_tax_rate: np.ndarray
+    social_security_rate: np.ndarray
+    medicare_rate: np.ndarray
+    retirement: np.ndarray
+    insurance: np.ndarray
+    other_deductions: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.employee_id)
+
+    @classmethod
+    def from_records(
+        cls,
+        employees: list[Employee],
+        profiles: dict[int, TaxDeductionProfile],
+        hours: dict[int, tuple[Decimal, Decimal]],
+        bonuses: dict[int, Decimal] | None = None
+    ) -> "PayrollBatch":
+        """
+        Build a batch from ORM rows
+
+        Args:
+            employees: Employees to include, one row each
+            profiles: Tax profiles keyed by profile_id
+            hours: Approved (regular, overtime) hours keyed by employee_id
+            bonuses: Optional bonuses keyed by employee_id
+        """
+        bonuses = bonuses or {}
+        columns = {field.name: [] for field in fields(cls)}
+
+        for employee in employees:
+            profile = profiles.get(employee.tax_deduction_profile_id)
+            regular_hours, overtime_hours = hours.get(employee.employee_id, (0, 0))
+
+            columns['employee_id'].append(employee.employee_id)
+            columns['is_hourly'].append(employee.pay_type == PayType.HOURLY)
+            columns['hourly_rate'].append(_to_minor(employee.hourly_rate, KOBO))
+            columns['overtime_rate'].append(
+                _to_minor(employee.overtime_rate, KOBO) if employee.overtime_rate else -1
+            )
+            columns['regular_hours'].append(_to_minor(regular_hours, HOURS_SCALE))
+            columns['overtime_hours'].append(_to_minor(overtime_hours, HOURS_SCALE))
+            columns['salary_amount'].append(_to_minor(employee.salary_amount, KOBO))
+            columns['pay_periods_per_year'].append(employee.pay_periods_per_year or 26)
+            columns['bonuses'].append(_to_minor(bonuses.get(employee.employee_id), KOBO))
+            columns['has_profile'].append(profile is not None)
+            columns['federal_tax_rate'].append(_to_minor(profile and profile.federal_tax_rate, RATE_SCALE))
+            columns['state_tax_rate'].append(_to_minor(profile and profile.state_tax_rate, RATE_SCALE))
+            columns['local_tax_rate'].append(_to_minor(profile and profile.local_tax_rate, RATE_SCALE))
+            columns['social_security_rate'].append(_to_minor(profile and profile.social_security_rate, RATE_SCALE))
+            columns['medicare_rate'].append(_to_minor(profile and profile.medicare_rate, RATE_SCALE))
+            columns['retirement'].append(_to_minor(profile and profile.retirement_withholding, KOBO))
+            columns['insurance'].append(
+                _to_minor(profile and profile.health_insurance, KOBO) +
+                _to_minor(profile and profile.dental_insurance, KOBO) +
+                _to_minor(profile and profile.vision_insurance, KOBO)
+            )
+            columns['other_deductions'].append(_to_minor(profile and profile.other_deductions, KOBO))
+
+        return cls(**{
+            name: np.array(values, dtype=bool if name in ('is_hourly', 'has_profile') else np.int64)
+            for name, values in columns.items()
+        })
+
+
+def _monthly_pit(
+    gross_num: np.ndarray,
+    gross_den: np.ndarray,
+    schedule: CompiledPITSchedule
+) -> np.ndarray:
+    """
+    Progressive PIT on annualized gross pay, as a numerator over gross_den * RATE_SCALE * 12
+
+    The bracket is found with one searchsorted pass; the tax is the cumulative
+    tax at the bracket threshold plus the marginal rate on the remainder.
+    """
+    thresholds = np.array([_to_minor(t, KOBO) for t in schedule.thresholds], dtype=np.int64)
+    rates = np.array([_to_minor(r, RATE_SCALE) for r in schedule.rates], dtype=np.int64)
+    cumulative = np.concatenate(([0], np.cumsum(np.diff(thresholds) * rates[:-1])))
+
+    annual_num = gross_num * 12
+    annual_floor = annual_num // gross_den
+    index = np.searchsorted(thresholds, annual_floor, side='right') - 1
+    index = np.clip(index, 0, len(thresholds) - 1)
+
+    pit_num = (
+        cumulative[index] * gross_den +
+        (annual_num - thresholds[index] * gross_den) * rates[index]
+    )
+    return np.where(gross_num > 0, pit_num, 0)
+
+
+def compute(
+    batch: PayrollBatch,
+    schedule: CompiledPITSchedule = DEFAULT_PIT_SCHEDULE,
+    parity: bool = False
+) -> dict[str, np.ndarray]:
+    """
+    Calculate pay, taxes and deductions for every row of a batch
+
+    Args:
+        batch: Column-oriented payroll inputs
+        schedule: Compiled PIT schedule for the pay period
+        parity: Cross-check every row against the Decimal path and raise
+            PayrollParityError on any difference
+
+    Returns:
+        Dictionary of int64 arrays keyed like the Decimal path's result
+        (hours in hundredths, everything else in kobo)
+    """
+    hourly = batch.is_hourly
+    zero = np.zeros(len(batch), dtype=np.int64)
+
+    # Gross pay as an exact fraction: hourly over 200, salary over pay periods
+    overtime_rate_x2 = np.where(batch.overtime_rate >= 0, 2 * batch.overtime_rate, 3 * batch.hourly_rate)
+    regular_hours = np.where(hourly, batch.regular_hours, zero)
+    overtime_hours = np.where(hourly, batch.overtime_hours, zero)
+
+    gross_den = np.where(hourly, 2 * HOURS_SCALE, batch.pay_periods_per_year).astype(np.int64)
+    regular_num = np.where(
+        hourly,
+        2 * regular_hours * batch.hourly_rate,
+        batch.salary_amount
+    )
+    overtime_num = overtime_hours * overtime_rate_x2
+    gross_num = regular_num + overtime_num + batch.bonuses * gross_den
+
+    # Everything below shares the denominator gross_den * RATE_SCALE * 12
+    tax_den = gross_den * RATE_SCALE * 12
+    scaled_gross = gross_num * 12
+
+    default_pit = _monthly_pit(gross_num, gross_den, schedule)
+    federal = np.where(batch.has_profile, scaled_gross * batch.federal_tax_rate, default_pit)
+    state = scaled_gross * batch.state_tax_rate
+    local = scaled_gross * batch.local_tax_rate
+    pension = scaled_gross * np.where(batch.has_profile, batch.social_security_rate, DEFAULT_PENSION_RATE)
+    nhf = scaled_gross * np.where(batch.has_profile, batch.medicare_rate, DEFAULT_NHF_RATE)
+    total_taxes = federal + state + local + pension + nhf
+
+    retirement = np.where(batch.has_profile, batch.retirement, zero)
+    insurance = np.where(batch.has_profile, batch.insurance, zero)
+    other_deductions = np.where(batch.has_profile, batch.other_deductions, zero)
+    total_deductions = retirement + insurance + other_deductions
+
+    net = scaled_gross * RATE_SCALE - total_taxes - total_deductions * tax_den
+
+    result = {
+        'regular_hours': regular_hours,
+        'overtime_hours': overtime_hours,
+        'regular_pay': _round_half_up(regular_num, gross_den),
+        'overtime_pay': _round_half_up(overtime_num, gross_den),
+        'bonuses': batch.bonuses.copy(),
+        'gross_pay': _round_half_up(gross_num, gross_den),
+        'federal_tax': _round_half_up(federal, tax_den),
+        'state_tax': _round_half_up(state, tax_den),
+        'local_tax': _round_half_up(local, tax_den),
+        'social_security': _round_half_up(pension, tax_den),
+        'medicare': _round_half_up(nhf, tax_den),
+        'retirement': retirement,
+        'insurance': insurance,
+        'other_deductions': other_deductions,
+        'total_taxes': _round_half_up(total_taxes, tax_den),
+        'total_deductions': total_deductions,
+        'net_pay': _round_half_up(net, tax_den),
+    }
+
+    if parity:
+        mismatches = check_parity(batch, result, schedule)
+        if mismatches:
+            raise PayrollParityError(mismatches)
+
+    return result
+
+
+def row_to_decimal(result: dict[str, np.ndarray], index: int) -> dict:
+    """Convert one row of engine output back to the Decimal path's dictionary format"""
+    return {
+        name: Decimal(int(result[name][index])) / (HOURS_SCALE if name in HOURS_FIELDS else KOBO)
+        for name in RESULT_FIELDS
+    }
+
+
+def _decimal_row(batch: PayrollBatch, index: int, schedule: CompiledPITSchedule) -> dict:
+    """Recalculate one batch row with the existing Decimal implementation"""
+    from app.services.payroll import PayrollCalculator
+
+    def amount(column: np.ndarray, scale: int = KOBO) -> Decimal:
+        return Decimal(int(column[index])) / scale
+
+    employee = Employee(
+        employee_id=int(batch.employee_id[index]),
+        pay_type=PayType.HOURLY if batch.is_hourly[index] else PayType.SALARY,
+        hourly_rate=amount(batch.hourly_rate),
+        overtime_rate=amount(batch.overtime_rate) if batch.overtime_rate[index] >= 0 else None,
+        salary_amount=amount(batch.salary_amount),
+        pay_periods_per_year=int(batch.pay_periods_per_year[index])
+    )
+    profile = None
+    if batch.has_profile[index]:
+        profile = TaxDeductionProfile(
+            federal_tax_rate=amount(batch.federal_tax_rate, RATE_SCALE),
+            state_tax_rate=amount(batch.state_tax_rate, RATE_SCALE),
+            local_tax_rate=amount(batch.local_tax_rate, RATE_SCALE),
+            social_security_rate=amount(batch.social_security_rate, RATE_SCALE),
+            medicare_rate=amount(batch.medicare_rate, RATE_SCALE),
+            retirement_withholding=amount(batch.retirement),
+            health_insurance=amount(batch.insurance),
+            dental_insurance=Decimal("0.0"),
+            vision_insurance=Decimal("0.0"),
+            other_deductions=amount(batch.other_deductions)
+        )
+
+    # A schedule's own effective date selects that schedule from the registry
+    calculator = PayrollCalculator(db=None)
+    bonuses = amount(batch.bonuses)
+    if batch.is_hourly[index]:
+        return calculator._hourly_pay_from_hours(
+            employee,
+            amount(batch.regular_hours, HOURS_SCALE),
+            amount(batch.overtime_hours, HOURS_SCALE),
+            bonuses,
+            profile,
+            as_of=schedule.effective_date
+        )
+    return calculator._calculate_salary_pay(employee, None, schedule.effective_date, bonuses, profile)
+
+
+def check_parity(
+    batch: PayrollBatch,
+    result: dict[str, np.ndarray],
+    schedule: CompiledPITSchedule = DEFAULT_PIT_SCHEDULE
+) -> list[dict]:
+    """
+    Compare engine output against the Decimal path, row by row
+
+    Decimal results are rounded half-up to the kobo (hundredths for hours)
+    before comparing, since that is what ends up stored.
+
+    Returns:
+        List of mismatches with employee_id, field and both values
+    """
+    mismatches = []
+    quantum = Decimal("0.01")
+
+    for index in range(len(batch)):
+        expected = _decimal_row(batch, index, schedule)
+        actual = row_to_decimal(result, index)
+        for name in RESULT_FIELDS:
+            expected_value = Decimal(expected[name]).quantize(quantum, rounding=ROUND_HALF_UP)
+            if expected_value != actual[name]:
+                mismatches.append({
+                    'employee_id': int(batch.employee_id[index]),
+                    'field': name,
+                    'engine': actual[name],
+                    'decimal': expected_value
+                })
+
+    return mismatches
@@ -0,0 +1,245 @@
+"""
+Payroll Period Totals
+Keeps the payroll_period_totals rollup in step with pay_runs
+
+Every code path that inserts, updates or deletes a PayRun records the change
+in a PayrollTotalsDelta and applies it before committing, so the rollup and
+the pay runs always change in the same transaction.
+
+Usage:
+    python -m app.services.payroll_totals rebuild   # Recompute the rollup from pay_runs
+    python -m app.services.payroll_totals check     # Report rows that disagree with pay_runs
+"""
+
+import sys
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.database import conflict_insert
+from app.models import PayRun, PayrollPeriodTotal, PaymentStatus
+
+
+# PayRun column -> rollup column
+TOTAL_COLUMNS = {
+    'gross_pay': 'total_gross_pay',
+    'total_taxes': 'total_taxes',
+    'total_deductions': 'total_deductions',
+    'net_pay': 'total_net_pay',
+}
+
+CENT = Decimal("0.01")
+
+
+def _cents(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def snapshot(pay_run: PayRun) -> dict:
+    """
+    Capture the rollup-relevant values of a pay run
+
+    Amounts are rounded to the cent, as they are once stored in Numeric(10, 2).
+    Take the snapshot before mutating a pay run to record its old values.
+    """
+    values = {
+        'start_period': pay_run.start_period,
+        'end_period': pay_run.end_period,
+        'payment_status': PaymentStatus(pay_run.payment_status or PaymentStatus.PENDING),
+    }
+    for column in TOTAL_COLUMNS:
+        values[column] = _cents(getattr(pay_run, column))
+    return values
+
+
+class PayrollTotalsDelta:
+    """
+    Accumulates rollup changes for one transaction
+
+    Changes to the same (period, status) key are merged, so a bulk operation
+    issues one statement per affected key.
+    """
+
+    def __init__(self):
+        self._deltas: dict[tuple[date, date, PaymentStatus], list] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._deltas)
+
+    def add(self, values: dict, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) one pay run snapshot"""
+        key = (values['start_period'], values['end_period'], values['payment_status'])
+        delta = self._deltas.setdefault(key, [0] + [Decimal("0.0")] * len(TOTAL_COLUMNS))
+        delta[0] += sign
+        for index, column in enumerate(TOTAL_COLUMNS, start=1):
+            delta[index] += sign * values[column]
+
+    def created(self, pay_run: PayRun):
+        """Record a new pay run"""
+        self.add(snapshot(pay_run))
+
+    def deleted(self, before: dict):
+        """Record a deleted pay run, given its snapshot"""
+        self.add(before, sign=-1)
+
+    def changed(self, before: dict, pay_run: PayRun):
+        """Record an updated pay run, given its snapshot from before the update"""
+        self.add(before, sign=-1)
+        self.add(snapshot(pay_run))
+
+    def apply(self, db: Session):
+        """Write the accumulated changes to the rollup (does not commit)"""
+        for (start_period, end_period, payment_status), delta in self._deltas.items():
+            if delta[0] == 0 and not any(delta[1:]):
+                continue
+            _upsert(db, start_period, end_period, payment_status, delta)
+        self._deltas.clear()
+
+
+def _upsert(db: Session, start_period: date, end_period: date, payment_status: PaymentStatus, delta: list):
+    """Increment one rollup row, creating it if needed"""
+    values = {
+        'start_period': start_period,
+        'end_period': end_period,
+        'payment_status': payment_status,
+        'pay_run_count': delta[0],
+    }
+    for index, column in enumerate(TOTAL_COLUMNS.values(), start=1):
+        values[column] = delta[index]
+
+    insert = conflict_insert(db.get_bind())
+    if insert is not None:
+        stmt = insert(PayrollPeriodTotal).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['start_period', 'end_period', 'payment_status'],
+            set_={
+                column: getattr(PayrollPeriodTotal, column) + getattr(stmt.excluded, column)
+                for column in ['pay_run_count', *TOTAL_COLUMNS.values()]
+            }
+        )
+        db.execute(stmt)
+        return
+
+    row = db.query(PayrollPeriodTotal).filter(
+        PayrollPeriodTotal.start_period == start_period,
+        PayrollPeriodTotal.end_period == end_period,
+        PayrollPeriodTotal.payment_status == payment_status
+    ).with_for_update().first()
+    if row is None:
+        db.add(PayrollPeriodTotal(**values))
+        db.flush()
+    else:
+        for column in ['pay_run_count', *TOTAL_COLUMNS.values()]:
+            setattr(row, column, getattr(row, column) + values[column])
+
+
+def _pay_run_totals(db: Session) -> dict:
+    """Group pay_runs the same way as the rollup"""
+    rows = db.query(
+        PayRun.start_period,
+        PayRun.end_period,
+        PayRun.payment_status,
+        func.count(PayRun.pay_run_id),
+        *[func.coalesce(func.sum(getattr(PayRun, column)), 0) for column in TOTAL_COLUMNS]
+    ).group_by(PayRun.start_period, PayRun.end_period, PayRun.payment_status).all()
+
+    return {
+        (row[0], row[1], PaymentStatus(row[2])): [row[3]] + [_cents(value) for value in row[4:]]
+        for row in rows
+    }
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute the whole rollup from pay_runs and commit
+
+    Returns:
+        Number of rollup rows written
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Block pay run writers until the rebuilt rollup is committed
+        db.execute(text("LOCK TABLE pay_runs IN SHARE MODE"))
+
+    totals = _pay_run_totals(db)
+    db.query(PayrollPeriodTotal).delete(synchronize_session=False)
+    db.add_all([
+        PayrollPeriodTotal(
+            start_period=start_period,
+            end_period=end_period,
+            payment_status=payment_status,
+            pay_run_count=values[0],
+            **{column: values[index] for index, column in enumerate(TOTAL_COLUMNS.values(), start=1)}
+        )
+        for (start_period, end_period, payment_status), values in totals.items()
+    ])
+    db.commit()
+    return len(totals)
+
+
+def check(db: Session) -> list[dict]:
+    """
+    Compare the rollup with pay_runs
+
+    Returns:
+        List of inconsistencies, each with the key and both sets of values
+    """
+    expected = _pay_run_totals(db)
+    actual = {
+        (row.start_period, row.end_period, PaymentStatus(row.payment_status)): [row.pay_run_count] + [
+            _cents(getattr(row, column)) for column in TOTAL_COLUMNS.values()
+        ]
+        for row in db.query(PayrollPeriodTotal).all()
+    }
+
+    empty = [0] + [Decimal("0.0")] * len(TOTAL_COLUMNS)
+    problems = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: (k[0], k[1], k[2].value)):
+        want = expected.get(key, empty)
+        have = actual.get(key, empty)
+        if want != have:
+            problems.append({
+                'start_period': key[0],
+                'end_period': key[1],
+                'payment_status': key[2].value,
+                'expected': dict(zip(['pay_run_count', *TOTAL_COLUMNS.values()], want)),
+                'actual': dict(zip(['pay_run_count', *TOTAL_COLUMNS.values()], have)),
+            })
+    return problems
+
+
+def ensure_populated(db: Session):
+    """Build the rollup on first start if pay runs exist but no rollup rows do"""
+    if db.query(PayrollPeriodTotal.total_id).first() is None and db.query(PayRun.pay_run_id).first() is not None:
+        rebuild(db)
+
+
+def main(argv: list[str]) -> int:
+    from app.database import SessionLocal
+
+    command = argv[1] if len(argv) > 1 else ""
+    if command not in ("rebuild", "check"):
+        print("Usage: python -m app.services.payroll_totals [rebuild|check]")
+        return 2
+
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            print(f"Rebuilt payroll_period_totals: {rebuild(db)} row(s)")
+            return 0
+
+        problems = check(db)
+        for problem in problems:
+            print(
+                f"{problem['start_period']}..{problem['end_period']} {problem['payment_status']}: "
+                f"expected {problem['expected']}, found {problem['actual']}"
+            )
+        print("payroll_period_totals is consistent" if not problems else f"{len(problems)} inconsistent row(s)")
+        return 1 if problems else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
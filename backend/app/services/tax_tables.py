@@ -0,0 +1,159 @@
+"""
+PIT Bracket Tables
+Compiles versioned PIT schedules into lookup tables and caches them per version
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app.models import PITScheduleVersion, PITBracket
+
+
+# Statutory brackets used until a schedule version is published: (lower limit, rate)
+DEFAULT_PIT_BRACKETS = [
+    (Decimal("0"), Decimal("0.07")),          # First ₦300K at 7%
+    (Decimal("300000"), Decimal("0.11")),     # Next ₦300K at 11%
+    (Decimal("600000"), Decimal("0.15")),     # Next ₦500K at 15%
+    (Decimal("1100000"), Decimal("0.19")),    # Next ₦500K at 19%
+    (Decimal("1600000"), Decimal("0.21")),    # Next ₦1.6M at 21%
+    (Decimal("3200000"), Decimal("0.24")),    # Remaining at 24%
+]
+
+# How often to look for versions published by other processes
+PIT_SCHEDULE_REFRESH_SECONDS = int(os.getenv("PIT_SCHEDULE_REFRESH_SECONDS", 300))
+
+
+@dataclass(frozen=True)
+class CompiledPITSchedule:
+    """
+    A PIT schedule compiled for O(log n) lookup
+
+    cumulative[i] is the tax due on income exactly at thresholds[i], so the
+    tax on any income is one bisect plus one multiply.
+    """
+    version_id: int | None
+    effective_date: date
+    thresholds: tuple[Decimal, ...]
+    rates: tuple[Decimal, ...]
+    cumulative: tuple[Decimal, ...]
+
+    @classmethod
+    def compile(
+        cls,
+        version_id: int | None,
+        effective_date: date,
+        brackets: list[tuple[Decimal, Decimal]]
+    ) -> "CompiledPITSchedule":
+        """
+        Compile (lower limit, rate) pairs into cumulative-tax-at-threshold tables
+
+        Raises:
+            ValueError: If the brackets do not start at 0 or repeat a lower limit
+        """
+        brackets = sorted((Decimal(str(lower)), Decimal(str(rate))) for lower, rate in brackets)
+        if not brackets or brackets[0][0] != 0:
+            raise ValueError("PIT brackets must start at an income of 0")
+
+        thresholds = tuple(lower for lower, _ in brackets)
+        if len(set(thresholds)) != len(thresholds):
+            raise ValueError("PIT bracket lower limits must be unique")
+
+        rates = tuple(rate for _, rate in brackets)
+        cumulative = [Decimal("0.0")]
+        for index in range(1, len(thresholds)):
+            width = thresholds[index] - thresholds[index - 1]
+            cumulative.append(cumulative[-1] + width * rates[index - 1])
+
+        return cls(version_id, effective_date, thresholds, rates, tuple(cumulative))
+
+    def tax(self, annual_income: Decimal) -> Decimal:
+        """Annual PIT due on an annual income"""
+        if annual_income <= 0:
+            return Decimal("0.0")
+
+        index = bisect_right(self.thresholds, annual_income) - 1
+        return self.cumulative[index] + (annual_income - self.thresholds[index]) * self.rates[index]
+
+
+DEFAULT_PIT_SCHEDULE = CompiledPITSchedule.compile(None, date.min, DEFAULT_PIT_BRACKETS)
+
+
+class PITScheduleRegistry:
+    """
+    In-process cache of compiled PIT schedules
+
+    Each version is compiled once and kept by version_id. The timeline of
+    versions by effective date is swapped atomically whenever a version is
+    published here or picked up from the database on refresh.
+    """
+
+    def __init__(self, refresh_seconds: int = PIT_SCHEDULE_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._compiled: dict[int, CompiledPITSchedule] = {}
+        self._timeline: tuple[tuple[date, ...], tuple[CompiledPITSchedule, ...]] = (
+            (DEFAULT_PIT_SCHEDULE.effective_date,), (DEFAULT_PIT_SCHEDULE,)
+        )
+        self._refreshed_at: float | None = None
+
+    def _swap_timeline(self, schedules: list[CompiledPITSchedule]):
+        timeline = [DEFAULT_PIT_SCHEDULE] + sorted(schedules, key=lambda s: s.effective_date)
+        self._timeline = (tuple(s.effective_date for s in timeline), tuple(timeline))
+
+    def refresh(self, db: Session):
+        """Load any versions not compiled yet and rebuild the timeline"""
+        with self._lock:
+            versions = db.query(
+                PITScheduleVersion.version_id,
+                PITScheduleVersion.effective_date
+            ).all()
+
+            missing = [version_id for version_id, _ in versions if version_id not in self._compiled]
+            if missing:
+                brackets: dict[int, list[tuple[Decimal, Decimal]]] = {}
+                for bracket in db.query(PITBracket).filter(PITBracket.version_id.in_(missing)).all():
+                    brackets.setdefault(bracket.version_id, []).append((bracket.lower_limit, bracket.rate))
+
+                for version_id, effective_date in versions:
+                    if version_id in missing:
+                        self._compiled[version_id] = CompiledPITSchedule.compile(
+                            version_id, effective_date, brackets.get(version_id, [])
+                        )
+
+            self._swap_timeline([self._compiled[version_id] for version_id, _ in versions])
+            self._refreshed_at = time.monotonic()
+
+    def publish(self, schedule: CompiledPITSchedule):
+        """Make a newly published version visible immediately in this process"""
+        with self._lock:
+            self._compiled[schedule.version_id] = schedule
+            self._swap_timeline(list(self._compiled.values()))
+
+    def for_date(self, as_of: date | None = None, db: Session | None = None) -> CompiledPITSchedule:
+        """
+        Get the schedule in force on a date
+
+        Args:
+            as_of: Date to look up (defaults to today)
+            db: Session used to refresh the cache when it is stale
+        """
+        if db is not None and (
+            self._refreshed_at is None or
+            time.monotonic() - self._refreshed_at > self.refresh_seconds
+        ):
+            self.refresh(db)
+
+        effective_dates, timeline = self._timeline
+        index = bisect_right(effective_dates, as_of or date.today()) - 1
+        return timeline[max(index, 0)]
+
+
+# Shared registry used by PayrollCalculator
+pit_schedules = PITScheduleRegistry()
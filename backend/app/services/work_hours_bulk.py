@@ -0,0 +1,191 @@
+"""
+Work Hours Bulk Writes
+Batch upsert of work hours keyed on (employee_id, date), and bulk approval
+
+Timesheet syncs send every day they know about, new or corrected, in one
+request. Rows are checked in Python and with one employee lookup, then
+written with a single INSERT ... ON CONFLICT (employee_id, date) DO UPDATE
+... RETURNING. Inserted and updated rows are told apart by updated_at,
+which only the update branch sets.
+
+Approved records are locked: the update branch only applies while the
+stored record is unapproved, so a sync cannot overwrite hours a supervisor
+has signed off (un-approve with PUT /work-hours/{id} first).
+
+Bulk approval selects rows by ID and/or by employee and date range and
+flips them in one UPDATE ... WHERE is_approved = false RETURNING record_id,
+without loading them.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.database import conflict_insert
+from app.models import Employee, WorkHours, utcnow
+from app.schemas import WorkHoursCreate
+
+
+# Columns a batch row writes; (employee_id, date) is the conflict key
+UPSERT_COLUMNS = ("employee_id", "date", "hours_worked", "overtime_hours", "notes", "approved_by", "is_approved")
+UPDATE_COLUMNS = UPSERT_COLUMNS[2:]
+
+MAX_DAILY_HOURS = Decimal("24")
+
+
+def _rejection(index: int, row: WorkHoursCreate, reason: str) -> dict:
+    return {
+        'index': index,
+        'employee_id': row.employee_id,
+        'date': row.date,
+        'record_id': None,
+        'status': "rejected",
+        'reason': reason,
+    }
+
+
+def _write_portable(db: Session, rows: list[dict]) -> dict[tuple[int, date], tuple[int, str]]:
+    """Upsert without ON CONFLICT support: one lookup, then ORM inserts and updates"""
+    keys = {(row['employee_id'], row['date']) for row in rows}
+    existing = {
+        (record.employee_id, record.date): record
+        for record in db.query(WorkHours).filter(
+            WorkHours.employee_id.in_({employee_id for employee_id, _ in keys}),
+            WorkHours.date.in_({work_date for _, work_date in keys})
+        )
+    }
+
+    written, created = {}, []
+    for row in rows:
+        key = (row['employee_id'], row['date'])
+        record = existing.get(key)
+        if record is None:
+            record = WorkHours(**row)
+            db.add(record)
+            created.append((key, record))
+        elif not record.is_approved:
+            for column in UPDATE_COLUMNS:
+                setattr(record, column, row[column])
+            record.updated_at = utcnow()
+            written[key] = (record.record_id, "updated")
+    db.flush()
+    for key, record in created:
+        written[key] = (record.record_id, "inserted")
+    return written
+
+
+def upsert_work_hours(db: Session, records: list[WorkHoursCreate]) -> dict:
+    """
+    Insert or update work hours records in one statement and commit
+
+    A row is rejected when its employee does not exist, its hours and
+    overtime add up to more than a day, it repeats an (employee_id, date)
+    earlier in the batch, or the stored record is already approved.
+
+    Args:
+        db: Database session
+        records: Validated rows, in request order
+
+    Returns:
+        Counts by outcome and one entry per row, in request order
+    """
+    known_employees = {
+        employee_id for (employee_id,) in db.query(Employee.employee_id).filter(
+            Employee.employee_id.in_({row.employee_id for row in records})
+        )
+    }
+
+    results: list[dict | None] = [None] * len(records)
+    pending: dict[tuple[int, date], int] = {}
+    for index, row in enumerate(records):
+        key = (row.employee_id, row.date)
+        if row.employee_id not in known_employees:
+            results[index] = _rejection(index, row, f"Employee with ID {row.employee_id} not found")
+        elif row.hours_worked + row.overtime_hours > MAX_DAILY_HOURS:
+            results[index] = _rejection(index, row, "Hours worked plus overtime exceed 24 hours")
+        elif key in pending:
+            results[index] = _rejection(index, row, f"Duplicate of row {pending[key]} in this batch")
+        else:
+            pending[key] = index
+
+    rows = [records[index].model_dump(include=set(UPSERT_COLUMNS)) for index in pending.values()]
+    written: dict[tuple[int, date], tuple[int, str]] = {}
+    if rows:
+        dialect_insert = conflict_insert(db.get_bind(), "uq_work_hours_employee_date")
+        if dialect_insert is None:
+            written = _write_portable(db, rows)
+        else:
+            table = WorkHours.__table__
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["employee_id", "date"],
+                set_={
+                    **{column: stmt.excluded[column] for column in UPDATE_COLUMNS},
+                    'updated_at': utcnow(),
+                },
+                where=table.c.is_approved.is_(False)
+            ).returning(table.c.employee_id, table.c.date, table.c.record_id, table.c.updated_at)
+            for employee_id, work_date, record_id, updated_at in db.execute(stmt, rows):
+                written[(employee_id, work_date)] = (record_id, "inserted" if updated_at is None else "updated")
+        db.commit()
+
+    for key, index in pending.items():
+        if key not in written:
+            results[index] = _rejection(index, records[index], "Work hours for this date are already approved")
+            continue
+        record_id, outcome = written[key]
+        results[index] = {
+            'index': index,
+            'employee_id': key[0],
+            'date': key[1],
+            'record_id': record_id,
+            'status': outcome,
+            'reason': None,
+        }
+
+    counts = {outcome: 0 for outcome in ("inserted", "updated", "rejected")}
+    for result in results:
+        counts[result['status']] += 1
+    return {**counts, 'rows': results}
+
+
+def approve_pending_work_hours(
+    db: Session,
+    approved_by: str,
+    record_ids: list[int] | None = None,
+    employee_ids: list[int] | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None
+) -> list[int]:
+    """
+    Approve every unapproved record matching all given filters and commit
+
+    Args:
+        db: Database session
+        approved_by: Name of the person approving
+        record_ids: Only these records
+        employee_ids: Only these employees' records
+        start_date / end_date: Only records in this date range (inclusive)
+
+    Returns:
+        IDs of the records approved by this call, ascending
+    """
+    stmt = update(WorkHours).where(WorkHours.is_approved.is_(False))
+    if record_ids is not None:
+        stmt = stmt.where(WorkHours.record_id.in_(record_ids))
+    if employee_ids is not None:
+        stmt = stmt.where(WorkHours.employee_id.in_(employee_ids))
+    if start_date is not None:
+        stmt = stmt.where(WorkHours.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(WorkHours.date <= end_date)
+
+    approved_ids = db.execute(
+        stmt.values(is_approved=True, approved_by=approved_by)
+        .returning(WorkHours.record_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return sorted(approved_ids)
@@ -0,0 +1,359 @@
+"""
+Work Hours Bulk Import
+Streams CSV or NDJSON timesheets into a staging table, validates them with
+set-based SQL and merges the valid rows into work_hours in one statement
+
+On PostgreSQL rows are loaded with psycopg COPY; other databases fall back to
+batched INSERTs into the same staging table.
+
+Usage:
+    python -m app.services.work_hours_import timesheets.csv
+    python -m app.services.work_hours_import timesheets.ndjson --format ndjson
+"""
+
+import argparse
+import csv
+import json
+import sys
+from collections import Counter
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
+from sqlalchemy import (
+    Table, MetaData, Column, Integer, String, Date, Numeric, Text, Boolean,
+    select, update, insert, exists, func, and_
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from app.database import conflict_insert
+from app.models import Employee, WorkHours
+from app.services.work_hours_bulk import MAX_DAILY_HOURS
+
+
+# Columns accepted in the import file, in COPY order
+IMPORT_COLUMNS = ("employee_id", "date", "hours_worked", "overtime_hours", "notes", "approved_by", "is_approved")
+
+# Only the first rejected rows are listed individually; all are counted by reason
+MAX_REPORTED_ERRORS = 100
+
+# Rows per INSERT when COPY is not available
+INSERT_BATCH_SIZE = 1000
+
+ALREADY_RECORDED = "work hours already recorded for this date"
+
+TRUE_VALUES = {"true", "t", "yes", "y", "1"}
+FALSE_VALUES = {"false", "f", "no", "n", "0", ""}
+
+staging_table = Table(
+    "work_hours_import_staging",
+    MetaData(),
+    Column("line_no", Integer, primary_key=True),
+    Column("employee_id", Integer, nullable=False),
+    Column("date", Date, nullable=False),
+    Column("hours_worked", Numeric(5, 2), nullable=False),
+    Column("overtime_hours", Numeric(5, 2), nullable=False),
+    Column("notes", Text),
+    Column("approved_by", String(100)),
+    Column("is_approved", Boolean, nullable=False),
+    Column("reject_reason", String(100)),
+    prefixes=["TEMPORARY"],
+)
+
+
+class ImportReport:
+    """Compact summary of an import: counts by reason plus the first few rejected rows"""
+
+    def __init__(self):
+        self.total_rows = 0
+        self.imported = 0
+        self.reasons: Counter = Counter()
+        self.errors: list[dict] = []
+
+    def reject(self, line_no: int, reason: str, employee_id: int | None = None, work_date: date | None = None):
+        self.reasons[reason] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({
+                'line': line_no,
+                'employee_id': employee_id,
+                'work_date': work_date,
+                'reason': reason
+            })
+
+    def as_dict(self) -> dict:
+        return {
+            'total_rows': self.total_rows,
+            'imported': self.imported,
+            'rejected': sum(self.reasons.values()),
+            'errors_by_reason': dict(self.reasons),
+            'errors': sorted(self.errors, key=lambda error: error['line'])[:MAX_REPORTED_ERRORS],
+        }
+
+
+def _parse_hours(value, field: str) -> Decimal:
+    try:
+        hours = Decimal(str(value).strip() or "0")
+    except InvalidOperation:
+        raise ValueError(f"invalid {field}")
+    if not hours.is_finite() or hours < 0 or hours > 24:
+        raise ValueError(f"{field} must be between 0 and 24")
+    return hours.quantize(Decimal("0.01"))
+
+
+def _parse_row(record: dict) -> tuple:
+    """Validate one record and return it in IMPORT_COLUMNS order"""
+    try:
+        employee_id = int(str(record.get("employee_id", "")).strip())
+    except ValueError:
+        raise ValueError("invalid employee_id")
+
+    try:
+        work_date = date.fromisoformat(str(record.get("date", "")).strip())
+    except ValueError:
+        raise ValueError("invalid date")
+
+    hours_worked = _parse_hours(record.get("hours_worked", ""), "hours_worked")
+    overtime_hours = _parse_hours(record.get("overtime_hours") or 0, "overtime_hours")
+
+    approved = record.get("is_approved")
+    if isinstance(approved, bool):
+        is_approved = approved
+    elif str(approved or "").strip().lower() in TRUE_VALUES:
+        is_approved = True
+    elif str(approved or "").strip().lower() in FALSE_VALUES:
+        is_approved = False
+    else:
+        raise ValueError("invalid is_approved")
+
+    approved_by = record.get("approved_by") or None
+    if approved_by is not None and len(approved_by) > 100:
+        raise ValueError("approved_by is longer than 100 characters")
+
+    return (employee_id, work_date, hours_worked, overtime_hours, record.get("notes") or None, approved_by, is_approved)
+
+
+def _records(stream: TextIO, fmt: str) -> Iterator[tuple[int, dict | None]]:
+    """Yield (line number, record) pairs; record is None when the line cannot be decoded"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield line_no, record if isinstance(record, dict) else None
+
+
+def _valid_rows(stream: TextIO, fmt: str, report: ImportReport) -> Iterator[tuple]:
+    """Parse the file, recording unparsable rows in the report and yielding staging rows"""
+    for line_no, record in _records(stream, fmt):
+        report.total_rows += 1
+        if record is None:
+            report.reject(line_no, "invalid JSON object")
+            continue
+        try:
+            yield (line_no, *_parse_row(record))
+        except ValueError as e:
+            report.reject(line_no, str(e))
+
+
+async def _copy_async(driver_connection, copy_sql: str, rows: Iterable[tuple]):
+    async with driver_connection.cursor() as cursor:
+        async with cursor.copy(copy_sql) as copy:
+            for row in rows:
+                await copy.write_row(row)
+
+
+def _load_staging(db: Session, rows: Iterable[tuple]):
+    """Load parsed rows into the staging table, with COPY when the driver supports it"""
+    connection = db.connection()
+    columns = ("line_no", *IMPORT_COLUMNS)
+
+    if connection.dialect.name == "postgresql" and connection.dialect.driver in ("psycopg", "psycopg_async"):
+        driver_connection = connection.connection.driver_connection
+        copy_sql = f"COPY {staging_table.name} ({', '.join(columns)}) FROM STDIN"
+        if connection.dialect.is_async:
+            # Running under AsyncSession.run_sync: drive the async COPY from this greenlet
+            await_only(_copy_async(driver_connection, copy_sql, rows))
+            return
+        with driver_connection.cursor() as cursor:
+            with cursor.copy(copy_sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        return
+
+    rows = iter(rows)
+    while batch := list(islice(rows, INSERT_BATCH_SIZE)):
+        connection.execute(staging_table.insert(), [dict(zip(columns, row)) for row in batch])
+
+
+def import_work_hours(db: Session, stream: TextIO, fmt: str = "csv") -> dict:
+    """
+    Import work hours from a CSV or NDJSON stream in one transaction
+
+    Rows are rejected when they cannot be parsed, reference an unknown
+    employee, add up to more than 24 hours with overtime, repeat an
+    (employee_id, date) already in the file, or clash with an existing work
+    hours record (including one a concurrent writer inserts during the
+    import). All other rows are inserted.
+
+    Args:
+        db: Database session (committed on success)
+        stream: Text stream with a CSV header row or one JSON object per line
+        fmt: "csv" or "ndjson"
+
+    Returns:
+        Compact report with counts, rejections by reason and the first rejected rows
+    """
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"Unsupported import format '{fmt}'")
+
+    report = ImportReport()
+    connection = db.connection()
+    staging = staging_table.alias("s")
+
+    # A failed import on a non-transactional-DDL database can leave the table behind
+    staging_table.drop(connection, checkfirst=True)
+    staging_table.create(connection)
+    try:
+        _load_staging(db, _valid_rows(stream, fmt, report))
+
+        # Set-based validation, most specific reason first
+        checks = [
+            ("unknown employee", ~exists().where(Employee.employee_id == staging_table.c.employee_id)),
+            ("total hours exceed 24",
+             staging_table.c.hours_worked + staging_table.c.overtime_hours > MAX_DAILY_HOURS),
+            ("duplicate row in file", staging_table.c.line_no.not_in(
+                select(func.min(staging.c.line_no)).group_by(staging.c.employee_id, staging.c.date)
+            )),
+            (ALREADY_RECORDED, exists().where(and_(
+                WorkHours.employee_id == staging_table.c.employee_id,
+                WorkHours.date == staging_table.c.date
+            ))),
+        ]
+        for reason, condition in checks:
+            connection.execute(
+                update(staging_table)
+                .where(staging_table.c.reject_reason.is_(None), condition)
+                .values(reject_reason=reason)
+            )
+
+        report.imported = _merge_accepted(connection)
+
+        for reason, count in connection.execute(
+            select(staging_table.c.reject_reason, func.count())
+            .where(staging_table.c.reject_reason.is_not(None))
+            .group_by(staging_table.c.reject_reason)
+        ):
+            report.reasons[reason] += count
+
+        for line_no, employee_id, work_date, reason in connection.execute(
+            select(
+                staging_table.c.line_no,
+                staging_table.c.employee_id,
+                staging_table.c.date,
+                staging_table.c.reject_reason
+            )
+            .where(staging_table.c.reject_reason.is_not(None))
+            .order_by(staging_table.c.line_no)
+            .limit(MAX_REPORTED_ERRORS)
+        ):
+            report.errors.append({'line': line_no, 'employee_id': employee_id, 'work_date': work_date, 'reason': reason})
+    except Exception:
+        db.rollback()
+        raise
+    else:
+        staging_table.drop(connection)
+        db.commit()
+
+    return report.as_dict()
+
+
+def _merge_accepted(connection) -> int:
+    """
+    Insert the staged rows that passed validation into work_hours in one statement
+
+    Rows a concurrent writer inserted since the checks ran are skipped and
+    marked as already recorded, instead of failing the import on the unique
+    (employee_id, date) index.
+
+    Returns:
+        Number of rows inserted
+    """
+    accepted = select(*[staging_table.c[column] for column in IMPORT_COLUMNS]).where(
+        staging_table.c.reject_reason.is_(None)
+    )
+    same_day = and_(
+        WorkHours.employee_id == staging_table.c.employee_id,
+        WorkHours.date == staging_table.c.date
+    )
+
+    dialect_insert = conflict_insert(connection, "uq_work_hours_employee_date")
+    if connection.dialect.name == "postgresql" and dialect_insert is not None:
+        # ON CONFLICT DO NOTHING waits out concurrent inserts; the rows it
+        # skipped are the accepted ones missing from RETURNING
+        inserted = dialect_insert(WorkHours).from_select(list(IMPORT_COLUMNS), accepted).on_conflict_do_nothing(
+            index_elements=["employee_id", "date"]
+        ).returning(WorkHours.employee_id, WorkHours.date).cte("inserted")
+        accepted_count = connection.execute(select(func.count()).select_from(accepted.subquery())).scalar_one()
+        skipped = connection.execute(
+            update(staging_table)
+            .where(
+                staging_table.c.reject_reason.is_(None),
+                ~exists().where(and_(
+                    inserted.c.employee_id == staging_table.c.employee_id,
+                    inserted.c.date == staging_table.c.date
+                ))
+            )
+            .values(reject_reason=ALREADY_RECORDED)
+            .add_cte(inserted)
+        ).rowcount
+        return accepted_count - skipped
+
+    # SQLite holds the write lock from the staging load on, so nothing can
+    # slip in; the guard keeps other databases from failing on the index
+    return connection.execute(
+        insert(WorkHours).from_select(list(IMPORT_COLUMNS), accepted.where(~exists().where(same_day)))
+    ).rowcount
+
+
+def detect_format(filename: str | None, content_type: str | None = None) -> str:
+    """Guess the import format from a file name or content type (defaults to CSV)"""
+    if (filename or "").lower().endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def main(argv: list[str]) -> int:
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Bulk import work hours from CSV or NDJSON")
+    parser.add_argument("path", help="File to import ('-' for stdin)")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="File format (guessed from the extension)")
+    args = parser.parse_args(argv[1:])
+
+    fmt = args.format or detect_format(args.path)
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+
+    db = SessionLocal()
+    try:
+        report = import_work_hours(db, stream, fmt)
+    finally:
+        db.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(json.dumps(report, indent=2, default=str))
+    return 0 if report['rejected'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,240 @@
+"""
+Synthetic Data Generator
+Fills the configured database with a realistic payroll dataset for benchmarks
+
+    employees    Mixed hourly (about 60%) and salaried staff, a few inactive,
+                 most on one of three tax profiles
+    work_hours   One row per weekday per hourly employee, mostly approved
+    pay_runs     Monthly pay runs for every month but the last, computed by
+                 PayrollCalculator; the latest billed month is pending, older
+                 months are paid
+
+The last month is left unbilled (the "open period") so the API benchmark can
+time batch pay run creation against real hours. Rows are written with
+multi-row INSERTs (COPY for work hours on PostgreSQL) in batches, and the
+payroll period totals rollup is rebuilt at the end.
+
+Usage (from backend/, against an empty database):
+    DATABASE_URL=sqlite:///./benchmark.db python -m benchmarks.generate --employees 2000 --months 6
+    python -m benchmarks.generate --employees 100000 --months 36
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import islice
+
+from sqlalchemy import func, insert
+
+from app.database import engine, Base, SessionLocal
+from app.models import Employee, WorkHours, PayRun, TaxDeductionProfile, PayType, EmployeeStatus, PaymentStatus
+from app.services import payroll_totals
+from app.services.payroll import PayrollCalculator
+
+
+INSERT_BATCH_SIZE = 5000
+# Employees whose pay runs are calculated and inserted together
+PAY_RUN_CHUNK_SIZE = 5000
+
+FIRST_NAMES = ("Ada", "Bola", "Chidi", "Dayo", "Emeka", "Funke", "Gbenga", "Halima", "Ife", "Jide", "Kemi", "Lola")
+LAST_NAMES = ("Adeyemi", "Bello", "Okafor", "Eze", "Ogunleye", "Musa", "Nwosu", "Balogun", "Ibrahim", "Okonkwo")
+ROLES = ("Engineer", "Analyst", "Technician", "Nurse", "Driver", "Clerk", "Manager", "Designer", "Cashier")
+
+PROFILES = (
+    dict(profile_name="Benchmark Standard", federal_tax_rate=Decimal("0.1100"), social_security_rate=Decimal("0.0800"),
+         medicare_rate=Decimal("0.0250"), health_insurance=Decimal("5000.00")),
+    dict(profile_name="Benchmark Higher Band", federal_tax_rate=Decimal("0.1900"), social_security_rate=Decimal("0.0800"),
+         medicare_rate=Decimal("0.0250"), retirement_withholding=Decimal("12000.00")),
+    dict(profile_name="Benchmark Full Cover", federal_tax_rate=Decimal("0.1500"), social_security_rate=Decimal("0.0800"),
+         medicare_rate=Decimal("0.0250"), health_insurance=Decimal("7500.00"),
+         dental_insurance=Decimal("1500.00"), vision_insurance=Decimal("1000.00")),
+)
+
+
+def month_periods(first_month: date, months: int) -> list[tuple[date, date]]:
+    """(first day, last day) of consecutive months"""
+    periods = []
+    start = first_month.replace(day=1)
+    for _ in range(months):
+        following = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        periods.append((start, following - timedelta(days=1)))
+        start = following
+    return periods
+
+
+def _batches(rows, size: int = INSERT_BATCH_SIZE):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _copy_supported(connection) -> bool:
+    return connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg"
+
+
+def _insert_rows(connection, table, rows) -> int:
+    """Insert dict rows in batches of multi-row INSERTs"""
+    count = 0
+    for batch in _batches(rows):
+        connection.execute(insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def _copy_rows(connection, table, columns: tuple[str, ...], rows) -> int:
+    """Stream tuples into a table with COPY (psycopg only)"""
+    count = 0
+    with connection.connection.driver_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+    return count
+
+
+def employee_rows(rng: random.Random, count: int, profile_ids: list[int], hire_before: date):
+    for i in range(count):
+        hourly = rng.random() < 0.6
+        yield {
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'email': f"employee{i + 1}@benchmark.example",
+            'role': rng.choice(ROLES),
+            'start_date': hire_before - timedelta(days=rng.randint(0, 3650)),
+            'status': EmployeeStatus.ACTIVE if rng.random() < 0.95 else EmployeeStatus.INACTIVE,
+            'pay_type': PayType.HOURLY if hourly else PayType.SALARY,
+            'hourly_rate': Decimal(rng.randint(80000, 600000)) / 100 if hourly else None,
+            'salary_amount': None if hourly else Decimal(rng.randint(1200, 30000) * 1000),
+            'pay_periods_per_year': 12,
+            'tax_deduction_profile_id': rng.choice(profile_ids) if rng.random() < 0.7 else None,
+        }
+
+
+def work_hour_rows(rng: random.Random, employee_ids: list[int], first_day: date, last_day: date):
+    """(employee_id, date, hours_worked, overtime_hours, approved_by, is_approved) per weekday"""
+    weekdays = [
+        first_day + timedelta(days=offset)
+        for offset in range((last_day - first_day).days + 1)
+        if (first_day + timedelta(days=offset)).weekday() < 5
+    ]
+    # The most recent fortnight is partly still awaiting approval
+    pending_from = last_day - timedelta(days=14)
+    for employee_id in employee_ids:
+        for day in weekdays:
+            approved = day < pending_from or rng.random() < 0.5
+            yield (
+                employee_id,
+                day,
+                Decimal(rng.choice((600, 750, 800, 800, 800, 825, 850))) / 100,
+                Decimal(rng.choice((0, 0, 0, 0, 100, 150, 200))) / 100,
+                "benchmark" if approved else None,
+                approved,
+            )
+
+
+WORK_HOUR_COLUMNS = ("employee_id", "date", "hours_worked", "overtime_hours", "approved_by", "is_approved")
+
+
+def insert_pay_runs(db, periods: list[tuple[date, date]], employee_ids: list[int]) -> int:
+    """Calculate and insert pay runs for each period; only the latest stays pending"""
+    calculator = PayrollCalculator(db)
+    count = 0
+    for index, (start_period, end_period) in enumerate(periods):
+        latest = index == len(periods) - 1
+        for chunk in _batches(employee_ids, PAY_RUN_CHUNK_SIZE):
+            results, _ = calculator.calculate_pay_runs_batch(start_period, end_period, chunk)
+            rows = []
+            for employee_id, calc in results.items():
+                pay_run = calculator._build_pay_run(employee_id, start_period, end_period, end_period, calc, None)
+                row = {column.key: getattr(pay_run, column.key) for column in PayRun.__table__.columns
+                       if getattr(pay_run, column.key) is not None}
+                if not latest:
+                    row['payment_status'] = PaymentStatus.PAID
+                    row['processed_at'] = datetime.combine(end_period, datetime.min.time(), timezone.utc)
+                rows.append(row)
+            count += _insert_rows(db.connection(), PayRun.__table__, rows)
+        db.commit()
+        print(f"  pay runs {start_period:%Y-%m}: {count} total")
+    return count
+
+
+def generate(employees: int, months: int, first_month: date, seed: int = 42):
+    rng = random.Random(seed)
+    periods = month_periods(first_month, months)
+    billed, (open_start, open_end) = periods[:-1], periods[-1]
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(Employee.employee_id).first() is not None:
+            raise SystemExit("The database already has employees; generate into an empty database")
+
+        started = time.perf_counter()
+
+        profiles = [TaxDeductionProfile(**values) for values in PROFILES]
+        db.add_all(profiles)
+        db.flush()
+        profile_ids = [profile.profile_id for profile in profiles]
+
+        _insert_rows(db.connection(), Employee.__table__, employee_rows(rng, employees, profile_ids, periods[0][0]))
+        db.commit()
+        hourly_ids = [
+            employee_id for (employee_id,) in
+            db.query(Employee.employee_id).filter(Employee.pay_type == PayType.HOURLY).order_by(Employee.employee_id)
+        ]
+        print(f"  employees: {employees} ({len(hourly_ids)} hourly)")
+
+        rows = work_hour_rows(rng, hourly_ids, periods[0][0], open_end)
+        connection = db.connection()
+        if _copy_supported(connection):
+            hours = _copy_rows(connection, WorkHours.__table__, WORK_HOUR_COLUMNS, rows)
+        else:
+            hours = _insert_rows(connection, WorkHours.__table__, (dict(zip(WORK_HOUR_COLUMNS, row)) for row in rows))
+        db.commit()
+        print(f"  work hours: {hours}")
+
+        active_ids = [
+            employee_id for (employee_id,) in
+            db.query(Employee.employee_id).filter(Employee.status == EmployeeStatus.ACTIVE).order_by(Employee.employee_id)
+        ]
+        pay_runs = insert_pay_runs(db, billed, active_ids)
+
+        rollup_rows = payroll_totals.rebuild(db)
+        print(
+            f"Generated {employees} employees, {hours} work hours and {pay_runs} pay runs "
+            f"({rollup_rows} rollup rows) in {time.perf_counter() - started:.1f}s; "
+            f"open period {open_start}..{open_end}"
+        )
+    finally:
+        db.close()
+
+
+def open_period(db) -> tuple[date, date]:
+    """The unbilled month generate() leaves for batch benchmarks: the month of the latest work hours"""
+    latest = db.query(func.max(WorkHours.date)).scalar()
+    if latest is None:
+        raise SystemExit("No work hours found; run python -m benchmarks.generate first")
+    if isinstance(latest, str):
+        latest = date.fromisoformat(latest)
+    return month_periods(latest, 1)[0]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic payroll dataset")
+    parser.add_argument("--employees", type=int, default=2000, help="Number of employees")
+    parser.add_argument("--months", type=int, default=6, help="Months of work hours; all but the last get pay runs")
+    parser.add_argument("--first-month", type=date.fromisoformat, default=date(2024, 1, 1), help="YYYY-MM-DD")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args(argv)
+
+    if args.months < 2:
+        parser.error("--months must be at least 2")
+    generate(args.employees, args.months, args.first_month, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+API Benchmark Suite
+Times key endpoints (in-process through TestClient) and PayrollCalculator
+methods against the dataset from benchmarks.generate
+
+Each case runs once to warm up, then --repeat times; the median and p95 are
+reported in milliseconds. Write cases (batch pay runs, approval) work on the
+generator's open period and delete what they created after every iteration,
+so the dataset is unchanged when the suite finishes.
+
+The result cache is disabled (CACHE_BACKEND=none) unless set otherwise, so
+reads measure the database and serialisation work.
+
+Usage (from backend/, same DATABASE_URL as the generator):
+    python -m benchmarks.run
+    python -m benchmarks.run --save                # write benchmarks/baselines.json
+    python -m benchmarks.run --compare             # compare with the committed baselines
+    python -m benchmarks.run --only dashboard --repeat 20
+
+Without a database server, generate the baseline dataset in memory first:
+    DATABASE_URL=sqlite:// python -m benchmarks.run --generate
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ.setdefault("CACHE_BACKEND", "none")
+os.environ.setdefault("API_KEY", "benchmark")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models import Employee, WorkHours, PayRun, PayrollPeriodTotal, PayType, PaymentStatus
+from app.pagination import encode_cursor
+from app.services.payroll import PayrollCalculator
+from benchmarks.generate import generate, open_period
+
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+HEADERS = {"X-API-Key": os.environ["API_KEY"]}
+PAGE_SIZE = 100
+APPROVE_BATCH_SIZE = 500
+
+
+class Case:
+    """One timed operation, with optional untimed setup/teardown around each iteration"""
+
+    def __init__(self, name: str, run, setup=None, teardown=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.teardown = teardown
+
+    def measure(self, repeat: int) -> dict:
+        timings = []
+        for iteration in range(repeat + 1):
+            state = self.setup() if self.setup else None
+            start = time.perf_counter()
+            self.run(state)
+            elapsed = time.perf_counter() - start
+            if self.teardown:
+                self.teardown(state)
+            if iteration:  # the first run warms up caches and compiled statements
+                timings.append(elapsed * 1000)
+
+        timings.sort()
+        p95_index = min(len(timings) - 1, round(0.95 * (len(timings) - 1)))
+        return {'median_ms': round(statistics.median(timings), 3), 'p95_ms': round(timings[p95_index], 3)}
+
+
+def _get(client: TestClient, url: str, **params):
+    def run(_):
+        response = client.get(url, params=params, headers=HEADERS)
+        assert response.status_code == 200, f"{url}: {response.status_code} {response.text[:200]}"
+    return run
+
+
+def _clear_period(start_period: date, end_period: date):
+    """Delete a period's pay runs and rollup rows (rollup rows are per period, so this keeps it consistent)"""
+    db = SessionLocal()
+    try:
+        db.query(PayRun).filter(
+            PayRun.start_period == start_period, PayRun.end_period == end_period
+        ).delete(synchronize_session=False)
+        db.query(PayrollPeriodTotal).filter(
+            PayrollPeriodTotal.start_period == start_period, PayrollPeriodTotal.end_period == end_period
+        ).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def describe_dataset(db) -> dict:
+    return {
+        'dialect': engine.dialect.name,
+        'employees': db.query(func.count(Employee.employee_id)).scalar(),
+        'work_hours': db.query(func.count(WorkHours.record_id)).scalar(),
+        'pay_runs': db.query(func.count(PayRun.pay_run_id)).scalar(),
+        'python': platform.python_version(),
+    }
+
+
+def build_cases(client: TestClient, db, dataset: dict) -> list[Case]:
+    open_start, open_end = open_period(db)
+    billed_end = open_start - timedelta(days=1)
+    billed_start = billed_end.replace(day=1)
+    calculator = PayrollCalculator(db)
+
+    # Sort key of the row halfway down the work hours list, for the deep cursor page
+    middle = dataset['work_hours'] // 2
+    middle_row = db.query(WorkHours.date, WorkHours.record_id).order_by(
+        WorkHours.date.desc(), WorkHours.record_id.desc()
+    ).offset(middle).first()
+    hourly_employee = db.query(Employee.employee_id).filter(
+        Employee.pay_type == PayType.HOURLY
+    ).order_by(Employee.employee_id).first()[0]
+
+    def clear_open_period(_=None):
+        _clear_period(open_start, open_end)
+
+    def create_open_period_pay_runs():
+        session = SessionLocal()
+        try:
+            pay_runs, _, _ = PayrollCalculator(session).create_pay_runs_batch(open_start, open_end, open_end)
+            return [pay_run.pay_run_id for pay_run in pay_runs[:APPROVE_BATCH_SIZE]]
+        finally:
+            session.close()
+
+    def batch(_):
+        response = client.post(
+            "/api/v1/pay-runs/batch/",
+            json={"start_period": open_start.isoformat(), "end_period": open_end.isoformat()},
+            headers=HEADERS
+        )
+        assert response.status_code == 201, response.text[:200]
+
+    def approve(pay_run_ids):
+        response = client.post(
+            "/api/v1/pay-runs/approve/",
+            json={"pay_run_ids": pay_run_ids, "payment_status": PaymentStatus.PAID.value},
+            headers=HEADERS
+        )
+        assert response.status_code == 200 and response.json()["approved_count"] == len(pay_run_ids), response.text[:200]
+
+    return [
+        Case("GET employees page 1", _get(client, "/api/v1/employees/", limit=PAGE_SIZE)),
+        Case("GET employees deep offset page", _get(
+            client, "/api/v1/employees/", skip=max(dataset['employees'] - PAGE_SIZE, 0), limit=PAGE_SIZE
+        )),
+        Case("GET work-hours page 1", _get(client, "/api/v1/work-hours/", limit=PAGE_SIZE)),
+        Case("GET work-hours deep offset page", _get(client, "/api/v1/work-hours/", skip=middle, limit=PAGE_SIZE)),
+        Case("GET work-hours deep cursor page", _get(
+            client, "/api/v1/work-hours/", cursor=encode_cursor(list(middle_row)), limit=PAGE_SIZE
+        )),
+        Case("GET pay-runs page 1", _get(client, "/api/v1/pay-runs/", limit=PAGE_SIZE)),
+        Case("GET pay-runs period filter", _get(
+            client, "/api/v1/pay-runs/", start_date=billed_start.isoformat(), end_date=billed_end.isoformat(),
+            limit=PAGE_SIZE
+        )),
+        Case("GET dashboard", _get(
+            client, "/api/v1/pay-runs/summary/dashboard/",
+            start_period=billed_start.isoformat(), end_period=billed_end.isoformat(), limit=PAGE_SIZE
+        )),
+        Case("POST pay-runs batch (open period)", batch, teardown=clear_open_period),
+        Case(
+            f"POST pay-runs approve ({APPROVE_BATCH_SIZE})", approve,
+            setup=create_open_period_pay_runs, teardown=clear_open_period
+        ),
+        Case("calculator.calculate_pay_runs_batch", lambda _: calculator.calculate_pay_runs_batch(open_start, open_end)),
+        Case("calculator.calculate_pay_run", lambda _: calculator.calculate_pay_run(
+            hourly_employee, billed_start, billed_end
+        )),
+        Case("calculator.get_payroll_summary", lambda _: calculator.get_payroll_summary(billed_start, billed_end)),
+        Case("calculator.get_payroll_summary_pay_runs", lambda _: calculator.get_payroll_summary_pay_runs(
+            billed_start, billed_end, 0, PAGE_SIZE
+        )),
+    ]
+
+
+def compare(results: dict, baselines: dict, threshold: float) -> int:
+    """Print results against the baselines; returns how many cases regressed beyond threshold"""
+    if baselines.get('dataset') != results['dataset']:
+        print(f"warning: baselines were recorded on a different dataset: {baselines.get('dataset')}")
+
+    regressions = 0
+    print(f"\n{'case':<42}{'baseline':>12}{'now':>12}{'ratio':>8}")
+    for name, result in results['results'].items():
+        baseline = baselines['results'].get(name)
+        if baseline is None:
+            print(f"{name:<42}{'-':>12}{result['median_ms']:>12.2f}{'new':>8}")
+            continue
+        ratio = result['median_ms'] / baseline['median_ms'] if baseline['median_ms'] else float("inf")
+        flag = " !" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{name:<42}{baseline['median_ms']:>12.2f}{result['median_ms']:>12.2f}{ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark key endpoints and PayrollCalculator methods")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed iterations per case")
+    parser.add_argument("--only", help="Run only cases whose name contains this text")
+    parser.add_argument("--save", action="store_true", help=f"Write results to {BASELINES_PATH.name}")
+    parser.add_argument("--compare", action="store_true", help=f"Compare with {BASELINES_PATH.name}")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Median ratio counted as a regression")
+    parser.add_argument("--generate", action="store_true", help="Generate the baseline dataset (2000 employees, 6 months) first")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate(employees=2000, months=6, first_month=date(2024, 1, 1))
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        try:
+            dataset = describe_dataset(db)
+            if not dataset['work_hours']:
+                print("No data found; run python -m benchmarks.generate first")
+                return 2
+
+            print(f"Dataset: {dataset}")
+            results = {'dataset': dataset, 'repeat': args.repeat, 'results': {}}
+            for case in build_cases(client, db, dataset):
+                if args.only and args.only not in case.name:
+                    continue
+                results['results'][case.name] = case.measure(args.repeat)
+                timing = results['results'][case.name]
+                print(f"  {case.name:<42}{timing['median_ms']:>10.2f} ms  (p95 {timing['p95_ms']:.2f})")
+                db.rollback()
+        finally:
+            db.close()
+
+    if args.save:
+        BASELINES_PATH.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved {BASELINES_PATH}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(BASELINES_PATH.read_text()), args.threshold)
+        if regressions:
+            print(f"{regressions} case(s) slower than {args.threshold}x baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Serialization Benchmark
+Per-row cost of rendering list responses through the standard path versus
+the FAST_JSON_RESPONSES orjson path
+
+Rows are transient PayRun / WorkHours objects, so no database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 1000 --repeat 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+# app.database needs a URL at import time; the engine is never connected here
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from pydantic import TypeAdapter
+
+import app.responses as responses
+from app.models import PayRun, WorkHours, PaymentStatus
+from app.schemas import PayRun as PayRunSchema, WorkHours as WorkHoursSchema
+
+
+def make_pay_runs(count: int) -> list[PayRun]:
+    now = datetime.now(timezone.utc)
+    return [
+        PayRun(
+            pay_run_id=i, employee_id=i % 500 + 1,
+            start_period=date(2025, 1, 1), end_period=date(2025, 1, 31), pay_date=date(2025, 2, 1),
+            regular_hours=Decimal("160.00"), overtime_hours=Decimal("12.50"),
+            regular_pay=Decimal("240080.00"), overtime_pay=Decimal("28134.38"), bonuses=Decimal("0.00"),
+            gross_pay=Decimal("268214.38"), federal_tax=Decimal("32185.73"), state_tax=Decimal("13410.72"),
+            local_tax=Decimal("0.00"), social_security=Decimal("0.00"), medicare=Decimal("0.00"),
+            retirement=Decimal("21457.15"), insurance=Decimal("6705.36"), other_deductions=Decimal("0.00"),
+            total_taxes=Decimal("45596.45"), total_deductions=Decimal("28162.51"), net_pay=Decimal("194455.42"),
+            payment_status=PaymentStatus.PENDING, notes=None, created_at=now, updated_at=None, processed_at=None
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def make_work_hours(count: int) -> list[WorkHours]:
+    now = datetime.now(timezone.utc)
+    return [
+        WorkHours(
+            record_id=i, employee_id=i % 500 + 1, date=date(2025, 1, 1) + timedelta(days=i % 365),
+            hours_worked=Decimal("8.00"), overtime_hours=Decimal("1.50"), notes=None,
+            approved_by="manager", is_approved=True, created_at=now, updated_at=None
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def fastapi_path(response_model, rows) -> bytes:
+    """What FastAPI does for response_model=...: validate, dump to JSON-able data, json.dumps"""
+    adapter = TypeAdapter(response_model)
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def render_path(fast: bool):
+    def run(response_model, rows) -> bytes:
+        responses.FAST_JSON_RESPONSES = fast
+        return responses.render_body(response_model, rows)
+    return run
+
+
+def time_path(path, response_model, rows, repeat: int) -> float:
+    """Median seconds per call"""
+    path(response_model, rows)  # warm up adapters
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path(response_model, rows)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON serialization paths")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed iterations per path")
+    args = parser.parse_args()
+
+    paths = [
+        ("fastapi response_model", fastapi_path),
+        ("pydantic dump_json", render_path(fast=False)),
+        ("orjson fast path", render_path(fast=True)),
+    ]
+    datasets = [
+        ("pay runs", List[PayRunSchema], make_pay_runs(args.rows)),
+        ("work hours", List[WorkHoursSchema], make_work_hours(args.rows)),
+    ]
+
+    for name, response_model, rows in datasets:
+        assert json.loads(fastapi_path(response_model, rows)) == json.loads(render_path(True)(response_model, rows))
+        print(f"\n{name}: {args.rows} rows, median of {args.repeat}")
+        print(f"  {'path':<24}{'ms/page':>10}{'us/row':>10}{'speedup':>10}")
+        baseline = None
+        for label, path in paths:
+            seconds = time_path(path, response_model, rows, args.repeat)
+            baseline = baseline or seconds
+            print(f"  {label:<24}{seconds * 1000:>10.2f}{seconds / len(rows) * 1e6:>10.2f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
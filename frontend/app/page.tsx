@@ -14,6 +14,7 @@ import {
   Badge,
   LoadingOverlay,
   Select,
+  Pagination,
 } from '@mantine/core';
 import { DatePickerInput } from '@mantine/dates';
 import { notifications } from '@mantine/notifications';
@@ -23,9 +24,14 @@ import { payRunApi } from '@/lib/api';
 import type { PayrollDashboard } from '@/types';
 import DashboardLayout from '@/components/DashboardLayout';
 
+const PAGE_SIZE = 100;
+
+const toDateString = (date: Date) => date.toISOString().split('T')[0];
+
 export default function HomePage() {
   const [loading, setLoading] = useState(false);
   const [dashboard, setDashboard] = useState<PayrollDashboard | null>(null);
+  const [page, setPage] = useState(1);
   const [dateRange, setDateRange] = useState<[Date | null, Date | null]>([
     new Date(new Date().getFullYear(), new Date().getMonth(), 1),
     new Date(),
@@ -37,8 +43,9 @@ export default function HomePage() {
     setLoading(true);
     try {
       const response = await payRunApi.getDashboard(
-        dateRange[0].toISOString().split('T')[0],
-        dateRange[1].toISOString().split('T')[0]
+        toDateString(dateRange[0]),
+        toDateString(dateRange[1]),
+        { skip: (page - 1) * PAGE_SIZE, limit: PAGE_SIZE }
       );
       setDashboard(response.data);
     } catch (error) {
@@ -54,17 +61,31 @@ export default function HomePage() {
 
   useEffect(() => {
     loadDashboard();
-  }, [dateRange]);
+  }, [dateRange, page]);
+
+  const handleDateRangeChange = (value: [Date | null, Date | null]) => {
+    setPage(1);
+    setDateRange(value);
+  };
+
+  const handleApproveAll = async () => {
+    if (!dateRange[0] || !dateRange[1]) return;
 
-  const handleApprove = async (payRunIds: number[]) => {
     try {
-      await payRunApi.approve(payRunIds);
+      const { data } = await payRunApi.approvePeriod(
+        toDateString(dateRange[0]),
+        toDateString(dateRange[1])
+      );
       notifications.show({
         title: 'Success',
-        message: `${payRunIds.length} pay run(s) approved`,
+        message: `${data.approved_count} pay run(s) approved`,
         color: 'green',
       });
-      loadDashboard();
+      if (page === 1) {
+        loadDashboard();
+      } else {
+        setPage(1);
+      }
     } catch (error) {
       notifications.show({
         title: 'Error',
@@ -86,7 +107,7 @@ export default function HomePage() {
               type="range"
               placeholder="Select date range"
               value={dateRange}
-              onChange={setDateRange}
+              onChange={handleDateRangeChange}
               leftSection={<IconCalendar size={16} />}
             />
           </Group>
@@ -166,19 +187,8 @@ export default function HomePage() {
               <Stack gap="md">
                 <Group justify="space-between">
                   <Title order={3}>Pending Pay Runs</Title>
-                  <Button
-                    onClick={() =>
-                      handleApprove(
-                        dashboard.pay_runs
-                          .filter((pr) => pr.payment_status === 'pending')
-                          .map((pr) => pr.pay_run_id)
-                      )
-                    }
-                    disabled={
-                      !dashboard.pay_runs.some((pr) => pr.payment_status === 'pending')
-                    }
-                  >
-                    Approve All
+                  <Button onClick={handleApproveAll} disabled={dashboard.pagination.total === 0}>
+                    Approve All ({dashboard.pagination.total})
                   </Button>
                 </Group>
 
@@ -222,6 +232,21 @@ export default function HomePage() {
                     ))}
                   </Table.Tbody>
                 </Table>
+
+                {dashboard.pagination.total > PAGE_SIZE && (
+                  <Group justify="space-between">
+                    <Text size="sm" c="dimmed">
+                      {dashboard.pagination.skip + 1}–
+                      {dashboard.pagination.skip + dashboard.pay_runs.length} of{' '}
+                      {dashboard.pagination.total}
+                    </Text>
+                    <Pagination
+                      total={Math.ceil(dashboard.pagination.total / PAGE_SIZE)}
+                      value={page}
+                      onChange={setPage}
+                    />
+                  </Group>
+                )}
               </Stack>
             </Card>
           )}
@@ -9,10 +9,13 @@ import type {
   EmployeeCreate,
   WorkHours,
   WorkHoursCreate,
+  WorkHoursBulkApprove,
+  WorkHoursApprovalResult,
   PayRun,
   PayRunCreate,
   TaxDeductionProfile,
   PayrollDashboard,
+  PayRunApprovalResult,
 } from '@/types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api/v1';
@@ -110,9 +113,14 @@ export const workHoursApi = {
     api.post<WorkHours>(`/work-hours/${id}/approve?approved_by=${approvedBy}`),
   
   bulkApprove: (recordIds: number[], approvedBy: string) => 
-    api.post('/work-hours/bulk-approve/', null, {
-      params: { record_ids: recordIds, approved_by: approvedBy },
+    api.post<WorkHoursApprovalResult>('/work-hours/bulk-approve/', {
+      record_ids: recordIds,
+      approved_by: approvedBy,
     }),
+  
+  // e.g. a whole team's week: { approved_by, employee_ids, start_date, end_date }
+  approveByFilter: (data: WorkHoursBulkApprove) => 
+    api.post<WorkHoursApprovalResult>('/work-hours/bulk-approve/', data),
 };
 
 // ==================== Pay Runs API ====================
@@ -144,14 +152,22 @@ export const payRunApi = {
     api.post<PayRun>(`/pay-runs/${id}/recalculate/`),
   
   approve: (payRunIds: number[]) => 
-    api.post<PayRun[]>('/pay-runs/approve/', {
+    api.post<PayRunApprovalResult>('/pay-runs/approve/', {
       pay_run_ids: payRunIds,
       payment_status: 'paid',
     }),
   
-  getDashboard: (startPeriod: string, endPeriod: string) => 
+  // Every pending pay run in the period, not just the page on screen
+  approvePeriod: (startPeriod: string, endPeriod: string) => 
+    api.post<PayRunApprovalResult>('/pay-runs/approve/', {
+      start_period: startPeriod,
+      end_period: endPeriod,
+      payment_status: 'paid',
+    }),
+  
+  getDashboard: (startPeriod: string, endPeriod: string, params?: { skip?: number; limit?: number }) => 
     api.get<PayrollDashboard>('/pay-runs/summary/dashboard/', {
-      params: { start_period: startPeriod, end_period: endPeriod },
+      params: { start_period: startPeriod, end_period: endPeriod, ...params },
     }),
 };
 
@@ -105,6 +105,19 @@ export interface WorkHoursCreate {
   is_approved?: boolean;
 }
 
+export interface WorkHoursBulkApprove {
+  approved_by: string;
+  record_ids?: number[];
+  employee_ids?: number[];
+  start_date?: string;
+  end_date?: string;
+}
+
+export interface WorkHoursApprovalResult {
+  approved_count: number;
+  record_ids: number[];
+}
+
 export interface PayRun {
   pay_run_id: number;
   employee_id: number;
@@ -157,6 +170,13 @@ export interface PayRunSummary {
   payment_status: PaymentStatus;
 }
 
+export interface PayRunApprovalResult {
+  approved_count: number;
+  skipped_count: number;
+  pay_runs: PayRun[];
+  skipped: { pay_run_id: number; reason: string }[];
+}
+
 export interface PayrollDashboard {
   summary: {
     employee_count: number;
@@ -166,4 +186,9 @@ export interface PayrollDashboard {
     total_net_pay: number;
   };
   pay_runs: PayRunSummary[];
+  pagination: {
+    skip: number;
+    limit: number;
+    total: number;
+  };
 }